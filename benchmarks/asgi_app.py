@@ -0,0 +1,45 @@
+"""
+WSGI/ASGI-приложения проекта для benchmarks.asgi_load.
+
+Те же config.wsgi и config.asgi, но каждый SQL-запрос можно задержать на BENCHMARK_DB_LATENCY_MS
+миллисекунд: так локальная SQLite ведёт себя как БД по сети, и видно, сколько запросов воркер
+обслуживает, пока ждёт ответа БД.
+
+BENCHMARK_PASSWORD_HASHER (например, pbkdf2_sha256) ставит этот хешер первым в PASSWORD_HASHERS —
+для сравнения с Argon2 в benchmarks.password_hashing.
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers, get_hashers_by_algorithm
+from django.db.backends.signals import connection_created
+
+from config.asgi import application as asgi_application  # noqa: F401  (вызывает django.setup())
+from config.wsgi import application as wsgi_application  # noqa: F401
+
+DB_LATENCY = float(os.getenv("BENCHMARK_DB_LATENCY_MS", "0")) / 1000
+PASSWORD_HASHER = os.getenv("BENCHMARK_PASSWORD_HASHER")
+
+
+def _delay(execute, sql, params, many, context):
+    time.sleep(DB_LATENCY)
+    return execute(sql, params, many, context)
+
+
+def _add_latency(sender, connection, **kwargs):
+    # Сигнал приходит на каждое переподключение того же DatabaseWrapper
+    if _delay not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_delay)
+
+
+if DB_LATENCY:
+    connection_created.connect(_add_latency)
+
+if PASSWORD_HASHER:
+    preferred = get_hashers_by_algorithm()[PASSWORD_HASHER]
+    hasher_path = f"{type(preferred).__module__}.{type(preferred).__qualname__}"
+    settings.PASSWORD_HASHERS = [hasher_path, *(path for path in settings.PASSWORD_HASHERS if path != hasher_path)]
+    get_hashers.cache_clear()
+    get_hashers_by_algorithm.cache_clear()
@@ -0,0 +1,195 @@
+"""
+Нагрузочное сравнение WSGI и ASGI для горячих GET-эндпоинтов.
+
+Поднимает gunicorn с одинаковым числом воркеров в трёх режимах:
+- wsgi: config.wsgi, sync-воркеры (как в docker-compose);
+- asgi-sync: config.asgi, воркеры uvicorn, прежние sync-представления DRF;
+- asgi-async: то же, но с API_ASYNC_READS=True (async-представления, config/async_views.py).
+
+Для каждого эндпоинта (список и карточка привычки, публичная лента, /api/users/detail/me/)
+держит --concurrency одновременных запросов в течение --duration секунд и считает
+запросы в секунду, p50 и p99. --db-latency-ms задерживает каждый SQL-запрос в сервере
+(benchmarks/asgi_app.py), чтобы локальная БД вела себя как БД по сети.
+
+Данные (пользователь и привычки) создаются в БД из DJANGO_SETTINGS_MODULE и удаляются в конце.
+
+Запуск:
+    python -m benchmarks.asgi_load --workers 3 --concurrency 32 --duration 10 --db-latency-ms 2
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import django
+import httpx
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+MODES = {
+    "wsgi": ("benchmarks.asgi_app:wsgi_application", "sync", False),
+    "asgi-sync": ("benchmarks.asgi_app:asgi_application", "uvicorn_worker.UvicornWorker", False),
+    "asgi-async": ("benchmarks.asgi_app:asgi_application", "uvicorn_worker.UvicornWorker", True),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(habits: int):
+    from datetime import time as time_of_day
+
+    from habits.models import Habit
+    from users.models import User
+
+    user = User.objects.create(email=f"load-{os.getpid()}@example.com", password="!")
+    Habit.objects.bulk_create(
+        Habit(
+            user=user, place="Парк", time=time_of_day(7, i % 60), action=f"Пробежка {i}", reward="Кофе", is_public=True
+        )
+        for i in range(habits)
+    )
+    return user, Habit.objects.filter(user=user).values_list("pk", flat=True).first()
+
+
+def access_token(user) -> str:
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    return str(AccessToken.for_user(user))
+
+
+def start_server(mode: str, port: int, args) -> subprocess.Popen:
+    app, worker_class, async_reads = MODES[mode]
+    env = {
+        **os.environ,
+        "API_ASYNC_READS": str(async_reads),
+        "BENCHMARK_DB_LATENCY_MS": str(args.db_latency_ms),
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        app,
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(args.workers),
+        "--worker-class",
+        worker_class,
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+def wait_ready(base_url: str, headers: dict, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/users/detail/me/", headers=headers).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{base_url} не ответил за {timeout} с")
+
+
+async def load(url: str, headers: dict, concurrency: int, duration: float, json: dict | None = None) -> dict:
+    """GET url (или POST с телом json) в concurrency потоков запросов; успешен ответ 200."""
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user_loop():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await (client.get(url) if json is None else client.post(url, json=json))
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=3, help="Воркеров gunicorn (одинаково для всех режимов).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных запросов.")
+    parser.add_argument("--duration", type=float, default=10, help="Секунд нагрузки на эндпоинт.")
+    parser.add_argument("--warmup", type=float, default=2, help="Секунд прогрева перед замером.")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="Задержка каждого SQL-запроса в сервере.")
+    parser.add_argument("--habits", type=int, default=50, help="Привычек у тестового пользователя.")
+    parser.add_argument("--modes", default=",".join(MODES), help="Режимы через запятую.")
+    parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+    args = parser.parse_args()
+
+    django.setup()
+    from habits.management.commands._benchmark import git_commit, write_report
+
+    user, habit_id = seed(args.habits)
+    endpoints = {
+        "habit_list": "/api/habits/",
+        "habit_detail": f"/api/habits/{habit_id}/",
+        "public_feed": "/api/habits/public/",
+        "user_detail": "/api/users/detail/me/",
+    }
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    report = {"commit": git_commit(), "params": params, "results": []}
+
+    try:
+        for mode in args.modes.split(","):
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            headers = {"Authorization": f"Bearer {access_token(user)}"}
+            server = start_server(mode, port, args)
+            try:
+                wait_ready(base_url, headers)
+                for name, path in endpoints.items():
+                    asyncio.run(load(base_url + path, headers, args.concurrency, args.warmup))
+                    result = {
+                        "mode": mode,
+                        "endpoint": name,
+                        **asyncio.run(load(base_url + path, headers, args.concurrency, args.duration)),
+                    }
+                    report["results"].append(result)
+                    print(
+                        f"{mode:<11} {name:<13} rps={result['rps']:<8} p50={result['p50_ms']}ms "
+                        f"p99={result['p99_ms']}ms errors={result['errors']}"
+                    )
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    finally:
+        user.delete()
+
+    print(f"Results saved to {write_report(report, args.output, f'asgi_load_w{args.workers}')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Сколько добавляет к запросу входа проверка лимитов (users/throttling.py).
+
+Вызывает LoginRateThrottle.allow_request --checks раз подряд (лимиты по IP и email, один
+Lua-скрипт на проверку) с кешем CACHES["default"] — Redis из CACHE_REDIS_URL — и считает
+p50/p99 задержки. Лимиты подняты так, чтобы ни одна проверка не отклонялась; --ips и --emails
+задают, по скольким разным ключам распределяются попытки. Ключи живут не дольше окна (минута).
+
+Запуск:
+    python -m benchmarks.auth_throttle --checks 5000
+"""
+
+import argparse
+import os
+import statistics
+import time
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+
+def measure(checks: int, ips: int, emails: int) -> dict:
+    from django.test import override_settings
+    from rest_framework.parsers import JSONParser
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+    from rest_framework.test import APIRequestFactory
+
+    from users.throttling import LoginRateThrottle
+
+    factory = APIRequestFactory()
+    requests = [
+        Request(
+            factory.post(
+                "/", {"email": f"bench-{i % emails}@example.com"}, format="json", REMOTE_ADDR=f"10.0.{i % ips}.1"
+            ),
+            parsers=[JSONParser()],
+        )
+        for i in range(checks)
+    ]
+    for request in requests:
+        request.data  # тело разбирает представление и без лимитов; в замер не входит
+    rates = {"login_ip": f"{checks}/min", "login_email": f"{checks}/min"}
+
+    latencies = []
+    with override_settings(AUTH_THROTTLE_ENABLED=True), mock.patch.dict(api_settings.DEFAULT_THROTTLE_RATES, rates):
+        LoginRateThrottle().allow_request(requests[0], None)  # соединение и загрузка скрипта
+        for request in requests:
+            started = time.perf_counter()
+            if not LoginRateThrottle().allow_request(request, None):
+                raise RuntimeError("проверка отклонена: лимиты бенчмарка должны быть выше числа проверок")
+            latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+    return {
+        "checks": checks,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=5000, help="Проверок лимита.")
+    parser.add_argument("--ips", type=int, default=100, help="Разных IP.")
+    parser.add_argument("--emails", type=int, default=1000, help="Разных email.")
+    parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+    args = parser.parse_args()
+
+    django.setup()
+    from habits.management.commands._benchmark import git_commit, write_report
+
+    result = measure(args.checks, args.ips, args.emails)
+    print(f"allow_request: mean={result['mean_ms']}ms p50={result['p50_ms']}ms p99={result['p99_ms']}ms")
+
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    report = {"commit": git_commit(), "params": params, "results": [result]}
+    print(f"Results saved to {write_report(report, args.output, 'auth_throttle')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Задержка запроса и задачи Celery с переиспользованием соединений с PostgreSQL и без него.
+
+Режимы (переменные окружения config/settings.py):
+- no-reuse: DB_CONN_MAX_AGE=0 и CELERY_DB_REUSE_MAX=0 — новое соединение на каждый запрос и задачу;
+- persistent: DB_CONN_MAX_AGE=60 — постоянные соединения с проверкой (CONN_HEALTH_CHECKS);
+- pool: DB_POOL=True — пул psycopg 3 в каждом процессе.
+
+HTTP: для каждого режима поднимается gunicorn (sync-воркеры, как в docker-compose), и --concurrency
+клиентов шлют запросы к карточке привычки и /api/users/detail/me/ в течение --duration секунд.
+Задачи: в отдельном процессе с тем же окружением фикс Celery для Django и обработчики
+config/celery.py получают task_prerun/task_postrun вокруг --tasks задач, читающих привычки
+пользователя, — так же, как в воркере prefork, но без брокера.
+
+Нужна PostgreSQL (DB_* из окружения): пул работает только с ней, а у SQLite нет сетевого подключения.
+Данные (пользователь и привычки) создаются в БД и удаляются в конце.
+
+Запуск:
+    python -m benchmarks.db_connections --workers 2 --concurrency 1 --duration 10 --tasks 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import django
+
+from benchmarks.asgi_load import access_token, free_port, load, seed, wait_ready
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+MODES = {
+    "no-reuse": {"DB_POOL": "False", "DB_CONN_MAX_AGE": "0", "CELERY_DB_REUSE_MAX": "0"},
+    "persistent": {"DB_POOL": "False", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL": "True"},
+}
+
+
+def start_server(mode: str, port: int, args) -> subprocess.Popen:
+    env = {**os.environ, **MODES[mode], "BENCHMARK_DB_LATENCY_MS": str(args.db_latency_ms)}
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "benchmarks.asgi_app:wsgi_application",
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+def run_tasks(mode: str, user_id: int, args) -> dict:
+    """Запускает этот же модуль с --tasks-user в окружении режима и читает JSON-результат."""
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.db_connections",
+        "--tasks-user",
+        str(user_id),
+        "--tasks",
+        str(args.tasks),
+    ]
+    result = subprocess.run(command, env={**os.environ, **MODES[mode]}, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def tasks_child(user_id: int, tasks: int) -> dict:
+    """Цикл задач как в дочернем процессе воркера: сигналы Celery вокруг чтения привычек."""
+    from celery.fixups.django import DjangoWorkerFixup
+    from celery.signals import task_postrun, task_prerun
+
+    from config.celery import app
+    from habits.models import Habit
+    from habits.tasks import prune_habit_tombstones as task
+
+    DjangoWorkerFixup(app).install()
+
+    latencies = []
+    for task_id in range(tasks):
+        started = time.perf_counter()
+        task_prerun.send(sender=task, task_id=str(task_id), task=task, args=(), kwargs={})
+        list(Habit.objects.filter(user_id=user_id).values_list("pk", "action")[:20])
+        task_postrun.send(
+            sender=task, task_id=str(task_id), task=task, args=(), kwargs={}, retval=None, state="SUCCESS"
+        )
+        latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+    return {
+        "tasks": tasks,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="Воркеров gunicorn.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Одновременных HTTP-запросов.")
+    parser.add_argument("--duration", type=float, default=10, help="Секунд нагрузки на эндпоинт.")
+    parser.add_argument("--warmup", type=float, default=2, help="Секунд прогрева перед замером.")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="Задержка каждого SQL-запроса в сервере.")
+    parser.add_argument("--tasks", type=int, default=500, help="Задач в цикле Celery; 0 — без замера задач.")
+    parser.add_argument("--habits", type=int, default=20, help="Привычек у тестового пользователя.")
+    parser.add_argument("--modes", default=",".join(MODES), help="Режимы через запятую.")
+    parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+    parser.add_argument("--tasks-user", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    django.setup()
+    if args.tasks_user is not None:
+        print(json.dumps(tasks_child(args.tasks_user, args.tasks)))
+        return
+
+    from habits.management.commands._benchmark import git_commit, write_report
+
+    user, habit_id = seed(args.habits)
+    endpoints = {"habit_detail": f"/api/habits/{habit_id}/", "user_detail": "/api/users/detail/me/"}
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "tasks_user")}
+    report = {"commit": git_commit(), "params": params, "results": []}
+
+    try:
+        for mode in args.modes.split(","):
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            headers = {"Authorization": f"Bearer {access_token(user)}"}
+            server = start_server(mode, port, args)
+            try:
+                wait_ready(base_url, headers)
+                for name, path in endpoints.items():
+                    asyncio.run(load(base_url + path, headers, args.concurrency, args.warmup))
+                    result = {
+                        "mode": mode,
+                        "endpoint": name,
+                        **asyncio.run(load(base_url + path, headers, args.concurrency, args.duration)),
+                    }
+                    report["results"].append(result)
+                    print(
+                        f"{mode:<11} {name:<13} rps={result['rps']:<8} p50={result['p50_ms']}ms "
+                        f"p99={result['p99_ms']}ms errors={result['errors']}"
+                    )
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+            if args.tasks:
+                result = {"mode": mode, "endpoint": "celery_task", **run_tasks(mode, user.pk, args)}
+                report["results"].append(result)
+                print(f"{mode:<11} {'celery_task':<13} p50={result['p50_ms']}ms p99={result['p99_ms']}ms")
+    finally:
+        user.delete()
+
+    print(f"Results saved to {write_report(report, args.output, 'db_connections')}")
+
+
+if __name__ == "__main__":
+    main()
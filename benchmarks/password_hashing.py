@@ -0,0 +1,170 @@
+"""
+Пропускная способность входа с PBKDF2 (прежний хешер Django) и Argon2 (users/hashers.py).
+
+1. Хеширование в процессе: сколько проверок пароля в секунду даёт одно ядро для каждого хешера
+   и во сколько раз больше — --threads потоков (argon2-cffi и hashlib отпускают GIL).
+2. HTTP: gunicorn с --workers воркерами в режимах
+   - pbkdf2-wsgi: sync-воркеры, PBKDF2 первым в PASSWORD_HASHERS (BENCHMARK_PASSWORD_HASHER);
+   - argon2-wsgi: sync-воркеры, Argon2 с параметрами PASSWORD_ARGON2_*;
+   - argon2-asgi: воркеры uvicorn, API_ASYNC_READS=True — проверка пароля в пуле потоков.
+   --concurrency клиентов шлют POST /api/users/login/ в течение --duration секунд; входов в секунду
+   на ядро — rps, делённое на min(--workers, число ядер). Одновременно один клиент читает
+   /api/users/detail/me/: его p50 и p99 показывают, ждут ли остальные запросы хеширования.
+
+Хеш пароля тестового пользователя пересчитывается под хешер режима во время прогрева.
+Данные создаются в БД из DJANGO_SETTINGS_MODULE и удаляются в конце.
+
+Запуск:
+    python -m benchmarks.password_hashing --workers 2 --concurrency 8 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+from benchmarks.asgi_load import access_token, free_port, load, wait_ready
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+PASSWORD = "bench-Passw0rd"
+
+MODES = {
+    "pbkdf2-wsgi": ("benchmarks.asgi_app:wsgi_application", "sync", {"BENCHMARK_PASSWORD_HASHER": "pbkdf2_sha256"}),
+    "argon2-wsgi": ("benchmarks.asgi_app:wsgi_application", "sync", {}),
+    "argon2-asgi": (
+        "benchmarks.asgi_app:asgi_application",
+        "uvicorn_worker.UvicornWorker",
+        {"API_ASYNC_READS": "True"},
+    ),
+}
+
+
+def start_server(mode: str, port: int, args) -> subprocess.Popen:
+    app, worker_class, env = MODES[mode]
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        app,
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(args.workers),
+        "--worker-class",
+        worker_class,
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, env={**os.environ, "API_ASYNC_READS": "False", **env})
+
+
+def verify_rate(encoded: str, duration: float, threads: int = 1) -> float:
+    """Проверок пароля в секунду в threads потоках."""
+    from django.contrib.auth.hashers import check_password
+
+    deadline = time.perf_counter() + duration
+
+    def worker() -> int:
+        count = 0
+        while time.perf_counter() < deadline:
+            check_password(PASSWORD, encoded)
+            count += 1
+        return count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        total = sum(executor.map(lambda _: worker(), range(threads)))
+    return total / (time.perf_counter() - started)
+
+
+def hashing_results(args) -> list:
+    from django.contrib.auth.hashers import make_password
+
+    results = []
+    for hasher in ("pbkdf2_sha256", "argon2"):
+        encoded = make_password(PASSWORD, hasher=hasher)
+        single = verify_rate(encoded, args.hash_duration)
+        threaded = verify_rate(encoded, args.hash_duration, args.threads)
+        results.append(
+            {
+                "hasher": hasher,
+                "verify_per_s_per_core": round(single, 1),
+                "verify_ms": round(1000 / single, 2),
+                f"verify_per_s_{args.threads}_threads": round(threaded, 1),
+            }
+        )
+        print(
+            f"{hasher:<14} {single:.1f} проверок/с на ядро ({1000 / single:.1f} мс), "
+            f"{args.threads} потоков: {threaded:.1f}/с"
+        )
+    return results
+
+
+async def under_login_load(base_url: str, headers: dict, credentials: dict, args) -> tuple:
+    """Входы с --concurrency клиентами и одновременно чтение профиля одним клиентом."""
+    return await asyncio.gather(
+        load(f"{base_url}/api/users/login/", {}, args.concurrency, args.duration, json=credentials),
+        load(f"{base_url}/api/users/detail/me/", headers, 1, args.duration),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="Воркеров gunicorn (одинаково для всех режимов).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Одновременных входов.")
+    parser.add_argument("--duration", type=float, default=10, help="Секунд нагрузки на режим.")
+    parser.add_argument("--warmup", type=float, default=3, help="Секунд прогрева перед замером.")
+    parser.add_argument("--hash-duration", type=float, default=3, help="Секунд замера хеширования в процессе.")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="Потоков для замера хеширования.")
+    parser.add_argument("--modes", default=",".join(MODES), help="Режимы через запятую.")
+    parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+    args = parser.parse_args()
+
+    django.setup()
+    from habits.management.commands._benchmark import git_commit, write_report
+    from users.models import User
+
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    report = {"commit": git_commit(), "params": params, "cpu_count": os.cpu_count()}
+    report["hashing"] = hashing_results(args)
+    report["results"] = []
+
+    user = User.objects.create_user(email=f"login-{os.getpid()}@example.com", password=PASSWORD)
+    credentials = {"email": user.email, "password": PASSWORD}
+    cores = min(args.workers, os.cpu_count())
+    try:
+        for mode in args.modes.split(","):
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            url = f"{base_url}/api/users/login/"
+            headers = {"Authorization": f"Bearer {access_token(user)}"}
+            server = start_server(mode, port, args)
+            try:
+                wait_ready(base_url, headers)
+                asyncio.run(load(url, {}, args.concurrency, args.warmup, json=credentials))
+                login, detail = asyncio.run(under_login_load(base_url, headers, credentials, args))
+                result = {"mode": mode, **login, "rps_per_core": round(login["rps"] / cores, 1)}
+                result.update({f"detail_{key}": value for key, value in detail.items() if key != "requests"})
+                report["results"].append(result)
+                print(
+                    f"{mode:<12} rps={result['rps']:<7} на ядро={result['rps_per_core']:<7} "
+                    f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms errors={result['errors']} | "
+                    f"detail p50={detail['p50_ms']}ms p99={detail['p99_ms']}ms"
+                )
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    finally:
+        user.delete()
+
+    print(f"Results saved to {write_report(report, args.output, f'password_hashing_w{args.workers}')}")
+
+
+if __name__ == "__main__":
+    main()
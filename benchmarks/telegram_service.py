@@ -0,0 +1,109 @@
+"""
+Бенчмарк отправки через TelegramNotificationService против локального stub-сервера.
+
+Сравнивает пропускную способность (сообщений в секунду):
+- «до»: новый httpx.Client на каждое сообщение (прежнее поведение send_message);
+- «после»: долгоживущий клиент сервиса с пулом keep-alive соединений.
+
+Запуск:
+    python -m benchmarks.telegram_service --messages 2000
+"""
+
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+import httpx
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+
+class StubBotHandler(BaseHTTPRequestHandler):
+    """Имитирует POST /send/ FastAPI-сервиса бота."""
+
+    protocol_version = "HTTP/1.1"
+    body = json.dumps({"status": "success", "message": "Сообщение отправлено"}).encode()
+
+    def setup(self):
+        super().setup()
+        # Без TCP_NODELAY заголовки и тело уходят разными сегментами и упираются в delayed ACK
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBotHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def send_with_new_client(base_url: str, secret: str, telegram_id: str, message: str) -> bool:
+    """Прежняя реализация: соединение открывается и закрывается на каждое сообщение."""
+    with httpx.Client(timeout=10.0) as client:
+        response = client.post(
+            f"{base_url}/send/",
+            json={"telegram_id": telegram_id, "message": message},
+            headers={"X-BOT-SECRET": secret, "Content-Type": "application/json"},
+        )
+    return 200 <= response.status_code < 300
+
+
+def measure(label: str, send, messages: int) -> float:
+    started = time.perf_counter()
+    ok = sum(1 for i in range(messages) if send(str(i), "benchmark"))
+    elapsed = time.perf_counter() - started
+    rate = messages / elapsed
+    print(f"{label:<28} sent={ok}/{messages} elapsed={elapsed:.2f}s rate={rate:.0f} msg/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="Количество сообщений в каждом прогоне.")
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    secret = "benchmark-secret"
+
+    django.setup()
+    from django.conf import settings
+
+    from users.services import TelegramNotificationService
+
+    settings.TELEGRAM_API_BASE_URL = base_url
+    settings.TELEGRAM_BOT_SECRET = secret
+    service = TelegramNotificationService()
+
+    try:
+        before = measure(
+            "new client per message",
+            lambda telegram_id, message: send_with_new_client(base_url, secret, telegram_id, message),
+            args.messages,
+        )
+        after = measure("pooled service client", service.send_message, args.messages)
+        print(f"speedup: x{after / before:.2f}")
+    finally:
+        service.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Async-представления DRF для горячих GET-эндпоинтов под ASGI.
+
+DRF выполняет представления синхронно, поэтому под ASGI каждый запрос занимает поток на всё
+время работы с БД. AsyncAPIView повторяет цикл APIView.dispatch (согласование формата,
+аутентификация, права, обработка исключений), но обработчики методов — корутины, а пользователь
+и данные читаются через async ORM. Аутентификаторы с методом aauthenticate
+(users/authentication.py) вызываются без перехода в поток, остальные — через sync_to_async.
+
+Async-представления подключаются к тем же URL функцией with_async_reads, когда включён
+API_ASYNC_READS: GET/HEAD (или заданные методы) идут в async-представление, остальные — в прежнее.
+"""
+
+from functools import wraps
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+from django.urls import URLPattern
+from rest_framework import exceptions
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+ASYNC_READ_METHODS = ("GET", "HEAD")
+
+
+async def _authenticate(authenticator, request):
+    if hasattr(authenticator, "aauthenticate"):
+        return await authenticator.aauthenticate(request)
+    return await sync_to_async(authenticator.authenticate)(request)
+
+
+class AsyncAPIView(APIView):
+    """APIView с async-обработчиками методов (все обработчики, кроме options, — корутины)."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = await self.afinalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """Как APIView.initial, но аутентификация и throttling не блокируют event loop."""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        if self.throttle_classes:
+            await sync_to_async(self.check_throttles)(request)
+
+    async def aperform_authentication(self, request):
+        """Повторяет Request._authenticate; после него request.user уже не обращается к БД."""
+        for authenticator in request.authenticators:
+            try:
+                user_auth_tuple = await _authenticate(authenticator, request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        return self.finalize_response(request, response, *args, **kwargs)
+
+
+class AsyncGenericAPIView(AsyncAPIView, GenericAPIView):
+    """GenericAPIView для AsyncAPIView: объект и страницы читаются через async ORM."""
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            # Как rest_framework.generics.get_object_or_404: некорректный ID — это 404, а не 500
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """Пагинатор должен уметь apaginate_queryset (habits/paginators.py)."""
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    async def alist(self, queryset):
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer([obj async for obj in queryset], many=True).data)
+
+
+def async_reads(sync_view, async_view, methods=ASYNC_READ_METHODS):
+    """
+    Одна точка входа для URL: methods — в async_view, остальные — в sync_view в потоке
+    (так же Django под ASGI вызывает обычные представления).
+
+    Атрибуты sync_view (cls, actions, csrf_exempt) копируются, поэтому схема Swagger
+    и CSRF-исключение остаются прежними.
+    """
+    sync_handler = sync_to_async(sync_view)
+
+    @wraps(sync_view)
+    async def view(request, *args, **kwargs):
+        if request.method in methods:
+            return await async_view(request, *args, **kwargs)
+        return await sync_handler(request, *args, **kwargs)
+
+    return view
+
+
+def with_async_reads(urlpatterns, async_views: dict, methods=ASYNC_READ_METHODS):
+    """Возвращает urlpatterns, где маршруты с именами из async_views обслуживаются async_reads."""
+    return [
+        (
+            URLPattern(
+                pattern.pattern,
+                async_reads(pattern.callback, async_views[pattern.name], methods),
+                pattern.default_args,
+                pattern.name,
+            )
+            if isinstance(pattern, URLPattern) and pattern.name in async_views
+            else pattern
+        )
+        for pattern in urlpatterns
+    ]
@@ -1,11 +1,157 @@
+import logging
 import os
 
 from celery import Celery
+from celery.beat import PersistentScheduler
+from celery.signals import beat_init, task_postrun, task_prerun, worker_init, worker_process_shutdown
+from django.db import close_old_connections, connections
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+logger = logging.getLogger(__name__)
+
 app = Celery("config")
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+
+# Обработчики task_prerun/task_postrun для счётчика SQL-запросов (включаются QUERY_INSTRUMENTATION)
+import config.instrumentation  # noqa: E402,F401
+
+
+@worker_process_shutdown.connect
+def close_telegram_client(**kwargs):
+    """Закрывает пул соединений к API бота при остановке процесса воркера."""
+    from users.services import get_telegram_service
+
+    get_telegram_service().close()
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    """Убирает живые gauge-файлы завершённого процесса в multiprocess-режиме Prometheus."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    """Поднимает /metrics воркера на WORKER_METRICS_PORT (метрики всех процессов пула)."""
+    from django.conf import settings
+
+    port = getattr(settings, "WORKER_METRICS_PORT", 0)
+    if not port:
+        return
+
+    from prometheus_client import start_http_server
+
+    from config.metrics import get_registry
+
+    start_http_server(port, registry=get_registry())
+
+
+@beat_init.connect
+def start_beat_metrics_server(**kwargs):
+    """
+    Поднимает /metrics beat на BEAT_METRICS_PORT. С HABIT_REMINDER_INDEX тик напоминаний
+    выполняется в beat, и его метрики (enqueue, длительность тика) пишет этот процесс.
+    """
+    from django.conf import settings
+
+    port = getattr(settings, "BEAT_METRICS_PORT", 0)
+    if not port:
+        return
+
+    from prometheus_client import start_http_server
+
+    from config.metrics import get_registry
+
+    start_http_server(port, registry=get_registry())
+
+
+def close_db_connections(pools: bool = False) -> None:
+    """Закрывает открытые соединения с БД; pools=True — и пулы psycopg этого процесса."""
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+    if pools:
+        for conn in connections.all():
+            if hasattr(conn, "close_pool"):
+                conn.close_pool()
+
+
+@worker_init.connect
+def close_db_connections_before_fork(**kwargs):
+    """
+    Закрывает соединения и пулы главного процесса до запуска дочерних процессов prefork.
+
+    Иначе дети унаследуют открытый сокет (общий с родителем) и пул без потоков psycopg_pool.
+    Унаследованное после fork закрывает фикс Celery для Django (worker_process_init).
+    """
+    close_db_connections(pools=True)
+
+
+@task_prerun.connect
+@task_postrun.connect
+def close_old_db_connections(task=None, **kwargs):
+    """
+    До и после задачи — как Django до и после запроса: соединение переживает задачу, пока
+    не старше DB_CONN_MAX_AGE и без ошибок, а с пулом возвращается в пул. Eager-задачи
+    выполняются в коде вызывающего (и в его транзакции), их соединение не трогаем.
+    """
+    if not getattr(task.request, "is_eager", False):
+        close_old_connections()
+
+
+class BeatScheduler(PersistentScheduler):
+    """
+    PersistentScheduler, закрывающий устаревшие соединения с БД вокруг каждого тика.
+
+    beat работает неделями без запросов и задач, поэтому соединение, открытое в тике,
+    иначе не закрылось бы ни по DB_CONN_MAX_AGE, ни после ошибки или разрыва.
+
+    С HABIT_REMINDER_INDEX=True beat держит расписание напоминаний в памяти
+    (habits/reminder_index.py) и выполняет send_habit_reminders сам, без задачи и сканирования
+    БД. Пока индекс не загружен, задача отправляется воркерам как обычно.
+    """
+
+    reminder_index = None
+    reminder_listener = None
+
+    def setup_schedule(self):
+        super().setup_schedule()
+        from habits import reminder_index
+
+        if reminder_index.enabled() and self.reminder_index is None:
+            self.reminder_index, self.reminder_listener = reminder_index.start()
+
+    def tick(self, *args, **kwargs):
+        close_old_connections()
+        try:
+            return super().tick(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    def apply_entry(self, entry, producer=None):
+        from habits.reminder_index import REMINDER_TASK
+
+        if entry.task != REMINDER_TASK or self.reminder_index is None or not self.reminder_index.ready:
+            return super().apply_entry(entry, producer=producer)
+
+        from django.utils import timezone
+
+        from habits.services import enqueue_due_habits_from_index
+
+        try:
+            stats = enqueue_due_habits_from_index(self.reminder_index, timezone.now())
+        except Exception:
+            logger.exception("Scheduler: in-memory %s failed", entry.name)
+        else:
+            logger.info("Scheduler: %s from in-memory index: %s", entry.name, stats)
+
+    def close(self):
+        if self.reminder_listener is not None:
+            self.reminder_listener.stop()
+        super().close()
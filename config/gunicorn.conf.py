@@ -0,0 +1,18 @@
+# Настройки gunicorn, которые нельзя задать флагами командной строки
+import os
+
+# API_ASYNC_READS=True: ASGI-приложение на воркерах uvicorn, горячие GET — async-представления
+# (config/async_views.py); иначе WSGI и sync-воркеры. Число воркеров задаётся флагом --workers
+if os.getenv("API_ASYNC_READS", "False").lower() in {"1", "true", "yes", "on"}:
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+
+
+def child_exit(server, worker):
+    """Убирает живые gauge-файлы завершённого воркера в multiprocess-режиме Prometheus."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
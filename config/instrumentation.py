@@ -0,0 +1,161 @@
+"""
+Инструментирование SQL-запросов: число запросов, время в БД и самый медленный запрос.
+
+Включается настройкой QUERY_INSTRUMENTATION_ENABLED. Для HTTP-запросов работает
+QueryInstrumentationMiddleware (лог + заголовок Server-Timing), для Celery-задач из
+QUERY_INSTRUMENTATION_TASKS — обработчики сигналов task_prerun/task_postrun.
+При превышении порогов QUERY_ALERT_* пишется предупреждение.
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, Optional
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INSTRUMENTED_TASKS = (
+    "habits.tasks.send_habit_reminders",
+    "habits.tasks.send_single_habit_reminder",
+    "habits.tasks.send_habit_reminder_batch",
+)
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "QUERY_INSTRUMENTATION_ENABLED", False)
+
+
+class QueryStats:
+    """execute_wrapper, который считает запросы, их суммарное время и самый медленный запрос."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql: Optional[str] = None
+        self.started = time.perf_counter()
+        self._stack: Optional[ExitStack] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.db_time += duration
+            if duration > self.slowest_time:
+                self.slowest_time = duration
+                self.slowest_sql = sql
+
+    def start(self) -> "QueryStats":
+        """Подключает счётчик ко всем соединениям текущего потока."""
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self) -> float:
+        """Отключает счётчик и возвращает длительность в секундах."""
+        duration = time.perf_counter() - self.started
+        if self._stack is not None:
+            self._stack.close()
+            self._stack = None
+        return duration
+
+    def as_fields(self, duration: float) -> Dict[str, Any]:
+        return {
+            "query_count": self.count,
+            "db_time_ms": round(self.db_time * 1000, 2),
+            "slowest_query_ms": round(self.slowest_time * 1000, 2),
+            "slowest_query": self.slowest_sql,
+            "duration_ms": round(duration * 1000, 2),
+        }
+
+
+def _exceeded_thresholds(fields: Dict[str, Any]) -> list[str]:
+    thresholds = (
+        ("query_count", getattr(settings, "QUERY_ALERT_COUNT", 20)),
+        ("db_time_ms", getattr(settings, "QUERY_ALERT_DB_TIME_MS", 200)),
+        ("slowest_query_ms", getattr(settings, "QUERY_ALERT_SLOW_QUERY_MS", 100)),
+        ("duration_ms", getattr(settings, "QUERY_ALERT_DURATION_MS", 1000)),
+    )
+    return [f"{name}>{limit}" for name, limit in thresholds if limit and fields[name] > limit]
+
+
+def report(kind: str, name: str, stats: QueryStats, duration: float) -> Dict[str, Any]:
+    """Пишет замер в лог (поля передаются в extra) и предупреждает о превышении порогов."""
+    fields = {"kind": kind, "target": name, **stats.as_fields(duration)}
+    message = "%s %s: queries=%s db=%sms slowest=%sms duration=%sms"
+    args = (kind, name, fields["query_count"], fields["db_time_ms"], fields["slowest_query_ms"], fields["duration_ms"])
+
+    exceeded = _exceeded_thresholds(fields)
+    if exceeded:
+        fields["exceeded"] = exceeded
+        logger.warning(
+            message + " exceeded=%s slowest_sql=%s", *args, ",".join(exceeded), fields["slowest_query"], extra=fields
+        )
+    else:
+        logger.info(message, *args, extra=fields)
+    return fields
+
+
+def server_timing(fields: Dict[str, Any]) -> str:
+    return ", ".join(
+        [
+            f'db;dur={fields["db_time_ms"]};desc="{fields["query_count"]} queries"',
+            f'db-slowest;dur={fields["slowest_query_ms"]}',
+            f'app;dur={fields["duration_ms"]}',
+        ]
+    )
+
+
+class QueryInstrumentationMiddleware:
+    """Считает SQL-запросы на HTTP-запрос, логирует их и добавляет заголовок Server-Timing."""
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats().start()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = stats.stop()
+
+        match = getattr(request, "resolver_match", None)
+        name = match.view_name if match and match.view_name else request.path
+        fields = report("request", f"{request.method} {name}", stats, duration)
+        response["Server-Timing"] = server_timing(fields)
+        return response
+
+
+# Замеры выполняющихся задач: ключ — task_id (в prefork-воркере задачи одного процесса идут по очереди)
+_task_stats: Dict[str, QueryStats] = {}
+
+
+def _is_instrumented(task) -> bool:
+    tasks = getattr(settings, "QUERY_INSTRUMENTATION_TASKS", DEFAULT_INSTRUMENTED_TASKS)
+    return is_enabled() and task is not None and task.name in tasks
+
+
+@task_prerun.connect
+def start_task_instrumentation(task_id=None, task=None, **kwargs):
+    if _is_instrumented(task):
+        _task_stats[task_id] = QueryStats().start()
+
+
+@task_postrun.connect
+def finish_task_instrumentation(task_id=None, task=None, state=None, **kwargs):
+    stats = _task_stats.pop(task_id, None)
+    if stats is not None:
+        duration = stats.stop()
+        report("task", task.name, stats, duration)
@@ -0,0 +1,82 @@
+"""
+Метрики Prometheus конвейера напоминаний и эндпоинт /metrics.
+
+Если задана переменная окружения PROMETHEUS_MULTIPROC_DIR, значения пишутся в файлы этого
+каталога, а /metrics собирает их со всех процессов (воркеры gunicorn и Celery prefork).
+Каталог нужно очищать при старте сервиса; завершившиеся процессы помечаются через
+mark_process_dead (config/gunicorn.conf.py, сигнал worker_process_shutdown в config/celery.py).
+"""
+
+import os
+from datetime import datetime, time, timedelta, tzinfo
+from typing import Dict, Optional
+
+from django.http import HttpResponse
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REMINDER_EVENTS = Counter(
+    "habit_reminder_events_total",
+    "Результаты конвейера напоминаний: phase — enqueue/process, outcome — ключ stats.",
+    ["phase", "outcome"],
+)
+TICK_DURATION = Histogram(
+    "habit_reminder_tick_duration_seconds",
+    "Длительность тика enqueue_due_habits.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+BOT_API_LATENCY = Histogram(
+    "habit_reminder_bot_api_latency_seconds",
+    "Время запроса к API Telegram-бота: endpoint — send/send_batch, outcome — ok/http_error/error.",
+    ["endpoint", "outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+QUEUE_LAG = Histogram(
+    "habit_reminder_queue_lag_seconds",
+    "Задержка успешной отправки относительно запланированного времени привычки.",
+    buckets=(1, 5, 10, 20, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+
+def record_stats(phase: str, stats: Dict[str, int]) -> None:
+    """Переносит словарь stats (enqueued/skipped/sent/errors) в счётчики."""
+    for outcome, value in stats.items():
+        if value:
+            REMINDER_EVENTS.labels(phase=phase, outcome=outcome).inc(value)
+
+
+def observe_queue_lag(habit_time: time, sent_at: datetime, tz: Optional[tzinfo] = None) -> None:
+    """
+    Считает задержку от последнего слота привычки (не позже sent_at) до фактической отправки.
+
+    habit_time задано в поясе пользователя tz (по умолчанию — текущей зоне Django).
+    """
+    tz = tz or timezone.get_current_timezone()
+    sent_local = timezone.localtime(sent_at, tz)
+    scheduled = timezone.make_aware(datetime.combine(sent_local.date(), habit_time.replace(second=0)), tz)
+    if scheduled > sent_local:
+        scheduled = timezone.make_aware(
+            datetime.combine(sent_local.date() - timedelta(days=1), habit_time.replace(second=0)), tz
+        )
+    QUEUE_LAG.observe((sent_local - scheduled).total_seconds())
+
+
+def get_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """Отдаёт метрики в текстовом формате Prometheus."""
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
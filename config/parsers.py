@@ -0,0 +1,43 @@
+"""
+JSON-парсер на orjson с тем же результатом, что у rest_framework.parsers.JSONParser.
+
+orjson строгий (NaN/Infinity не принимает), как JSONParser при STRICT_JSON. То, что orjson
+не разбирает, но может принять стандартный json (одиночные суррогаты), и тела не в UTF-8
+разбираются стандартным JSONParser, поэтому набор принимаемых запросов и тексты ошибок
+не меняются. Целые больше 64 бит orjson молча превращает во float, поэтому тела с длинными
+последовательностями цифр тоже идут в JSONParser.
+"""
+
+import codecs
+import io
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+# 19 цифр подряд — возможно целое за пределами int64/uint64 (или просто длинная строка цифр).
+# Ищем через translate: цифры -> "0", остальное -> пробел; это на порядок быстрее регулярки
+_DIGITS_ONLY = bytes(ord("0") if chr(byte).isdigit() and byte < 128 else ord(" ") for byte in range(256))
+_LONG_NUMBER = b"0" * 19
+
+
+def _is_utf8(encoding: str) -> bool:
+    try:
+        return codecs.lookup(encoding).name == "utf-8"
+    except LookupError:
+        return False
+
+
+class ORJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        if not self.strict or not _is_utf8(parser_context.get("encoding") or settings.DEFAULT_CHARSET):
+            return super().parse(stream, media_type, parser_context)
+
+        raw = stream.read()
+        if _LONG_NUMBER in raw.translate(_DIGITS_ONLY):
+            return super().parse(io.BytesIO(raw), media_type, parser_context)
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(raw), media_type, parser_context)
@@ -0,0 +1,49 @@
+"""
+JSON-рендерер на orjson с тем же выводом, что у rest_framework.renderers.JSONRenderer.
+
+orjson сериализует dict/list/str/int/bool/None, UUID (и подклассы: ReturnDict, ErrorDetail) сам;
+datetime/date/time, Decimal и прочие типы передаются в encoder DRF, чтобы формат не изменился.
+Запросы с отступами (indent в Accept) и настройки, которые orjson не повторяет,
+рендерятся стандартным JSONRenderer. Собственные float в данных orjson может записать иначе
+(1e16 вместо 1e+16), но сериализаторы API их не отдают.
+"""
+
+import json
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class ORJSONRenderer(JSONRenderer):
+    def _default(self):
+        encode = self.encoder_class().default
+
+        def default(obj):
+            value = encode(obj)
+            # Decimal encoder DRF превращает во float — записываем его так же, как json.dumps
+            if isinstance(value, float):
+                return orjson.Fragment(json.dumps(value, allow_nan=not self.strict))
+            return value
+
+        return default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._default(), option=_OPTIONS)
+        except (orjson.JSONEncodeError, ValueError):
+            # Например, int больше 64 бит или NaN при STRICT_JSON — пусть решает стандартный json
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Как JSONRenderer: U+2028/U+2029 экранируются, чтобы JSON оставался подмножеством JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -34,21 +34,47 @@ INSTALLED_APPS = [
     "corsheaders",
 ]
 
+API_ORJSON = env_bool("API_ORJSON", True)
+
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.JWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
+    # JSON на orjson (config/renderers.py, config/parsers.py); API_ORJSON=False — стандартные классы DRF
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.ORJSONRenderer" if API_ORJSON else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.parsers.ORJSONParser" if API_ORJSON else "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # IP клиента для лимитов — адрес, добавленный в X-Forwarded-For последним из NUM_PROXIES прокси (nginx);
+    # без прокси перед приложением задайте API_NUM_PROXIES=0, иначе клиент подставит любой IP
+    "NUM_PROXIES": int(os.getenv("API_NUM_PROXIES", "1")),
+    # Лимиты входа, обновления токена и регистрации (users/throttling.py, скользящее окно в Redis)
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.getenv("AUTH_THROTTLE_LOGIN_IP", "20/min"),
+        "login_email": os.getenv("AUTH_THROTTLE_LOGIN_EMAIL", "10/min"),
+        "token_refresh_ip": os.getenv("AUTH_THROTTLE_TOKEN_REFRESH_IP", "60/min"),
+        "register_ip": os.getenv("AUTH_THROTTLE_REGISTER_IP", "10/hour"),
+    },
 }
 
+# Выключает лимиты users/throttling.py; в manage.py test они выключены (config/test_runner.py)
+AUTH_THROTTLE_ENABLED = env_bool("AUTH_THROTTLE_ENABLED", True)
+AUTH_THROTTLE_CACHE_ALIAS = "default"
+
 SWAGGER_SETTINGS = {
     "USE_SESSION_AUTH": False,
     "SECURITY_DEFINITIONS": {
@@ -64,9 +90,19 @@ SWAGGER_SETTINGS = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    # Токены с claims пользователя (users/tokens.py): id, is_active и привязка Telegram
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
 }
 
+# Пользователь из claims access-токена без чтения users.User на каждый запрос (users/authentication.py).
+# Активность сверяется с кешем процесса: деактивация в других процессах действует через AUTH_USER_STATUS_TTL секунд
+AUTH_STATELESS_JWT = env_bool("AUTH_STATELESS_JWT", True)
+AUTH_USER_STATUS_TTL = float(os.getenv("AUTH_USER_STATUS_TTL", "5"))
+
 MIDDLEWARE = [
+    # Первым, чтобы учесть запросы всех остальных middleware; без QUERY_INSTRUMENTATION отключается сам
+    "config.instrumentation.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -79,6 +115,8 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "config.urls"
 
+TEST_RUNNER = "config.test_runner.TestRunner"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -96,6 +134,20 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# GET списка и карточки привычки, публичной ленты и /api/users/detail/me/, вход и регистрация через
+# async-представления (config/async_views.py). Включать только под ASGI: под WSGI каждый такой запрос
+# поднимает event loop
+API_ASYNC_READS = env_bool("API_ASYNC_READS", False)
+
+# Переиспользование соединений с PostgreSQL.
+# DB_CONN_MAX_AGE — сколько секунд соединение живёт между запросами и задачами (0 — новое на каждый).
+# DB_POOL=True — пул psycopg 3 в каждом процессе; Django не совмещает его с постоянными соединениями,
+# поэтому CONN_MAX_AGE тогда 0. Под ASGI (API_ASYNC_READS) постоянные соединения тоже выключены:
+# запрос обслуживает новый поток, и его соединение не закрылось бы по CONN_MAX_AGE — там нужен пул.
+# DB_CONN_HEALTH_CHECKS проверяет переиспользуемое соединение (и соединение из пула) перед запросом.
+DB_POOL = env_bool("DB_POOL", False)
+DB_CONN_MAX_AGE = 0 if DB_POOL or API_ASYNC_READS else int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -104,9 +156,45 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": env_bool("DB_CONN_HEALTH_CHECKS", True),
+        "OPTIONS": (
+            {
+                "pool": {
+                    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                }
+            }
+            if DB_POOL
+            else {}
+        ),
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/2"),
+        "KEY_PREFIX": "habits",
+    }
+}
+
+# Время жизни закешированной страницы публичной ленты (страховка к инвалидации по поколениям)
+PUBLIC_FEED_CACHE_TIMEOUT = int(os.getenv("PUBLIC_FEED_CACHE_TIMEOUT", "300"))
+
+# Дельта-синхронизация (GET /api/habits/changes/): записей на поток за запрос,
+# окно перекрытия для поздних коммитов и срок хранения отметок об удалении
+HABIT_SYNC_PAGE_SIZE = int(os.getenv("HABIT_SYNC_PAGE_SIZE", "500"))
+HABIT_SYNC_OVERLAP_SECONDS = int(os.getenv("HABIT_SYNC_OVERLAP_SECONDS", "5"))
+HABIT_SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("HABIT_SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# JSON-списки привычек через values_list и orjson (habits/readers.py) вместо сериализатора на строку
+HABIT_FAST_READ_PATH = env_bool("HABIT_FAST_READ_PATH", True)
+
+# Максимум привычек в одном запросе пакетного API (/api/habits/bulk/)
+HABIT_BULK_MAX_ITEMS = int(os.getenv("HABIT_BULK_MAX_ITEMS", "100"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -124,6 +212,21 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "users.User"
 
+AUTHENTICATION_BACKENDS = ["users.backends.ModelBackend"]
+
+# Argon2id с параметрами OWASP (19 МиБ, 2 прохода, 1 поток): хеш на порядок дешевле PBKDF2 с 1 000 000 итераций
+# (benchmarks/password_hashing.py). Хеши PBKDF2 и хеши с прежними параметрами пересчитываются при входе
+PASSWORD_HASHERS = [
+    "users.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "19456"))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "1"))
+# Потоков хеширования в процессе под ASGI (0 — по числу ядер)
+PASSWORD_HASHING_THREADS = int(os.getenv("PASSWORD_HASHING_THREADS", "0")) or None
+
 LANGUAGE_CODE = "ru-Ru"
 
 TIME_ZONE = "Europe/Moscow"
@@ -151,18 +254,69 @@ CELERY_TASK_TRACK_STARTED = True
 
 CELERY_TASK_TIME_LIMIT = 30 * 60
 
+# Через сколько задач воркер Celery принудительно закрывает соединения с БД (и пул в prefork);
+# между ними соединение живёт по DB_CONN_MAX_AGE. 0 — закрывать после каждой задачи
+CELERY_DB_REUSE_MAX = int(os.getenv("CELERY_DB_REUSE_MAX", "1000")) or None
+
+# Планировщик beat закрывает устаревшие соединения вокруг каждого тика (config/celery.py)
+CELERY_BEAT_SCHEDULER = "config.celery:BeatScheduler"
+
+# Порт HTTP-сервера метрик Prometheus в главном процессе воркера; 0 — не запускать
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+# То же для beat: с HABIT_REMINDER_INDEX=True тик напоминаний и его метрики — в процессе beat
+BEAT_METRICS_PORT = int(os.getenv("BEAT_METRICS_PORT", "0"))
+
 CELERY_BEAT_SCHEDULE = {
     "send-habit-reminders": {
         "task": "habits.tasks.send_habit_reminders",
         "schedule": timedelta(minutes=1),  # Проверяем каждую минуту
     },
+    "prune-habit-tombstones": {
+        "task": "habits.tasks.prune_habit_tombstones",
+        "schedule": timedelta(hours=6),
+    },
+    # Слоты в поясах пользователей, где в ближайшие дни переводят часы (habits.services)
+    "reschedule-habit-reminders": {
+        "task": "habits.tasks.reschedule_habit_reminders",
+        "schedule": timedelta(hours=6),
+    },
 }
 
+# Размер пачки привычек на одну Celery-задачу; 0 — одна задача на привычку
+HABIT_REMINDER_BATCH_SIZE = int(os.getenv("HABIT_REMINDER_BATCH_SIZE", "0"))
+# Сколько строк beat читает из курсора за раз и ставит в очередь, прежде чем читать дальше
+HABIT_REMINDER_SCAN_CHUNK_SIZE = int(os.getenv("HABIT_REMINDER_SCAN_CHUNK_SIZE", "2000"))
+
+# Расписание напоминаний в памяти beat (habits/reminder_index.py): тик без чтения из БД.
+# Включать во всех процессах (API, воркеры, beat): они публикуют изменения привычек в канал Redis
+HABIT_REMINDER_INDEX = env_bool("HABIT_REMINDER_INDEX", False)
+HABIT_REMINDER_INDEX_REDIS_URL = os.getenv("HABIT_REMINDER_INDEX_REDIS_URL", CELERY_BROKER_URL)
+HABIT_REMINDER_INDEX_CHANNEL = os.getenv("HABIT_REMINDER_INDEX_CHANNEL", "habits:reminder-index")
+# Как часто beat перезагружает индекс из БД целиком, исправляя пропущенные изменения
+HABIT_REMINDER_INDEX_RECONCILE_SECONDS = int(os.getenv("HABIT_REMINDER_INDEX_RECONCILE_SECONDS", "900"))
+
+# Счётчик SQL-запросов для HTTP-запросов и задач напоминаний (config/instrumentation.py)
+QUERY_INSTRUMENTATION_ENABLED = env_bool("QUERY_INSTRUMENTATION", False)
+# Пороги предупреждений; 0 отключает порог
+QUERY_ALERT_COUNT = int(os.getenv("QUERY_ALERT_COUNT", "20"))
+QUERY_ALERT_DB_TIME_MS = float(os.getenv("QUERY_ALERT_DB_TIME_MS", "200"))
+QUERY_ALERT_SLOW_QUERY_MS = float(os.getenv("QUERY_ALERT_SLOW_QUERY_MS", "100"))
+QUERY_ALERT_DURATION_MS = float(os.getenv("QUERY_ALERT_DURATION_MS", "1000"))
+
 TELEGRAM_BOT_SECRET = os.getenv("TELEGRAM_BOT_SECRET")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 
 TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "http://127.0.0.1:8001")
 
+# Пул HTTP-соединений к API бота (TelegramNotificationService)
+TELEGRAM_HTTP_TIMEOUT = float(os.getenv("TELEGRAM_HTTP_TIMEOUT", "10"))
+TELEGRAM_HTTP_CONNECT_TIMEOUT = float(os.getenv("TELEGRAM_HTTP_CONNECT_TIMEOUT", "5"))
+TELEGRAM_HTTP_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_HTTP_MAX_CONNECTIONS", "10"))
+TELEGRAM_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("TELEGRAM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+TELEGRAM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("TELEGRAM_HTTP_KEEPALIVE_EXPIRY", "30"))
+# Сообщений в одном запросе POST /send-batch/ (лимит бота — TELEGRAM_SEND_BATCH_MAX_ITEMS)
+TELEGRAM_BULK_BATCH_SIZE = int(os.getenv("TELEGRAM_BULK_BATCH_SIZE", "100"))
+
 if not env_bool("DEBUG", True):
     FORCE_SCRIPT_NAME = "/habit"
     USE_X_FORWARDED_HOST = True
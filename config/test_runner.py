@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    manage.py test с выключенными лимитами входа (users/throttling.py): все запросы тестового
+    клиента идут с одного IP, а окна в Redis пережили бы тест. Тесты лимитов включают их сами.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.AUTH_THROTTLE_ENABLED = False
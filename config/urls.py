@@ -7,6 +7,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from config.metrics import metrics_view
+
 if getattr(settings, "FORCE_SCRIPT_NAME", None):
     set_script_prefix(settings.FORCE_SCRIPT_NAME)
 
@@ -32,6 +34,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/users/", include("users.urls")),
     path("api/habits/", include("habits.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
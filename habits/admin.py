@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.utils import timezone
 
 from habits.models import Habit
+from habits.services import schedule_next_reminder
 
 
 @admin.register(Habit)
@@ -17,4 +19,10 @@ class HabitAdmin(admin.ModelAdmin):
         "is_public",
         "created_at",
         "updated_at",
+        "next_reminder_at",
     )
+    readonly_fields = ("next_reminder_at",)
+
+    def save_model(self, request, obj, form, change):
+        schedule_next_reminder(obj, timezone.now())
+        super().save_model(request, obj, form, change)
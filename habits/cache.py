@@ -0,0 +1,162 @@
+"""
+Кеш ленты публичных привычек.
+
+В кеше лежат уже отрендеренные страницы ответа PublicListAPIView. Ключи версионируются
+счётчиком поколений: любое изменение публичных данных увеличивает счётчик (habits/signals.py),
+и старые страницы просто перестают читаться, пока не истечёт их TTL. Ошибки кеша не ломают
+ленту — запрос обслуживается из БД.
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "public-feed:generation"
+PAGE_KEY_PREFIX = "public-feed:page"
+# Валидаторы условных запросов хранятся вместе со страницей, чтобы 304 отдавался без БД
+CACHED_HEADERS = ("ETag", "Last-Modified")
+
+
+def _cache():
+    return caches[getattr(settings, "PUBLIC_FEED_CACHE_ALIAS", "default")]
+
+
+def get_generation() -> int:
+    generation = _cache().get(GENERATION_KEY)
+    if generation is None:
+        # add не перезапишет значение, если другой процесс успел создать счётчик раньше
+        _cache().add(GENERATION_KEY, 1, timeout=None)
+        generation = _cache().get(GENERATION_KEY, 1)
+    return generation
+
+
+async def aget_generation() -> int:
+    generation = await _cache().aget(GENERATION_KEY)
+    if generation is None:
+        await _cache().aadd(GENERATION_KEY, 1, timeout=None)
+        generation = await _cache().aget(GENERATION_KEY, 1)
+    return generation
+
+
+def bump_generation() -> None:
+    """Инвалидирует все закешированные страницы ленты."""
+    try:
+        try:
+            _cache().incr(GENERATION_KEY)
+        except ValueError:
+            _cache().add(GENERATION_KEY, 2, timeout=None)
+    except Exception:
+        logger.exception("public feed cache: generation bump failed")
+
+
+def _page_key(request) -> str:
+    # Ссылки next/previous абсолютные, поэтому хост и схема тоже входят в ключ
+    query = sorted(request.query_params.lists())
+    raw = f"{request.scheme}://{request.get_host()}{request.path}|{query}"
+    return f"{PAGE_KEY_PREFIX}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def _is_cacheable(request) -> bool:
+    # Browsable API содержит данные пользователя (имя, CSRF-токен) — кешируем только JSON
+    renderer = getattr(request, "accepted_renderer", None)
+    return renderer is not None and renderer.format == "json"
+
+
+def get_page(request) -> Optional[HttpResponse]:
+    """
+    Возвращает готовый ответ из кеша или None.
+
+    Поколение запоминается в request до чтения БД: если данные изменятся во время запроса,
+    страница сохранится под старым поколением и не будет прочитана.
+    """
+    request.public_feed_generation = None
+    if not _is_cacheable(request):
+        return None
+
+    try:
+        generation = get_generation()
+        cached = _cache().get(_page_key(request), version=generation)
+    except Exception:
+        logger.warning("public feed cache: read failed", exc_info=True)
+        return None
+
+    request.public_feed_generation = generation
+    return _cached_response(cached)
+
+
+async def aget_page(request) -> Optional[HttpResponse]:
+    """Async-вариант get_page для async-представления ленты."""
+    request.public_feed_generation = None
+    if not _is_cacheable(request):
+        return None
+
+    try:
+        generation = await aget_generation()
+        cached = await _cache().aget(_page_key(request), version=generation)
+    except Exception:
+        logger.warning("public feed cache: read failed", exc_info=True)
+        return None
+
+    request.public_feed_generation = generation
+    return _cached_response(cached)
+
+
+def _cached_response(cached) -> Optional[HttpResponse]:
+    if cached is None:
+        return None
+
+    content, content_type, headers = cached
+    response = HttpResponse(content, content_type=content_type)
+    for name, value in headers.items():
+        response[name] = value
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def store_page(request, response) -> None:
+    """Сохраняет отрендеренный ответ DRF в кеш (ответ рендерится здесь же)."""
+    generation = getattr(request, "public_feed_generation", None)
+    if generation is None:
+        return
+
+    try:
+        _cache().set(
+            _page_key(request),
+            _page_entry(response),
+            timeout=getattr(settings, "PUBLIC_FEED_CACHE_TIMEOUT", 300),
+            version=generation,
+        )
+    except Exception:
+        logger.warning("public feed cache: write failed", exc_info=True)
+        return
+    response["X-Cache"] = "MISS"
+
+
+async def astore_page(request, response) -> None:
+    generation = getattr(request, "public_feed_generation", None)
+    if generation is None:
+        return
+
+    try:
+        await _cache().aset(
+            _page_key(request),
+            _page_entry(response),
+            timeout=getattr(settings, "PUBLIC_FEED_CACHE_TIMEOUT", 300),
+            version=generation,
+        )
+    except Exception:
+        logger.warning("public feed cache: write failed", exc_info=True)
+        return
+    response["X-Cache"] = "MISS"
+
+
+def _page_entry(response) -> tuple:
+    response.render()
+    headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+    return response.content, response["Content-Type"], headers
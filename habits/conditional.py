@@ -0,0 +1,85 @@
+"""
+Валидаторы условных GET-запросов (ETag / Last-Modified) для привычек.
+
+Для объекта валидатор — его updated_at, для списка — max(updated_at) и count(*) одним
+агрегирующим запросом. Совпадение с If-None-Match / If-Modified-Since даёт 304 без сериализации.
+
+Списку отдаётся только ETag: строка, которая ушла из выборки (удалена, снята с публикации),
+не сдвигает max(updated_at), и Last-Modified по нему подтвердил бы устаревшую копию. В ETag
+такое изменение видно по count(*).
+"""
+
+import hashlib
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Optional, Tuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+Validators = Tuple[Optional[str], Optional[datetime]]
+
+
+def _etag(*parts) -> str:
+    raw = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def _representation_key(request) -> tuple:
+    # Один и тот же набор данных по-разному выглядит на разных страницах и в разных форматах
+    renderer = getattr(request, "accepted_renderer", None)
+    return request.get_full_path(), renderer.format if renderer else ""
+
+
+def object_validators(request, instance) -> Validators:
+    return _etag(instance.pk, instance.updated_at.isoformat(), *_representation_key(request)), instance.updated_at
+
+
+_LIST_STATE = {"last_modified": Max("updated_at"), "count": Count("id")}
+
+
+def list_validators(request, queryset, *scope) -> Validators:
+    """scope — то, что отличает выборку при одинаковом URL (например, id пользователя)."""
+    return _list_validators(request, queryset.order_by().aggregate(**_LIST_STATE), scope)
+
+
+async def alist_validators(request, queryset, *scope) -> Validators:
+    return _list_validators(request, await queryset.order_by().aaggregate(**_LIST_STATE), scope)
+
+
+def _list_validators(request, state: dict, scope) -> Validators:
+    last_modified = state["last_modified"]
+    etag = _etag(
+        last_modified.isoformat() if last_modified else "", state["count"], *scope, *_representation_key(request)
+    )
+    return etag, None
+
+
+def not_modified_response(request, validators: Validators):
+    """Возвращает ответ 304 (или 412 для If-Match), если клиентская копия актуальна, иначе None."""
+    etag, last_modified = validators
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def validators_from_headers(response) -> Validators:
+    """Валидаторы уже готового ответа (например, страницы из кеша)."""
+    timestamp = parse_http_date_safe(response.get("Last-Modified", ""))
+    last_modified = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc) if timestamp is not None else None
+    return response.get("ETag"), last_modified
+
+
+def set_validators(response, validators: Validators):
+    etag, last_modified = validators
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
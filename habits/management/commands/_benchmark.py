@@ -0,0 +1,32 @@
+"""Общие помощники management-команд benchmark_*."""
+
+import json
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+
+
+class Rollback(Exception):
+    """Выбрасывается в конце transaction.atomic(), чтобы откатить синтетические данные."""
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def write_report(report: dict, output: str | None, name: str) -> Path:
+    """Пишет JSON-отчёт; по умолчанию в benchmarks/results/<name>_<commit>.json."""
+    if output is None:
+        commit = (report.get("commit") or "nocommit")[:8]
+        output = Path(settings.BASE_DIR) / "benchmarks" / "results" / f"{name}_{commit}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    return output
@@ -0,0 +1,141 @@
+import io
+import statistics
+import time as time_module
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config.parsers import ORJSONParser
+from config.renderers import ORJSONRenderer
+from habits.management.commands._benchmark import git_commit, write_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк JSON API: стандартные JSONRenderer/JSONParser DRF против ORJSONRenderer/ORJSONParser "
+        "(config/renderers.py, config/parsers.py). Проверяет, что результаты совпадают."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Элементов в одном документе.")
+        parser.add_argument("--repeat", type=int, default=50, help="Повторов на вариант (берётся медиана).")
+        parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+
+    def handle(self, *args, **options):
+        if options["rows"] <= 0:
+            raise CommandError("--rows должно быть больше 0")
+
+        rows, repeat = options["rows"], options["repeat"]
+        page = self._habit_page(rows)
+        documents = {
+            # Страница списка: готовые строки, как после сериализаторов
+            "habit_page": page,
+            # Значения, которые рендерер передаёт в encoder DRF
+            "typed": [
+                {"at": timezone.now(), "amount": Decimal("12.50"), "uid": uuid.uuid4(), "delay": timedelta(seconds=i)}
+                for i in range(rows)
+            ],
+        }
+
+        report = {"commit": git_commit(), "params": {"rows": rows, "repeat": repeat}, "results": []}
+
+        for name, data in documents.items():
+            report["results"].extend(
+                self._compare(
+                    "render",
+                    name,
+                    [
+                        ("stdlib", lambda: JSONRenderer().render(data)),
+                        ("orjson", lambda: ORJSONRenderer().render(data)),
+                    ],
+                    repeat,
+                )
+            )
+
+        body = JSONRenderer().render(page["results"])
+        report["results"].extend(
+            self._compare(
+                "parse",
+                "habit_list",
+                [
+                    ("stdlib", lambda: JSONParser().parse(io.BytesIO(body), "application/json")),
+                    ("orjson", lambda: ORJSONParser().parse(io.BytesIO(body), "application/json")),
+                ],
+                repeat,
+                size=len(body),
+            )
+        )
+
+        output = write_report(report, options["output"], f"json_{rows}")
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {output}"))
+
+    @staticmethod
+    def _habit_page(rows):
+        now = datetime(2030, 1, 1, 7, 30)
+        return OrderedDict(
+            [
+                ("count", rows),
+                ("next", "http://testserver/api/habits/?page=2"),
+                ("previous", None),
+                (
+                    "results",
+                    [
+                        {
+                            "id": i,
+                            "related_habit": i - 1 if i % 2 else None,
+                            "place": "Парк «Сокольники»",
+                            "time": "07:30:00",
+                            "action": f"Пробежка {i}",
+                            "is_pleasant": False,
+                            "frequency": i % 7 + 1,
+                            "reward": None if i % 2 else "Кофе",
+                            "duration": 60,
+                            "is_public": bool(i % 3),
+                            "created_at": (now + timedelta(seconds=i)).isoformat() + "+03:00",
+                            "updated_at": (now + timedelta(seconds=i)).isoformat() + "+03:00",
+                            "last_reminder": None,
+                            "next_reminder_at": (now + timedelta(days=1)).isoformat() + "+03:00",
+                        }
+                        for i in range(rows)
+                    ],
+                ),
+            ]
+        )
+
+    def _compare(self, operation, document, variants, repeat, size=None):
+        results, outputs = [], []
+        for backend, run in variants:
+            timings = []
+            for _ in range(repeat):
+                started = time_module.perf_counter()
+                output = run()
+                timings.append(time_module.perf_counter() - started)
+            outputs.append(output)
+
+            median = statistics.median(timings)
+            payload = size if size is not None else len(output)
+            result = {
+                "operation": operation,
+                "document": document,
+                "backend": backend,
+                "bytes": payload,
+                "median_ms": round(median * 1000, 3),
+                "ops_per_second": round(1 / median, 1),
+                "mb_per_second": round(payload / median / 1_000_000, 1),
+            }
+            results.append(result)
+            self.stdout.write(
+                f"{operation:<6} {document:<10} {backend:<6} median={result['median_ms']:.3f}ms "
+                f"MB/s={result['mb_per_second']}"
+            )
+
+        if outputs[0] != outputs[1]:
+            raise CommandError(f"{operation} {document}: результаты stdlib и orjson различаются")
+        results[1]["speedup"] = round(results[0]["median_ms"] / results[1]["median_ms"], 2)
+        return results
@@ -0,0 +1,129 @@
+import json
+import secrets
+import statistics
+import time as time_module
+from datetime import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from habits.management.commands._benchmark import Rollback, git_commit, write_report
+from habits.models import Habit
+from habits.paginators import KeysetPagination
+from users.models import User
+
+SEED_BATCH_SIZE = 5000
+
+ENDPOINTS = {
+    "habits": ("/api/habits/", {}),
+    "public": ("/api/habits/public/", {"is_public": True}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк пагинации списков привычек: сравнивает время ответа постраничного режима "
+        "(COUNT + OFFSET) и курсорного (?pagination=cursor) на разной глубине. Данные откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habits", type=int, default=20_000, help="Количество привычек одного пользователя.")
+        parser.add_argument("--pages", default="1,10,100,1000,3000", help="Номера страниц для замера через запятую.")
+        parser.add_argument("--repeat", type=int, default=5, help="Повторов на точку (берётся медиана).")
+        parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+
+    def handle(self, *args, **options):
+        try:
+            pages = sorted({int(value) for value in options["pages"].split(",") if value.strip()})
+        except ValueError as e:
+            raise CommandError(f"Некорректное значение --pages: {e}")
+
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        max_page = (options["habits"] - 1) // page_size + 1
+        pages = [page for page in pages if 1 <= page <= max_page]
+        if not pages:
+            raise CommandError(f"Нет страниц в диапазоне 1..{max_page}")
+
+        report = {
+            "commit": git_commit(),
+            "db_vendor": connection.vendor,
+            "params": {"habits": options["habits"], "page_size": page_size, "repeat": options["repeat"]},
+            "results": [],
+        }
+
+        # Кеш публичной ленты отключён, иначе повторы замеряли бы Redis, а не БД
+        with override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+            ALLOWED_HOSTS=["testserver"],
+        ):
+            try:
+                with transaction.atomic():
+                    user = self._seed(options["habits"])
+                    client = APIClient()
+                    client.force_authenticate(user)
+
+                    for endpoint, (url, filters) in ENDPOINTS.items():
+                        queryset = Habit.objects.filter(user=user, **filters).order_by(*KeysetPagination.ordering)
+                        for page in pages:
+                            report["results"].extend(
+                                self._measure_page(client, endpoint, url, queryset, page, page_size, options["repeat"])
+                            )
+                    raise Rollback
+            except Rollback:
+                pass
+
+        output = write_report(report, options["output"], f"pagination_{options['habits']}")
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {output}"))
+
+    def _seed(self, count):
+        user = User.objects.create(email=f"bench-{secrets.token_hex(4)}@example.com", password="!")
+        batch = []
+        for i in range(count):
+            batch.append(Habit(user=user, place="Дом", time=time(9, 0), action=f"Привычка {i}", is_public=True))
+            if len(batch) >= SEED_BATCH_SIZE:
+                Habit.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Habit.objects.bulk_create(batch)
+        return user
+
+    def _measure_page(self, client, endpoint, url, queryset, page, page_size, repeat):
+        cursor_params = {"pagination": "cursor"}
+        if page > 1:
+            # Курсор, который клиент получил бы в ссылке next предыдущей страницы
+            anchor = queryset[(page - 1) * page_size - 1]
+            cursor_params["cursor"] = KeysetPagination.encode_cursor(anchor.created_at, anchor.pk)
+
+        results = []
+        for mode, params in (("page", {"page": page}), ("cursor", cursor_params)):
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time_module.perf_counter()
+                    response = client.get(url, params)
+                    timings.append(time_module.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f"{endpoint} {mode} page={page}: HTTP {response.status_code}")
+
+            ids = [item["id"] for item in json.loads(response.content)["results"]]
+            result = {
+                "endpoint": endpoint,
+                "mode": mode,
+                "page": page,
+                "median_ms": round(statistics.median(timings) * 1000, 2),
+                "queries": len(queries.captured_queries),
+                "first_id": ids[0] if ids else None,
+            }
+            results.append(result)
+            self.stdout.write(
+                f"{endpoint:<7} {mode:<6} page={page:<6} median={result['median_ms']:.2f}ms "
+                f"queries={result['queries']}"
+            )
+
+        # Оба режима должны вернуть одну и ту же страницу
+        if results[0]["first_id"] != results[1]["first_id"]:
+            raise CommandError(f"{endpoint} page={page}: режимы вернули разные страницы")
+        return results
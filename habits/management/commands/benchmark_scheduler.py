@@ -0,0 +1,363 @@
+import json
+import logging
+import random
+import resource
+import secrets
+import time as time_module
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from functools import partial
+from pathlib import Path
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from habits.management.commands._benchmark import Rollback, git_commit, write_report
+from habits.models import Habit
+from habits.reminder_index import ReminderIndex
+from habits.services import (
+    DUE_HABIT_FIELDS,
+    calculate_next_reminder_at,
+    enqueue_due_habits,
+    enqueue_due_habits_from_index,
+    process_habit_batch,
+    process_single_habit,
+)
+from users.models import User
+
+SEED_BATCH_SIZE = 5000
+
+# Реалистичное распределение времени: большинство привычек — на круглые часы утром и вечером
+PEAK_HOURS = (7, 8, 9, 10, 18, 19, 20, 21)
+FREQUENCY_WEIGHTS = {1: 60, 2: 10, 3: 10, 5: 5, 7: 15}
+
+
+class _StubTask:
+    """Заглушка Celery-задачи: запоминает аргументы apply_async вместо отправки в брокер."""
+
+    def __init__(self):
+        self.calls = []
+
+    def apply_async(self, args=None, task_id=None, **kwargs):
+        self.calls.append((args, task_id))
+
+
+class _StubTelegramService:
+    """Заглушка TelegramNotificationService: все отправки успешны, без сети."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, telegram_id, message):
+        self.sent += 1
+        return True
+
+    def send_messages_bulk(self, messages):
+        self.sent += len(messages)
+        return [True] * len(messages)
+
+
+def _random_habit_time(rng: random.Random) -> time:
+    roll = rng.random()
+    if roll < 0.6:
+        return time(rng.choice(PEAK_HOURS), 0)
+    if roll < 0.8:
+        return time(rng.choice(PEAK_HOURS), 30)
+    return time(rng.randrange(24), rng.randrange(60))
+
+
+def _rows_scanned(now: datetime) -> tuple[int | None, str]:
+    """Сколько строк прочитал запрос get_due_habits: EXPLAIN ANALYZE в Postgres, оценка по плану в SQLite."""
+    qs = Habit.objects.filter(next_reminder_at__lte=now).order_by("next_reminder_at").values(*DUE_HABIT_FIELDS)
+    sql, params = qs.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            def walk(node):
+                own = 0
+                if "Scan" in node["Node Type"]:
+                    loops = node.get("Actual Loops", 1)
+                    own = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+                return own + sum(walk(child) for child in node.get("Plans", []))
+
+            return walk(plan[0]["Plan"]), "explain_analyze"
+
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            details = " ".join(str(row[-1]) for row in cursor.fetchall())
+            if "SEARCH habits_habit" in details:
+                return qs.count(), "plan_estimate"
+            return Habit.objects.count(), "plan_estimate"
+
+    return None, "unsupported"
+
+
+@contextmanager
+def _measure(trace_memory: bool = True):
+    """Замеряет время, SQL-запросы и пиковую память Python (tracemalloc) внутри блока."""
+    result = {"peak_memory_bytes": None}
+    if trace_memory:
+        tracemalloc.start()
+    started = time_module.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        yield result
+    result["wall_time_s"] = round(time_module.perf_counter() - started, 4)
+    if trace_memory:
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result["queries"] = len(queries.captured_queries)
+    result["db_time_s"] = round(sum(float(q["time"]) for q in queries.captured_queries), 4)
+
+
+def _kib(value: int | None) -> str:
+    return "-" if value is None else f"{value / 1024:.0f}KiB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк планировщика напоминаний: создаёт синтетических пользователей и привычки, "
+        "замеряет тики enqueue_due_habits (и обработку задач) и сохраняет результат в JSON. "
+        "Celery и TelegramNotificationService заменяются заглушками; данные откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habits", type=int, default=10_000, help="Количество привычек.")
+        parser.add_argument(
+            "--users", type=int, default=None, help="Количество пользователей (по умолчанию habits/5)."
+        )
+        parser.add_argument(
+            "--ticks",
+            default="09:00,09:01,13:37",
+            help="Минуты для замера тиков через запятую (HH:MM, локальное время).",
+        )
+        parser.add_argument("--batch-size", type=int, default=None, help="HABIT_REMINDER_BATCH_SIZE для прогона.")
+        parser.add_argument(
+            "--process", action="store_true", help="Дополнительно выполнить поставленные задачи (заглушка Telegram)."
+        )
+        parser.add_argument(
+            "--no-trace-memory",
+            action="store_true",
+            help="Не включать tracemalloc (он заметно замедляет Python-код и искажает wall time).",
+        )
+        parser.add_argument(
+            "--index",
+            action="store_true",
+            help="Тики по расписанию в памяти beat (HABIT_REMINDER_INDEX): замер загрузки индекса и тиков без чтения.",
+        )
+        parser.add_argument("--linked-ratio", type=float, default=0.85, help="Доля пользователей с Telegram.")
+        parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных.")
+        parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+        parser.add_argument("--baseline", default=None, help="JSON прошлого прогона для сравнения.")
+
+    def handle(self, *args, **options):
+        if options["habits"] < 1:
+            raise CommandError("--habits должно быть больше 0")
+
+        try:
+            ticks = [time.fromisoformat(value.strip()) for value in options["ticks"].split(",") if value.strip()]
+        except ValueError as e:
+            raise CommandError(f"Некорректное значение --ticks: {e}")
+
+        batch_size = options["batch_size"]
+        if batch_size is None:
+            batch_size = getattr(settings, "HABIT_REMINDER_BATCH_SIZE", 0)
+
+        # Логи по каждой привычке искажают замеры и засоряют вывод
+        services_logger = logging.getLogger("habits.services")
+        previous_level = services_logger.level
+        services_logger.setLevel(logging.ERROR)
+
+        try:
+            with override_settings(HABIT_REMINDER_BATCH_SIZE=batch_size):
+                report = self._run(options, ticks, batch_size)
+        finally:
+            services_logger.setLevel(previous_level)
+
+        self._write_report(report, options)
+
+    def _run(self, options, ticks, batch_size):
+        rng = random.Random(options["seed"])
+        day = timezone.localdate()
+        first_tick = timezone.make_aware(datetime.combine(day, ticks[0]), timezone.get_current_timezone())
+
+        report = {
+            "commit": git_commit(),
+            "created_at": timezone.now().isoformat(),
+            "db_vendor": connection.vendor,
+            "params": {
+                "habits": options["habits"],
+                "users": options["users"] or max(1, options["habits"] // 5),
+                "ticks": [tick.strftime("%H:%M") for tick in ticks],
+                "batch_size": batch_size,
+                "process": options["process"],
+                "index": options["index"],
+                "trace_memory": not options["no_trace_memory"],
+                "linked_ratio": options["linked_ratio"],
+                "seed": options["seed"],
+            },
+            "results": [],
+        }
+
+        try:
+            with transaction.atomic():
+                seed_started = time_module.perf_counter()
+                self._seed(rng, report["params"], first_tick - timedelta(minutes=1))
+                report["seed_time_s"] = round(time_module.perf_counter() - seed_started, 2)
+                self.stdout.write(f"Seeded {options['habits']} habits in {report['seed_time_s']}s")
+
+                index = None
+                if options["index"]:
+                    index = ReminderIndex()
+                    with _measure(not options["no_trace_memory"]) as load_result:
+                        index.load()
+                    report["index_load"] = {**load_result, "habits": len(index.habits), "buckets": len(index.buckets)}
+                    self.stdout.write(
+                        f"Index loaded: wall={load_result['wall_time_s']:.3f}s queries={load_result['queries']} "
+                        f"peak_mem={_kib(load_result['peak_memory_bytes'])} buckets={len(index.buckets)}"
+                    )
+
+                for tick in ticks:
+                    now = timezone.make_aware(datetime.combine(day, tick), timezone.get_current_timezone())
+                    report["results"].extend(
+                        self._run_tick(now, options["process"], not options["no_trace_memory"], index)
+                    )
+
+                raise Rollback
+        except Rollback:
+            pass
+
+        report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return report
+
+    def _seed(self, rng, params, reference):
+        token = secrets.token_hex(4)
+        users = [
+            User(
+                email=f"bench-{token}-{i}@example.com",
+                password="!",
+                telegram_id=str(10_000_000 + i) if rng.random() < params["linked_ratio"] else None,
+            )
+            for i in range(params["users"])
+        ]
+        users = User.objects.bulk_create(users, batch_size=SEED_BATCH_SIZE)
+
+        frequencies = list(FREQUENCY_WEIGHTS)
+        weights = list(FREQUENCY_WEIGHTS.values())
+        batch = []
+        for i in range(params["habits"]):
+            habit_time = _random_habit_time(rng)
+            frequency = rng.choices(frequencies, weights)[0]
+            last_reminder = None
+            if rng.random() < 0.8:
+                last_reminder = reference - timedelta(days=rng.randrange(1, 8))
+            batch.append(
+                Habit(
+                    user=users[rng.randrange(len(users))],
+                    place="Дом",
+                    time=habit_time,
+                    action=f"Привычка {i}",
+                    frequency=frequency,
+                    last_reminder=last_reminder,
+                    # Состояние «как после предыдущих тиков»: слоты до reference уже обработаны
+                    next_reminder_at=calculate_next_reminder_at(habit_time, frequency, last_reminder, reference),
+                )
+            )
+            if len(batch) >= SEED_BATCH_SIZE:
+                Habit.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Habit.objects.bulk_create(batch)
+
+    def _run_tick(self, now, process, trace_memory, index=None):
+        single_task, batch_task = _StubTask(), _StubTask()
+        enqueue = enqueue_due_habits if index is None else partial(enqueue_due_habits_from_index, index)
+
+        telegram = _StubTelegramService()
+
+        with (
+            patch("habits.tasks.send_single_habit_reminder", single_task),
+            patch("habits.tasks.send_habit_reminder_batch", batch_task),
+            patch("habits.services.get_telegram_service", return_value=telegram),
+        ):
+            # Незамеряемый тик минутой раньше: слоты между тиками считаются уже обработанными,
+            # и замер показывает установившийся режим, а не догон пропущенных минут
+            enqueue(now - timedelta(minutes=1))
+            single_task.calls.clear()
+            batch_task.calls.clear()
+
+            # По индексу тик читает только наступившие корзины в памяти
+            rows_scanned, rows_source = _rows_scanned(now) if index is None else (0, "index")
+
+            with _measure(trace_memory) as enqueue_result:
+                stats = enqueue(now)
+
+            results = [
+                {
+                    "tick": now.strftime("%H:%M"),
+                    "phase": "enqueue",
+                    **enqueue_result,
+                    "rows_scanned": rows_scanned,
+                    "rows_scanned_source": rows_source,
+                    "tasks": len(single_task.calls) + len(batch_task.calls),
+                    "stats": stats,
+                }
+            ]
+
+            if process:
+                totals = {"sent": 0, "skipped": 0, "errors": 0}
+                with _measure(trace_memory) as process_result:
+                    for args, _ in single_task.calls:
+                        for key, value in process_single_habit(args[0], now).items():
+                            totals[key] += value
+                    for args, _ in batch_task.calls:
+                        for key, value in process_habit_batch(args[0], now).items():
+                            totals[key] += value
+                results.append(
+                    {
+                        "tick": now.strftime("%H:%M"),
+                        "phase": "process",
+                        **process_result,
+                        "telegram_sent": telegram.sent,
+                        "stats": totals,
+                    }
+                )
+
+        for result in results:
+            self.stdout.write(
+                f"{result['tick']} {result['phase']:<8} wall={result['wall_time_s']:.3f}s "
+                f"queries={result['queries']} db={result['db_time_s']:.3f}s "
+                f"peak_mem={_kib(result['peak_memory_bytes'])} "
+                f"rows_scanned={result.get('rows_scanned', '-')} stats={result['stats']}"
+            )
+        return results
+
+    def _write_report(self, report, options):
+        output = write_report(report, options["output"], f"scheduler_{report['params']['habits']}")
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {output}"))
+
+        if options["baseline"]:
+            self._compare(report, json.loads(Path(options["baseline"]).read_text()))
+
+    def _compare(self, report, baseline):
+        previous = {(r["tick"], r["phase"]): r for r in baseline.get("results", [])}
+        self.stdout.write(f"Compared with {baseline.get('commit') or 'baseline'}:")
+        for result in report["results"]:
+            old = previous.get((result["tick"], result["phase"]))
+            if old is None:
+                continue
+            self.stdout.write(
+                f"{result['tick']} {result['phase']:<8} "
+                f"wall {old['wall_time_s']:.3f}s -> {result['wall_time_s']:.3f}s, "
+                f"queries {old['queries']} -> {result['queries']}, "
+                f"peak_mem {_kib(old['peak_memory_bytes'])} -> {_kib(result['peak_memory_bytes'])}"
+            )
@@ -0,0 +1,135 @@
+import secrets
+import statistics
+import time as time_module
+from datetime import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import ORJSONRenderer
+from habits.management.commands._benchmark import Rollback, git_commit, write_report
+from habits.models import Habit
+from habits.readers import get_reader
+from habits.serializers import HabitPublicSerializer, HabitSerializer
+from users.models import User
+
+SEED_BATCH_SIZE = 5000
+
+SERIALIZERS = {
+    "habit": (HabitSerializer, {}),
+    "public": (HabitPublicSerializer, {"is_public": True}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк чтения списков: DRF-сериализатор + JSONRenderer против values_list + ValuesReader + "
+        "ORJSONRenderer (habits/readers.py). Считает строки в секунду и проверяет, что байты совпадают. "
+        "Данные откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Строк в одном рендере (как размер страницы).")
+        parser.add_argument("--repeat", type=int, default=20, help="Повторов на вариант (берётся медиана).")
+        parser.add_argument("--output", default=None, help="Путь к JSON с результатами.")
+
+    def handle(self, *args, **options):
+        if options["rows"] <= 0:
+            raise CommandError("--rows должно быть больше 0")
+
+        report = {
+            "commit": git_commit(),
+            "db_vendor": connection.vendor,
+            "params": {"rows": options["rows"], "repeat": options["repeat"]},
+            "results": [],
+        }
+
+        try:
+            with transaction.atomic():
+                user = self._seed(options["rows"])
+                for name, (serializer_class, filters) in SERIALIZERS.items():
+                    queryset = Habit.objects.filter(user=user, **filters).order_by("-created_at", "-id")
+                    report["results"].extend(self._measure(name, serializer_class, queryset, options["repeat"]))
+                raise Rollback
+        except Rollback:
+            pass
+
+        output = write_report(report, options["output"], f"serializers_{options['rows']}")
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {output}"))
+
+    def _seed(self, count):
+        user = User.objects.create(email=f"bench-{secrets.token_hex(4)}@example.com", password="!")
+        pleasant = Habit.objects.create(user=user, place="Дом", time=time(9, 0), action="Ванна", is_pleasant=True)
+        now = timezone.now()
+        batch = []
+        for i in range(count):
+            batch.append(
+                Habit(
+                    user=user,
+                    place="Парк",
+                    time=time(7, i % 60),
+                    action=f"Пробежка {i}",
+                    related_habit=pleasant if i % 2 else None,
+                    reward=None if i % 2 else "Кофе",
+                    is_public=True,
+                    last_reminder=now if i % 3 else None,
+                    next_reminder_at=now,
+                )
+            )
+            if len(batch) >= SEED_BATCH_SIZE:
+                Habit.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Habit.objects.bulk_create(batch)
+        return user
+
+    def _measure(self, name, serializer_class, queryset, repeat):
+        reader = get_reader(serializer_class)
+
+        def drf_path():
+            rows = list(queryset.all())
+            started = time_module.perf_counter()
+            content = JSONRenderer().render(serializer_class(rows, many=True).data)
+            return content, started
+
+        def values_path():
+            rows = list(reader.values(queryset))
+            started = time_module.perf_counter()
+            content = ORJSONRenderer().render(reader.to_representation(rows))
+            return content, started
+
+        results = []
+        contents = []
+        for mode, run in (("drf", drf_path), ("values", values_path)):
+            total, serialize = [], []
+            for _ in range(repeat):
+                started = time_module.perf_counter()
+                content, serialize_started = run()
+                finished = time_module.perf_counter()
+                total.append(finished - started)
+                serialize.append(finished - serialize_started)
+            contents.append(content)
+
+            rows = queryset.count()
+            result = {
+                "serializer": name,
+                "mode": mode,
+                "rows": rows,
+                "median_total_ms": round(statistics.median(total) * 1000, 2),
+                "median_serialize_ms": round(statistics.median(serialize) * 1000, 2),
+                "rows_per_second": round(rows / statistics.median(total)),
+                "serialize_rows_per_second": round(rows / statistics.median(serialize)),
+                "bytes": len(content),
+            }
+            results.append(result)
+            self.stdout.write(
+                f"{name:<7} {mode:<7} total={result['median_total_ms']:.2f}ms "
+                f"serialize+render={result['median_serialize_ms']:.2f}ms rows/s={result['rows_per_second']}"
+            )
+
+        if contents[0] != contents[1]:
+            raise CommandError(f"{name}: ответы DRF и ValuesReader различаются")
+        results[1]["speedup"] = round(results[1]["rows_per_second"] / results[0]["rows_per_second"], 2)
+        return results
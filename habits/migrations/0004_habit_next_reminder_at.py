@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-17 10:00
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _combine_local(day, habit_time):
+    naive = datetime.combine(day, habit_time.replace(second=0, microsecond=0))
+    return timezone.make_aware(naive, timezone.get_current_timezone())
+
+
+def _next_reminder_at(habit, now_local):
+    # Копия habits.services.calculate_next_reminder_at: миграции не должны зависеть от кода приложения
+    if habit.frequency is None:
+        return None
+
+    day = now_local.date()
+    if habit.last_reminder is not None:
+        last_reminder_local = timezone.localtime(habit.last_reminder)
+        day = max(day, last_reminder_local.date() + timedelta(days=habit.frequency))
+
+    candidate = _combine_local(day, habit.time)
+    if candidate <= now_local:
+        candidate = _combine_local(day + timedelta(days=1), habit.time)
+    return candidate
+
+
+def backfill_next_reminder_at(apps, schema_editor):
+    Habit = apps.get_model("habits", "Habit")
+    now_local = timezone.localtime(timezone.now())
+
+    batch = []
+    for habit in Habit.objects.only("id", "time", "frequency", "last_reminder").iterator(
+        chunk_size=BACKFILL_BATCH_SIZE
+    ):
+        habit.next_reminder_at = _next_reminder_at(habit, now_local)
+        batch.append(habit)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Habit.objects.bulk_update(batch, ["next_reminder_at"])
+            batch = []
+
+    if batch:
+        Habit.objects.bulk_update(batch, ["next_reminder_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0003_habit_last_reminder"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="next_reminder_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Следующее напоминание"),
+        ),
+        migrations.RunPython(backfill_next_reminder_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                condition=models.Q(("next_reminder_at__isnull", False)),
+                fields=["next_reminder_at"],
+                name="habit_next_reminder_at_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-17 01:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0005_habit_list_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitTombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("habit_id", models.BigIntegerField(verbose_name="ID удалённой привычки")),
+                ("deleted_at", models.DateTimeField(verbose_name="Дата удаления")),
+            ],
+            options={
+                "verbose_name": "Удалённая привычка",
+                "verbose_name_plural": "Удалённые привычки",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(fields=["user", "updated_at", "id"], name="habit_user_updated_idx"),
+        ),
+        migrations.AddField(
+            model_name="habittombstone",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name="Пользователь"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habittombstone",
+            index=models.Index(fields=["user", "deleted_at", "id"], name="tombstone_user_deleted_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="habittombstone",
+            index=models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ),
+    ]
@@ -23,6 +23,7 @@ class Habit(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_reminder = models.DateTimeField(null=True, blank=True)
+    next_reminder_at = models.DateTimeField(null=True, blank=True, verbose_name="Следующее напоминание")
 
     def __str__(self):
         return f"{self.user} - {self.action}"
@@ -30,3 +31,39 @@ class Habit(models.Model):
     class Meta:
         verbose_name = "Привычка"
         verbose_name_plural = "Привычки"
+        indexes = [
+            # Частичный индекс: beat-задача ищет только запланированные привычки (next_reminder_at <= now)
+            models.Index(
+                fields=["next_reminder_at"],
+                name="habit_next_reminder_at_idx",
+                condition=models.Q(next_reminder_at__isnull=False),
+            ),
+            # Списки привычек сортируются по (-created_at, -id); индексы обслуживают и курсорную пагинацию
+            models.Index(fields=["user", "created_at", "id"], name="habit_user_created_idx"),
+            models.Index(
+                fields=["created_at", "id"],
+                name="habit_public_created_idx",
+                condition=models.Q(is_public=True),
+            ),
+            # Дельта-синхронизация (GET /api/habits/changes/) читает изменения по (updated_at, id)
+            models.Index(fields=["user", "updated_at", "id"], name="habit_user_updated_idx"),
+        ]
+
+
+class HabitTombstone(models.Model):
+    """Отметка об удалённой привычке для дельта-синхронизации; старые отметки удаляются задачей."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="Пользователь")
+    habit_id = models.BigIntegerField(verbose_name="ID удалённой привычки")
+    deleted_at = models.DateTimeField(verbose_name="Дата удаления")
+
+    def __str__(self):
+        return f"{self.user} - {self.habit_id}"
+
+    class Meta:
+        verbose_name = "Удалённая привычка"
+        verbose_name_plural = "Удалённые привычки"
+        indexes = [
+            models.Index(fields=["user", "deleted_at", "id"], name="tombstone_user_deleted_idx"),
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ]
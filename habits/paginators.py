@@ -0,0 +1,184 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (created_at, id), от новых к старым.
+
+    Следующая страница выбирается условием (created_at, id) < (последняя запись), поэтому
+    нет ни COUNT(*), ни OFFSET, и глубокие страницы стоят столько же, сколько первая.
+    Порядок всегда -created_at, -id (параметр ordering в этом режиме не учитывается).
+    Строки — объекты модели или именованные кортежи values_list (habits/readers.py).
+    """
+
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+
+    def __init__(self, page_size: int):
+        self.page_size = page_size
+        self.base_url = None
+        self.has_next = False
+        self.has_previous = False
+        self.first = None
+        self.last = None
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, pk: int, reverse: bool = False) -> str:
+        raw = json.dumps({"c": created_at.isoformat(), "i": pk, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            data = json.loads(raw)
+            return datetime.fromisoformat(data["c"]), int(data["i"]), bool(data.get("r"))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound("Некорректный курсор.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset, reverse = self.page_queryset(queryset, request)
+        return self.set_page(list(page_queryset), reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset, reverse = self.page_queryset(queryset, request)
+        return self.set_page([row async for row in page_queryset], reverse)
+
+    def page_queryset(self, queryset, request):
+        """Запрос страницы (page_size + 1 строка, чтобы узнать о следующей) и его направление."""
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+
+        limit = self.page_size + 1
+
+        if cursor is None:
+            return queryset.order_by(*self.ordering)[:limit], None
+
+        created_at, pk, reverse = cursor
+        if reverse:
+            # Предыдущая страница: берём записи «новее» курсора в обратном порядке и переворачиваем
+            after = Q(created_at__gt=created_at) | Q(id__gt=pk)
+            return queryset.filter(after, created_at__gte=created_at).order_by("created_at", "id")[:limit], True
+
+        # Избыточное created_at <= курсор даёт планировщику границу диапазона по индексу,
+        # а OR уточняет порядок внутри одинаковых created_at
+        before = Q(created_at__lt=created_at) | Q(id__lt=pk)
+        return queryset.filter(before, created_at__lte=created_at).order_by(*self.ordering)[:limit], False
+
+    def set_page(self, rows, reverse):
+        """reverse: None — первая страница, True — переход назад, False — вперёд."""
+        if reverse:
+            self.has_previous = len(rows) > self.page_size
+            self.has_next = True
+            rows = rows[: self.page_size][::-1]
+        else:
+            self.has_next = len(rows) > self.page_size
+            self.has_previous = reverse is not None
+
+        rows = rows[: self.page_size]
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        cursor = self.encode_cursor(self.last.created_at, self.last.id)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        cursor = self.encode_cursor(self.first.created_at, self.first.id, reverse=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class CountedPaginator(DjangoPaginator):
+    """Paginator с заранее посчитанным count: в async-пути COUNT выполняется через acount()."""
+
+    def __init__(self, object_list, per_page, count: int, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+class HabitPagination(PageNumberPagination):
+    """
+    Постраничная пагинация по умолчанию; ?pagination=cursor включает KeysetPagination.
+
+    Ссылки next/previous в режиме курсора сохраняют параметр pagination, так что клиенту
+    достаточно указать его в первом запросе.
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+
+    def __init__(self):
+        self.keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.mode_query_param) == self.cursor_mode:
+            self.keyset = KeysetPagination(self.get_page_size(request) or self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async-вариант paginate_queryset для AsyncGenericAPIView (config/async_views.py)."""
+        if request.query_params.get(self.mode_query_param) == self.cursor_mode:
+            self.keyset = KeysetPagination(self.get_page_size(request) or self.page_size)
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        # Дальше — PageNumberPagination.paginate_queryset с async COUNT и чтением страницы
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = CountedPaginator(queryset, page_size, await queryset.acount())
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count"]["description"] = "Отсутствует в режиме ?pagination=cursor."
+        return schema
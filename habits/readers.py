@@ -0,0 +1,102 @@
+"""
+Быстрый путь чтения списков привычек.
+
+Вместо объектов модели и DRF-сериализатора на каждую строку читаются кортежи
+values_list ровно по отдаваемым полям, а значения переводятся заранее подобранными
+конвертерами. Набор полей, их имена и формат берутся из того же сериализатора, поэтому
+результат совпадает с serializer.data; поля нестандартных типов конвертируются их
+собственным to_representation.
+"""
+
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import fields, relations
+from rest_framework.settings import ISO_8601, api_settings
+
+# Поля, у которых to_representation для значений из БД ничего не меняет
+_IDENTITY_FIELDS = (
+    fields.BooleanField,
+    fields.IntegerField,
+    fields.CharField,
+    relations.PrimaryKeyRelatedField,
+)
+
+# Ключи курсорной пагинации (KeysetPagination) должны быть в строке, даже если не отдаются
+KEYSET_FIELDS = ("created_at", "id")
+
+
+def _inherits_representation(field, base) -> bool:
+    return isinstance(field, base) and type(field).to_representation is base.to_representation
+
+
+def _converter_factory(field) -> Callable:
+    """Возвращает фабрику tz -> конвертер (None — значение отдаётся как есть)."""
+    if any(_inherits_representation(field, base) for base in _IDENTITY_FIELDS):
+        if getattr(field, "pk_field", None) is None:
+            return lambda tz: None
+
+    if _inherits_representation(field, fields.TimeField):
+        if getattr(field, "format", api_settings.TIME_FORMAT).lower() == ISO_8601:
+            return lambda tz: _time_isoformat
+
+    if _inherits_representation(field, fields.DateTimeField) and not hasattr(field, "timezone"):
+        if getattr(field, "format", api_settings.DATETIME_FORMAT).lower() == ISO_8601:
+            return _datetime_converter
+
+    return lambda tz: field.to_representation
+
+
+def _time_isoformat(value) -> str:
+    return value.isoformat()
+
+
+def _datetime_converter(tz) -> Callable:
+    # То же, что DateTimeField.to_representation: перевод в текущий пояс и Z вместо +00:00
+    def convert(value):
+        if not value:
+            return None
+        value = value.astimezone(tz).isoformat() if tz is not None else value.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return convert
+
+
+class ValuesReader:
+    """Читает поля сериализатора через values_list и строит те же словари, что serializer.data."""
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        plan = []
+        for field in serializer._readable_fields:
+            if len(field.source_attrs) != 1:
+                raise ValueError(f"{serializer_class.__name__}.{field.field_name}: вложенный source не поддерживается")
+            plan.append((field.field_name, field.source, _converter_factory(field)))
+
+        self.sources: Tuple[str, ...] = tuple(source for _, source, _ in plan)
+        self.extra: Tuple[str, ...] = tuple(name for name in KEYSET_FIELDS if name not in self.sources)
+        self._plan = [(name, index, factory) for index, (name, _, factory) in enumerate(plan)]
+
+    def values(self, queryset):
+        """Именованные кортежи: к ключам пагинации можно обращаться как к атрибутам."""
+        return queryset.values_list(*self.sources, *self.extra, named=True)
+
+    def to_representation(self, rows: Iterable[Sequence]) -> List[dict]:
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        plan: List[Tuple[str, int, Optional[Callable]]] = [
+            (name, index, factory(tz)) for name, index, factory in self._plan
+        ]
+        return [
+            {
+                name: value if (value := row[index]) is None or convert is None else convert(value)
+                for name, index, convert in plan
+            }
+            for row in rows
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_reader(serializer_class) -> ValuesReader:
+    return ValuesReader(serializer_class)
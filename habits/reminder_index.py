@@ -0,0 +1,348 @@
+"""
+Расписание напоминаний в памяти процесса beat (HABIT_REMINDER_INDEX).
+
+Индекс хранит id привычек в корзинах по минуте UTC их next_reminder_at, поэтому тик берёт
+наступившие корзины за O(числа привычек, которым пора) без сканирования БД
+(habits.services.enqueue_due_habits_from_index). Строки наступивших привычек перечитываются
+по первичному ключу под блокировкой, и переносятся только слоты, наступившие и в БД.
+
+Индекс загружается целиком при старте beat и поддерживается лентой изменений: каждая запись
+привычки (save/delete, пакетные операции, _update_next_reminders) и смена Telegram или пояса
+пользователя публикует после коммита id в канал Redis HABIT_REMINDER_INDEX_CHANNEL. Поток
+IndexListener перечитывает эти строки по первичному ключу. Pub/sub не гарантирует доставку,
+поэтому раз в HABIT_REMINDER_INDEX_RECONCILE_SECONDS индекс перезагружается из БД целиком
+(и сразу после переподключения к Redis).
+"""
+
+import json
+import logging
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import redis
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, transaction
+from redis.exceptions import RedisError
+
+from habits.models import Habit
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+REMINDER_TASK = "habits.tasks.send_habit_reminders"
+# Свои сообщения процесс не перечитывает: переносы слотов тика он уже применил к индексу
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+LOAD_CHUNK_SIZE = 5000
+
+_client = None
+
+
+def enabled() -> bool:
+    return getattr(settings, "HABIT_REMINDER_INDEX", False)
+
+
+def _channel() -> str:
+    return getattr(settings, "HABIT_REMINDER_INDEX_CHANNEL", "habits:reminder-index")
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.HABIT_REMINDER_INDEX_REDIS_URL)
+    return _client
+
+
+def publish_changes(
+    habit_ids: Iterable[int] = (), user_ids: Iterable[int] = (), using: str = DEFAULT_DB_ALIAS
+) -> None:
+    """Сообщает beat об изменённых привычках и пользователях после коммита транзакции."""
+    if not enabled():
+        return
+    habit_ids, user_ids = list(habit_ids), list(user_ids)
+    if not habit_ids and not user_ids:
+        return
+    message = json.dumps({"origin": ORIGIN, "habits": habit_ids, "users": user_ids})
+
+    def send():
+        try:
+            _redis().publish(_channel(), message)
+        except RedisError:
+            # Изменение подхватит ближайшая сверка индекса
+            logger.exception("reminder index: publish failed habits=%s users=%s", len(habit_ids), len(user_ids))
+
+    transaction.on_commit(send, using=using)
+
+
+def _minute(value: datetime) -> int:
+    return int(value.timestamp()) // 60
+
+
+def _user_entry(telegram_id, timezone) -> tuple:
+    # Имён поясов немного, а пользователей — сотни тысяч: строки пояса общие
+    return telegram_id, sys.intern(timezone) if timezone else timezone
+
+
+class ReminderIndex:
+    """
+    habits: id -> (минута корзины, next_reminder_at, time, frequency, last_reminder, user_id);
+    users: id -> (telegram_id, timezone); buckets: минута UTC -> array("q") id привычек.
+
+    Перенесённые и удалённые привычки из старых корзин не вычищаются: при чтении корзины
+    id без записи или с другой минутой отбрасываются. Все изменения — под lock; полная
+    загрузка читает БД без него и подменяет словари под lock (load).
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.habits: Dict[int, tuple] = {}
+        self.users: Dict[int, tuple] = {}
+        self.buckets: Dict[int, array] = defaultdict(lambda: array("q"))
+        # Первая минута, которую тик ещё не читал; None — тиков ещё не было
+        self.next_minute: Optional[int] = None
+        self.loaded_at: Optional[float] = None
+        # id привычек, изменённых во время загрузки снимка; None — загрузки нет
+        self._changed: Optional[set] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def put_habit(self, habit_id, next_reminder_at, habit_time, frequency, last_reminder, user_id) -> None:
+        if next_reminder_at is None:
+            self.discard(habit_id)
+            return
+        minute = _minute(next_reminder_at)
+        if self.next_minute is not None and minute < self.next_minute:
+            # Слот уже прошёл (например, найден сверкой) — в корзину ближайшего тика
+            minute = self.next_minute
+        self.habits[habit_id] = (minute, next_reminder_at, habit_time, frequency, last_reminder, user_id)
+        self.buckets[minute].append(habit_id)
+        if self._changed is not None:
+            self._changed.add(habit_id)
+
+    def discard(self, habit_id) -> None:
+        self.habits.pop(habit_id, None)
+        if self._changed is not None:
+            self._changed.add(habit_id)
+
+    def put_user(self, user_id, telegram_id, timezone) -> None:
+        self.users[user_id] = _user_entry(telegram_id, timezone)
+
+    def move(self, ids_by_next: Dict[Optional[datetime], List[int]]) -> None:
+        """Переносит привычки на новые слоты (после _claim_due_habits)."""
+        for next_at, ids in ids_by_next.items():
+            for habit_id in ids:
+                entry = self.habits.get(habit_id)
+                if entry is not None:
+                    self.put_habit(habit_id, next_at, *entry[2:])
+
+    def pop_due(self, now: datetime) -> List[Dict[str, Any]]:
+        """
+        Привычки, чьи слоты наступили к now, в формате строк get_due_habits; прочитанные
+        корзины удаляются. Первый тик и тик после долгого простоя перебирают все корзины.
+        """
+        end = _minute(now)
+        if self.next_minute is None or end - self.next_minute > len(self.buckets):
+            minutes = sorted(minute for minute in self.buckets if minute <= end)
+        else:
+            minutes = range(self.next_minute, end + 1)
+
+        rows = []
+        for minute in minutes:
+            bucket = self.buckets.pop(minute, None)
+            if not bucket:
+                continue
+            for habit_id in dict.fromkeys(bucket):
+                entry = self.habits.get(habit_id)
+                if entry is None or entry[0] != minute:
+                    continue
+                _, next_reminder_at, habit_time, frequency, last_reminder, user_id = entry
+                telegram_id, timezone = self.users.get(user_id, (None, None))
+                rows.append(
+                    {
+                        "id": habit_id,
+                        "time": habit_time,
+                        "frequency": frequency,
+                        "last_reminder": last_reminder,
+                        "next_reminder_at": next_reminder_at,
+                        "user_id": user_id,
+                        "user__telegram_id": telegram_id,
+                        "user__timezone": timezone,
+                    }
+                )
+
+        self.next_minute = max(self.next_minute or 0, end + 1)
+        return rows
+
+    def load(self) -> None:
+        """
+        Полная загрузка (и сверка) из БД. Снимок читается без lock, поэтому тики во время
+        загрузки не ждут. Снимок может оказаться старше переносов слотов, сделанных тиками
+        за это время: такие привычки берутся из текущего индекса, а корзины, прочитанные
+        тиками после снимка, перекладываются в корзину ближайшего тика.
+        """
+        started = time.monotonic()
+        with self.lock:
+            self._changed = set()
+        try:
+            habits, users, buckets = self._read_snapshot()
+        except BaseException:
+            with self.lock:
+                self._changed = None
+            raise
+
+        with self.lock:
+            changed, self._changed = self._changed, None
+            for habit_id in changed:
+                habits.pop(habit_id, None)
+                entry = self.habits.get(habit_id)
+                if entry is not None:
+                    habits[habit_id] = entry
+                    buckets[entry[0]].append(habit_id)
+            self.habits, self.users, self.buckets = habits, users, buckets
+            if self.next_minute is not None:
+                for minute in [minute for minute in buckets if minute < self.next_minute]:
+                    for habit_id in buckets.pop(minute):
+                        entry = habits.get(habit_id)
+                        if entry is not None and entry[0] == minute:
+                            self.put_habit(habit_id, *entry[1:])
+            self.loaded_at = time.monotonic()
+        logger.info(
+            "reminder index: loaded habits=%s users=%s buckets=%s changed=%s in %.2fs",
+            len(habits),
+            len(users),
+            len(buckets),
+            len(changed),
+            time.monotonic() - started,
+        )
+
+    @staticmethod
+    def _read_snapshot() -> tuple:
+        habits: Dict[int, tuple] = {}
+        users: Dict[int, tuple] = {}
+        buckets: Dict[int, array] = defaultdict(lambda: array("q"))
+        for user_id, telegram_id, timezone in User.objects.values_list("id", "telegram_id", "timezone").iterator(
+            LOAD_CHUNK_SIZE
+        ):
+            users[user_id] = _user_entry(telegram_id, timezone)
+        for habit_id, next_reminder_at, *fields in (
+            Habit.objects.filter(next_reminder_at__isnull=False)
+            .order_by()
+            .values_list("id", "next_reminder_at", "time", "frequency", "last_reminder", "user_id")
+            .iterator(LOAD_CHUNK_SIZE)
+        ):
+            minute = _minute(next_reminder_at)
+            habits[habit_id] = (minute, next_reminder_at, *fields)
+            buckets[minute].append(habit_id)
+        return habits, users, buckets
+
+    def refresh(self, habit_ids: Iterable[int] = (), user_ids: Iterable[int] = ()) -> None:
+        """
+        Перечитывает изменённые строки; отсутствующие в БД удаляются из индекса.
+
+        Запросы идут без lock, как в load: тик не ждёт БД. Если тик успел перенести слот
+        после чтения, устаревшая строка безопасна — перед отправкой тик перечитывает её из БД.
+        """
+        habit_ids, user_ids = set(habit_ids), set(user_ids)
+        user_rows = (
+            list(User.objects.filter(pk__in=user_ids).values_list("id", "telegram_id", "timezone")) if user_ids else []
+        )
+        habit_rows = (
+            list(
+                Habit.objects.filter(pk__in=habit_ids).values_list(
+                    "id", "next_reminder_at", "time", "frequency", "last_reminder", "user_id"
+                )
+            )
+            if habit_ids
+            else []
+        )
+        with self.lock:
+            for user_id in user_ids:
+                self.users.pop(user_id, None)
+            for row in user_rows:
+                self.put_user(*row)
+            for habit_id in habit_ids:
+                self.discard(habit_id)
+            for row in habit_rows:
+                self.put_habit(*row)
+
+
+class IndexListener(threading.Thread):
+    """Поток beat: читает ленту изменений и раз в HABIT_REMINDER_INDEX_RECONCILE_SECONDS сверяет индекс с БД."""
+
+    # Сколько сообщений применяется одним чтением из БД
+    MAX_BATCH = 500
+
+    def __init__(self, index: ReminderIndex):
+        super().__init__(name="reminder-index", daemon=True)
+        self.index = index
+        self.stopped = threading.Event()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = _redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(_channel())
+                # Загрузка после подписки: изменения, сделанные во время загрузки, не теряются
+                self.index.load()
+                self._listen(pubsub)
+            except Exception:
+                # Поток не должен умирать: до восстановления beat тикает по БД (enqueue_due_habits)
+                logger.exception("reminder index: listener failed, reconnecting")
+                self.stopped.wait(5)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+                close_old_connections()
+
+    def _listen(self, pubsub) -> None:
+        interval = getattr(settings, "HABIT_REMINDER_INDEX_RECONCILE_SECONDS", 900)
+        reconcile_at = time.monotonic() + interval
+        while not self.stopped.is_set():
+            habit_ids, user_ids = set(), set()
+            message = pubsub.get_message(timeout=1.0)
+            while message is not None and len(habit_ids) + len(user_ids) < self.MAX_BATCH:
+                self._collect(message, habit_ids, user_ids)
+                message = pubsub.get_message()
+            if message is not None:
+                self._collect(message, habit_ids, user_ids)
+
+            if habit_ids or user_ids:
+                close_old_connections()
+                self.index.refresh(habit_ids, user_ids)
+            if time.monotonic() >= reconcile_at:
+                close_old_connections()
+                self.index.load()
+                reconcile_at = time.monotonic() + interval
+
+    @staticmethod
+    def _collect(message, habit_ids: set, user_ids: set) -> None:
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.warning("reminder index: malformed message %r", message.get("data"))
+            return
+        if payload.get("origin") == ORIGIN:
+            return
+        habit_ids.update(payload.get("habits", ()))
+        user_ids.update(payload.get("users", ()))
+
+
+def start() -> tuple[ReminderIndex, IndexListener]:
+    """Создаёт индекс и запускает поток загрузки и ленты изменений (вызывается beat)."""
+    index = ReminderIndex()
+    listener = IndexListener(index)
+    listener.start()
+    return index, listener
@@ -1,13 +1,134 @@
+from typing import Dict, Set
+
+from django.utils import timezone
 from rest_framework import serializers
 
 from habits.models import Habit
+from habits.services import calculate_next_reminder_at, user_timezone
+from habits.signals import bulk_saved
+
+
+class PleasantHabitField(serializers.PrimaryKeyRelatedField):
+    """
+    Связанная привычка: приятная привычка текущего пользователя.
+
+    Все ID связанных привычек запроса — из входных данных (одного объекта или пакета) и у
+    обновляемых привычек — загружаются одним запросом при первом обращении и кешируются в
+    context["related_habits"]. На выходе значение берётся из related_habit_id без загрузки
+    объекта (pk-only оптимизация PrimaryKeyRelatedField).
+    """
+
+    def _user_habits(self):
+        request = self.context.get("request")
+        if request is None or not request.user.is_authenticated:
+            return Habit.objects.none()
+        return Habit.objects.filter(user=request.user)
+
+    def get_queryset(self):
+        return self._user_habits().filter(is_pleasant=True)
+
+    def _referenced_ids(self) -> Set[int]:
+        root = self.root
+        data = getattr(root, "initial_data", None)
+        items = data if isinstance(data, list) else [data]
+        instances = [root.instance] if isinstance(root.instance, Habit) else list(root.instance or [])
+
+        ids = {instance.related_habit_id for instance in instances if instance.related_habit_id}
+        for item in items:
+            value = item.get("related_habit") if hasattr(item, "get") else None
+            if isinstance(value, (int, str)) and not isinstance(value, bool) and str(value).isdigit():
+                ids.add(int(value))
+        return ids
+
+    def related_habits(self) -> Dict[int, Habit]:
+        cached = self.context.get("related_habits")
+        if cached is None:
+            ids = self._referenced_ids()
+            # Без фильтра is_pleasant: текущая связанная привычка могла перестать быть приятной,
+            # и validate должен это увидеть
+            habits = self._user_habits().filter(pk__in=ids).only("id", "user_id", "is_pleasant") if ids else []
+            cached = {habit.pk: habit for habit in habits}
+            self.context["related_habits"] = cached
+        return cached
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (int, str)) or not str(data).isdigit():
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        habit = self.related_habits().get(int(data))
+        # Выбирать можно только приятные привычки, как в get_queryset
+        if habit is None or not habit.is_pleasant:
+            self.fail("does_not_exist", pk_value=data)
+        return habit
+
+
+class HabitListSerializer(serializers.ListSerializer):
+    """
+    Пакетные создание и обновление привычек.
+
+    Правила HabitSerializer.validate применяются к каждому элементу, ошибки возвращаются
+    словарём {индекс элемента: ошибки}. Запись — одним bulk_create / bulk_update. Для обновления
+    instance — привычки пользователя, а каждый элемент данных содержит id.
+    """
+
+    def to_internal_value(self, data):
+        self.instances_by_pk = {habit.pk: habit for habit in self.instance} if self.instance is not None else {}
+        self.matched_instances = []
+        self.matched_pks = set()
+        try:
+            return super().to_internal_value(data)
+        except serializers.ValidationError as exc:
+            # DRF до 3.17 отдаёт ошибки списком по всем элементам, новые версии — словарём по индексам
+            if isinstance(exc.detail, list):
+                raise serializers.ValidationError({index: error for index, error in enumerate(exc.detail) if error})
+            raise
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        pk = data.get("id") if isinstance(data, dict) else None
+        if not isinstance(pk, int) or pk not in self.instances_by_pk:
+            raise serializers.ValidationError({"id": ["Привычка не найдена."]})
+        if pk in self.matched_pks:
+            raise serializers.ValidationError({"id": ["Привычка повторяется в запросе."]})
+        self.matched_pks.add(pk)
+
+        instance = self.instances_by_pk[pk]
+        self.child.instance = instance
+        try:
+            validated = super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+        self.matched_instances.append(instance)
+        return validated
+
+    def create(self, validated_data):
+        habits = [Habit(**attrs, next_reminder_at=self.child.next_reminder_at(attrs)) for attrs in validated_data]
+        Habit.objects.bulk_create(habits)
+        bulk_saved(habits, created=True)
+        return habits
+
+    def update(self, instances, validated_data):
+        # bulk_update не вызывает auto_now, поэтому updated_at выставляется явно
+        now = timezone.now()
+        fields = {"next_reminder_at", "updated_at"}
+        for instance, attrs in zip(self.matched_instances, validated_data):
+            attrs["next_reminder_at"] = self.child.next_reminder_at(attrs, instance)
+            for field, value in attrs.items():
+                setattr(instance, field, value)
+            instance.updated_at = now
+            fields.update(attrs)
+
+        Habit.objects.bulk_update(self.matched_instances, sorted(fields))
+        bulk_saved(self.matched_instances, created=False)
+        return self.matched_instances
 
 
 class HabitSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
     # Ограничиваем выбор связанной привычки: только приятные привычки текущего пользователя
-    related_habit = serializers.PrimaryKeyRelatedField(
+    related_habit = PleasantHabitField(
         queryset=Habit.objects.none(),
         required=False,
         allow_null=True,
@@ -15,8 +136,9 @@ class HabitSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Habit
+        list_serializer_class = HabitListSerializer
         fields = "__all__"
-        read_only_fields = ["id", "user", "created_at", "updated_at", "last_reminder"]
+        read_only_fields = ["id", "user", "created_at", "updated_at", "last_reminder", "next_reminder_at"]
         extra_kwargs = {
             "place": {"help_text": "Где выполняется привычка."},
             "time": {"help_text": "Время выполнения привычки (HH:MM[:SS])."},
@@ -30,23 +152,15 @@ class HabitSerializer(serializers.ModelSerializer):
             "created_at": {"help_text": "Дата и время создания."},
             "updated_at": {"help_text": "Дата и время последнего обновления."},
             "last_reminder": {"help_text": "Дата и время последнего напоминания."},
+            "next_reminder_at": {"help_text": "Дата и время следующего напоминания."},
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        request = self.context.get("request")
-        if request and request.user and request.user.is_authenticated:
-            self.fields["related_habit"].queryset = Habit.objects.filter(
-                user=request.user,
-                is_pleasant=True,
-            )
-
     def validate(self, attrs):
         instance = self.instance
 
         is_pleasant = attrs.get("is_pleasant", getattr(instance, "is_pleasant", False))
         reward = attrs.get("reward", getattr(instance, "reward", None))
-        related_habit = attrs.get("related_habit", getattr(instance, "related_habit", None))
+        related_habit = attrs["related_habit"] if "related_habit" in attrs else self._current_related_habit()
         duration = attrs.get("duration", getattr(instance, "duration", None))
         frequency = attrs.get("frequency", getattr(instance, "frequency", 1))
 
@@ -122,6 +236,48 @@ class HabitSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def _current_related_habit(self):
+        # Берём из кеша поля, чтобы частичное обновление не загружало связанную привычку отдельно
+        if self.instance is None or self.instance.related_habit_id is None:
+            return None
+        related_habit = self.fields["related_habit"].related_habits().get(self.instance.related_habit_id)
+        return related_habit or self.instance.related_habit
+
+    def next_reminder_at(self, validated_data, instance=None):
+        """Слот следующего напоминания в поясе пользователя: время и периодичность могли измениться."""
+        # При частичном обновлении скрытого поля user в validated_data нет; привычки принадлежат
+        # пользователю запроса, поэтому его пояс берётся без загрузки instance.user
+        request = self.context.get("request")
+        user = validated_data.get("user") or (request.user if request else instance.user)
+        tz = user_timezone(user.timezone)
+        if instance is None:
+            return calculate_next_reminder_at(
+                validated_data["time"],
+                validated_data.get("frequency", Habit._meta.get_field("frequency").default),
+                None,
+                timezone.now(),
+                tz,
+            )
+        return calculate_next_reminder_at(
+            validated_data.get("time", instance.time),
+            validated_data.get("frequency", instance.frequency),
+            instance.last_reminder,
+            timezone.now(),
+            tz,
+        )
+
+    def create(self, validated_data):
+        validated_data["next_reminder_at"] = self.next_reminder_at(validated_data)
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        validated_data["next_reminder_at"] = self.next_reminder_at(validated_data, instance)
+        return super().update(instance, validated_data)
+
+
+class HabitBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, help_text="ID привычек.")
+
 
 class HabitPublicSerializer(serializers.ModelSerializer):
     class Meta:
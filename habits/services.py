@@ -1,15 +1,45 @@
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
-
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from datetime import tzinfo
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
 from django.utils import timezone
 
+from config.metrics import TICK_DURATION, observe_queue_lag, record_stats
 from habits.models import Habit
 from habits.notifications import format_habit_message
+from habits.reminder_index import ReminderIndex, publish_changes
+from users.models import User
 from users.services import get_telegram_service
 
 logger = logging.getLogger(__name__)
 
+# Поля, которых достаточно beat-задаче, чтобы решить, ставить ли задачу, и перенести слот
+DUE_HABIT_FIELDS = (
+    "id",
+    "time",
+    "frequency",
+    "last_reminder",
+    "next_reminder_at",
+    "user_id",
+    "user__telegram_id",
+    "user__timezone",
+)
+# Слоты лежат не дальше чем на frequency (до 7) дней вперёд плюс сутки
+SLOT_HORIZON = timedelta(days=8)
+
+
+def _normalize_telegram_id(telegram_id: Any) -> Optional[str]:
+    if telegram_id in (None, "", 0, "0"):
+        return None
+    return str(telegram_id)
+
 
 def _get_user_telegram_id(habit: Habit) -> Optional[str]:
     """Возвращает telegram_id пользователя или None, если не привязан."""
@@ -17,19 +47,29 @@ def _get_user_telegram_id(habit: Habit) -> Optional[str]:
     if not user:
         return None
 
-    telegram_id = getattr(user, "telegram_id", None)
+    return _normalize_telegram_id(getattr(user, "telegram_id", None))
 
-    if telegram_id in (None, "", 0, "0"):
-        return None
 
-    return str(telegram_id)
+def user_timezone(name: Optional[str]) -> tzinfo:
+    """Часовой пояс пользователя по имени IANA; пустое или неизвестное имя — TIME_ZONE сервера."""
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning("Unknown user timezone %r, using %s", name, settings.TIME_ZONE)
+    return timezone.get_default_timezone()
+
 
+def habit_timezone(habit: Habit) -> tzinfo:
+    """Пояс владельца привычки: в нём задано habit.time."""
+    return user_timezone(getattr(habit.user, "timezone", None))
 
-def _normalize_local_datetime(value: datetime) -> datetime:
-    """Нормализует datetime до aware и локальной зоны."""
+
+def _normalize_local_datetime(value: datetime, tz: Optional[tzinfo] = None) -> datetime:
+    """Нормализует datetime до aware и зоны tz (по умолчанию — текущей зоны Django)."""
     if timezone.is_naive(value):
         value = timezone.make_aware(value, timezone.get_current_timezone())
-    return timezone.localtime(value)
+    return timezone.localtime(value, tz)
 
 
 def _same_minute(left: datetime, right: datetime) -> bool:
@@ -37,16 +77,24 @@ def _same_minute(left: datetime, right: datetime) -> bool:
     return left.replace(second=0, microsecond=0) == right.replace(second=0, microsecond=0)
 
 
-def is_habit_due(habit: Habit, now: datetime, *, last_reminder_local: datetime | None = None) -> bool:
-    """Определяет, нужно ли отправлять напоминание по привычке сейчас."""
+def is_habit_due(
+    habit: Habit, now: datetime, *, last_reminder_local: datetime | None = None, tz: Optional[tzinfo] = None
+) -> bool:
+    """
+    Определяет, нужно ли отправлять напоминание по привычке сейчас.
+
+    Дни считаются в поясе пользователя (tz, по умолчанию — habit_timezone).
+    """
     if habit.frequency is None:
         return False
 
-    now_local = _normalize_local_datetime(now)
     if habit.last_reminder is None:
         return True
 
-    last_reminder = last_reminder_local or _normalize_local_datetime(habit.last_reminder)
+    if tz is None:
+        tz = habit_timezone(habit)
+    now_local = _normalize_local_datetime(now, tz)
+    last_reminder = last_reminder_local or _normalize_local_datetime(habit.last_reminder, tz)
     if _same_minute(last_reminder, now_local):
         return False
 
@@ -54,69 +102,189 @@ def is_habit_due(habit: Habit, now: datetime, *, last_reminder_local: datetime |
     return days_since >= habit.frequency
 
 
-def get_due_habits(now: datetime) -> List[Habit]:
-    """Возвращает привычки, для которых нужно отправить напоминание сейчас."""
+def _combine_local(day: date, habit_time: time, tz: Optional[tzinfo] = None) -> datetime:
+    """
+    Собирает aware datetime в зоне tz из даты и времени привычки (с точностью до минуты).
+
+    Смещение берётся на эту дату, поэтому переходы на летнее время учтены. Время, которого
+    в этот день нет (перевод часов вперёд), сдвигается на величину перевода, а повторяющееся
+    (перевод назад) — первое из двух.
+    """
+    tz = tz or timezone.get_current_timezone()
+    naive = datetime.combine(day, habit_time.replace(second=0, microsecond=0))
+    # Через UTC: несуществующее время (02:30 при переводе вперёд) становится реальным (03:30)
+    return timezone.make_aware(naive, tz).astimezone(dt_timezone.utc).astimezone(tz)
+
+
+def calculate_next_reminder_at(
+    habit_time: time,
+    frequency: Optional[int],
+    last_reminder: Optional[datetime],
+    now: datetime,
+    tz: Optional[tzinfo] = None,
+) -> Optional[datetime]:
+    """
+    Вычисляет момент следующего напоминания (строго позже now).
+
+    habit_time и дни считаются в поясе пользователя tz (по умолчанию — текущей зоне Django).
+    Первый подходящий день — не раньше сегодняшнего и не раньше last_reminder + frequency дней,
+    что совпадает с правилом is_habit_due. Если слот этого дня уже прошёл, берётся следующий день.
+    """
+    if frequency is None:
+        return None
+
+    now_local = _normalize_local_datetime(now, tz)
+    day = now_local.date()
+    if last_reminder is not None:
+        last_reminder_local = _normalize_local_datetime(last_reminder, tz)
+        day = max(day, last_reminder_local.date() + timedelta(days=frequency))
 
-    now_local = _normalize_local_datetime(now)
-    current_time = now_local.time()
+    candidate = _combine_local(day, habit_time, tz)
+    if candidate <= now_local:
+        candidate = _combine_local(day + timedelta(days=1), habit_time, tz)
+    return candidate
 
-    logger.debug(
-        "get_due_habits: start now=%s (date=%s time=%02d:%02d)",
-        now_local.isoformat(),
-        now_local.date(),
-        current_time.hour,
-        current_time.minute,
+
+def schedule_next_reminder(habit: Habit, now: datetime, tz: Optional[tzinfo] = None) -> Optional[datetime]:
+    """Пересчитывает habit.next_reminder_at (без сохранения в БД) и возвращает новое значение."""
+    habit.next_reminder_at = calculate_next_reminder_at(
+        habit.time, habit.frequency, habit.last_reminder, now, tz or habit_timezone(habit)
     )
+    return habit.next_reminder_at
+
+
+def _update_next_reminders(ids_by_next: Dict[Optional[datetime], List[int]], **fields: Any) -> None:
+    """
+    Записывает next_reminder_at (и одинаковые для всех fields) одним UPDATE.
+
+    next_reminder_at зависит от времени и периодичности привычки, поэтому задаётся через CASE
+    по группам id с одинаковым следующим слотом: групп мало, даже если строк тысячи.
+    updated_at тоже сдвигается: поля напоминаний входят в ответ API, а по updated_at
+    считаются ETag/Last-Modified.
+    """
+    ids = [habit_id for group in ids_by_next.values() for habit_id in group]
+    if not ids:
+        return
+
+    Habit.objects.filter(id__in=ids).update(
+        next_reminder_at=Case(
+            *(When(id__in=group, then=Value(next_at)) for next_at, group in ids_by_next.items()),
+            output_field=DateTimeField(),
+        ),
+        updated_at=timezone.now(),
+        **fields,
+    )
+    publish_changes(habit_ids=ids)
 
-    qs = Habit.objects.filter(
-        time__hour=current_time.hour,
-        time__minute=current_time.minute,
-    ).select_related("user")
 
-    habits = list(qs)
+def _claim_due_habits(rows: Iterable[Dict[str, Any]], now: datetime) -> Dict[Optional[datetime], List[int]]:
+    """
+    Переносит next_reminder_at обработанных тиком привычек на следующий слот одним запросом.
 
-    logger.debug("get_due_habits: candidates found=%s", len(habits))
+    Каждый слот рассматривается beat-задачей один раз: при неудачной отправке напоминание
+    придёт в следующий подходящий день, как и раньше. При успехе process_single_habit
+    пересчитывает значение уже с учётом нового last_reminder.
+    """
+    ids_by_next: Dict[Optional[datetime], List[int]] = {}
+    for row in rows:
+        next_at = calculate_next_reminder_at(
+            row["time"], row["frequency"], row["last_reminder"], now, user_timezone(row["user__timezone"])
+        )
+        ids_by_next.setdefault(next_at, []).append(row["id"])
 
-    due: List[Habit] = []
-    for habit in habits:
-        if habit.frequency is None:
-            logger.warning("Habit id=%s has frequency=None; skipping candidate", habit.id)
-            continue
+    _update_next_reminders(ids_by_next)
+    return ids_by_next
 
-        if habit.last_reminder is None:
-            logger.info(
-                "Habit id=%s due: first reminder (last_reminder is None), frequency=%s user_id=%s",
-                habit.id,
-                habit.frequency,
-                habit.user_id,
-            )
-            due.append(habit)
-            continue
 
-        last_reminder = _normalize_local_datetime(habit.last_reminder)
-        if is_habit_due(habit, now_local, last_reminder_local=last_reminder):
-            days_since = (now_local.date() - last_reminder.date()).days
-            logger.info(
-                "Habit id=%s due: days_since=%s >= frequency=%s last_reminder=%s user_id=%s",
-                habit.id,
-                days_since,
-                habit.frequency,
-                habit.last_reminder.isoformat() if habit.last_reminder else None,
-                habit.user_id,
-            )
-            due.append(habit)
-        else:
-            days_since = (now_local.date() - last_reminder.date()).days
-            logger.debug(
-                "Habit id=%s not due: days_since=%s < frequency=%s last_reminder=%s",
-                habit.id,
-                days_since,
-                habit.frequency,
-                habit.last_reminder.isoformat(),
+def reschedule_habits(queryset, now: datetime, chunk_size: int = 2000) -> int:
+    """
+    Пересчитывает next_reminder_at привычек queryset в поясах их владельцев и записывает
+    только изменившиеся слоты (по UPDATE на кусок). Возвращает число перенесённых привычек.
+
+    Слоты, которые уже наступили, не трогаются: их заберёт ближайший тик.
+    """
+    rows = (
+        queryset.filter(next_reminder_at__gt=now)
+        .order_by()
+        .values("id", "time", "frequency", "last_reminder", "next_reminder_at", "user__timezone")
+    )
+    moved = 0
+    for chunk in _chunked(rows.iterator(chunk_size=chunk_size), chunk_size):
+        ids_by_next: Dict[Optional[datetime], List[int]] = {}
+        for row in chunk:
+            next_at = calculate_next_reminder_at(
+                row["time"], row["frequency"], row["last_reminder"], now, user_timezone(row["user__timezone"])
             )
+            if next_at != row["next_reminder_at"]:
+                ids_by_next.setdefault(next_at, []).append(row["id"])
+                moved += 1
+        _update_next_reminders(ids_by_next)
+    return moved
+
+
+def timezones_with_offset_change(
+    names: Iterable[str], start: datetime, horizon: timedelta = SLOT_HORIZON
+) -> List[str]:
+    """Пояса из names, в которых смещение от UTC меняется между start и start + horizon (проверка по часам)."""
+    changing = []
+    for name in names:
+        tz = user_timezone(name)
+        offsets = {
+            tz.utcoffset(start + timedelta(hours=hour)) for hour in range(int(horizon / timedelta(hours=1)) + 1)
+        }
+        if len(offsets) > 1:
+            changing.append(name)
+    return changing
+
+
+def reschedule_for_offset_changes(now: datetime) -> Dict[str, Any]:
+    """
+    Пересчитывает слоты пользователей в поясах, где в пределах SLOT_HORIZON до и после now
+    переводят часы.
+
+    next_reminder_at — абсолютный момент, посчитанный со смещением на дату слота, поэтому при
+    актуальной базе tzdata перевод часов его не меняет. Пересчёт исправляет слоты, посчитанные
+    до обновления правил пояса (tzdata) или прежней версией кода, до того как они наступят.
+    """
+    # Слот, посчитанный до SLOT_HORIZON назад, мог попасть на перевод, который уже прошёл
+    names = User.objects.order_by().values_list("timezone", flat=True).distinct()
+    zones = timezones_with_offset_change(names, now - SLOT_HORIZON, 2 * SLOT_HORIZON)
+    moved = reschedule_habits(Habit.objects.filter(user__timezone__in=zones), now) if zones else 0
+    return {"timezones": zones, "moved": moved}
+
+
+def get_due_habits(now: datetime, chunk_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Возвращает привычки, для которых нужно отправить напоминание сейчас.
+
+    Строки читаются потоком (серверный курсор, по chunk_size за раз) и содержат только
+    поля DUE_HABIT_FIELDS, поэтому память не растёт с числом привычек, которым пора.
+    """
 
-    logger.info("get_due_habits: due found=%s at now=%s", len(due), now_local.isoformat())
-    return due
+    now_local = _normalize_local_datetime(now)
+    if chunk_size is None:
+        chunk_size = getattr(settings, "HABIT_REMINDER_SCAN_CHUNK_SIZE", 2000)
+
+    logger.debug("get_due_habits: start now=%s", now_local.isoformat())
+
+    # Индексный диапазонный запрос по habit_next_reminder_at_idx: стоимость зависит
+    # только от числа привычек, которым пора, а не от общего числа привычек.
+    qs = Habit.objects.filter(next_reminder_at__lte=now_local).order_by("next_reminder_at").values(*DUE_HABIT_FIELDS)
+
+    found = 0
+    for row in qs.iterator(chunk_size=chunk_size):
+        found += 1
+        logger.debug(
+            "Habit id=%s due: next_reminder_at=%s frequency=%s last_reminder=%s user_id=%s",
+            row["id"],
+            row["next_reminder_at"].isoformat(),
+            row["frequency"],
+            row["last_reminder"].isoformat() if row["last_reminder"] else None,
+            row["user_id"],
+        )
+        yield row
+
+    logger.info("get_due_habits: due found=%s at now=%s", found, now_local.isoformat())
 
 
 def send_telegram_notification(telegram_id: str, message: str) -> bool:
@@ -128,123 +296,432 @@ def send_telegram_notification(telegram_id: str, message: str) -> bool:
         return False
 
 
-def process_single_habit(habit_id: int, now: datetime) -> Dict[str, int]:
-    """Отправляет напоминание по одной привычке и обновляет last_reminder при успехе."""
-    stats = {"sent": 0, "skipped": 0, "errors": 0}
-
-    now_local = _normalize_local_datetime(now)
-    logger.info("process_single_habit: start habit_id=%s now=%s", habit_id, now_local.isoformat())
-
+def send_telegram_notifications_bulk(messages: Sequence[Tuple[str, str]]) -> List[bool]:
+    """Отправляет пачку уведомлений одним запросом; возвращает статусы в порядке messages."""
     try:
-        habit = Habit.objects.select_related("user").get(id=habit_id)
-    except Habit.DoesNotExist:
-        logger.warning("process_single_habit: habit not found id=%s", habit_id)
-        stats["errors"] += 1
-        return stats
+        return get_telegram_service().send_messages_bulk(messages)
+    except Exception:
+        logger.exception("Telegram bulk send crashed for %s messages", len(messages))
+        return [False] * len(messages)
+
 
+def _prepare_habit_message(habit: Habit, now_local: datetime, stats: Dict[str, int]) -> Optional[Tuple[str, str]]:
+    """Проверяет привычку перед отправкой и возвращает (telegram_id, message) или None, если отправлять не нужно."""
     telegram_id = _get_user_telegram_id(habit)
     if not telegram_id:
         logger.warning(
-            "process_single_habit: skipped habit_id=%s user_id=%s reason=telegram_not_linked",
+            "process_habit: skipped habit_id=%s user_id=%s reason=telegram_not_linked",
             habit.id,
             habit.user_id,
         )
         stats["skipped"] += 1
-        return stats
+        return None
 
     if not is_habit_due(habit, now_local):
         logger.info(
-            "process_single_habit: skipped habit_id=%s user_id=%s reason=not_due",
+            "process_habit: skipped habit_id=%s user_id=%s reason=not_due",
             habit.id,
             habit.user_id,
         )
         stats["skipped"] += 1
-        return stats
+        return None
 
     try:
         message = format_habit_message(habit)
     except Exception:
-        logger.exception("process_single_habit: message format failed habit_id=%s", habit.id)
+        logger.exception("process_habit: message format failed habit_id=%s", habit.id)
         stats["errors"] += 1
-        return stats
+        return None
 
     logger.info(
-        "process_single_habit: sending habit_id=%s user_id=%s telegram_id=%s",
+        "process_habit: sending habit_id=%s user_id=%s telegram_id=%s",
         habit.id,
         habit.user_id,
         telegram_id,
     )
+    return telegram_id, message
 
-    success = send_telegram_notification(telegram_id, message)
 
+def _finish_habit(
+    habit: Habit, now_local: datetime, success: bool, stats: Dict[str, int], *, save: bool = True
+) -> None:
+    """
+    Фиксирует результат отправки: при успехе обновляет last_reminder и следующий слот.
+
+    save=False только меняет атрибуты — пакетная обработка сохраняет их одним запросом (_save_sent_habits).
+    """
     if success:
+        tz = habit_timezone(habit)
         habit.last_reminder = now_local
-        habit.save(update_fields=["last_reminder"])
+        schedule_next_reminder(habit, now_local, tz)
+        if save:
+            habit.save(update_fields=["last_reminder", "next_reminder_at", "updated_at"])
         stats["sent"] += 1
+        observe_queue_lag(habit.time, timezone.now(), tz)
         logger.info(
-            "process_single_habit: sent OK habit_id=%s user_id=%s last_reminder=%s",
+            "process_habit: sent OK habit_id=%s user_id=%s last_reminder=%s next_reminder_at=%s",
             habit.id,
             habit.user_id,
             now_local.isoformat(),
+            habit.next_reminder_at.isoformat() if habit.next_reminder_at else None,
         )
     else:
         stats["errors"] += 1
-        logger.error("process_single_habit: send failed habit_id=%s user_id=%s", habit.id, habit.user_id)
+        logger.error("process_habit: send failed habit_id=%s user_id=%s", habit.id, habit.user_id)
 
-    return stats
 
+def _save_sent_habits(habits: Sequence[Habit], now_local: datetime) -> None:
+    """
+    Сохраняет last_reminder и next_reminder_at успешно отправленных привычек одним UPDATE.
 
-def enqueue_due_habits(now: datetime) -> Dict[str, int]:
-    """Находит привычки, которым пора, и ставит задачи в очередь."""
-    stats = {"enqueued": 0, "skipped": 0, "errors": 0}
+    last_reminder у всех одинаковый, а next_reminder_at задаётся по группам (_update_next_reminders).
+    """
+    ids_by_next: Dict[Optional[datetime], List[int]] = {}
+    for habit in habits:
+        ids_by_next.setdefault(habit.next_reminder_at, []).append(habit.id)
+
+    _update_next_reminders(ids_by_next, last_reminder=now_local)
+
+
+def _process_habit(habit: Habit, now_local: datetime, stats: Dict[str, int]) -> None:
+    """Отправляет напоминание по загруженной привычке и обновляет last_reminder при успехе."""
+    prepared = _prepare_habit_message(habit, now_local, stats)
+    if prepared is None:
+        return
+
+    telegram_id, message = prepared
+    success = send_telegram_notification(telegram_id, message)
+    _finish_habit(habit, now_local, success, stats)
+
+
+def process_single_habit(habit_id: int, now: datetime) -> Dict[str, int]:
+    """Отправляет напоминание по одной привычке и обновляет last_reminder при успехе."""
+    stats = {"sent": 0, "skipped": 0, "errors": 0}
 
     now_local = _normalize_local_datetime(now)
-    logger.info("enqueue_due_habits: tick now=%s", now_local.isoformat())
+    logger.info("process_single_habit: start habit_id=%s now=%s", habit_id, now_local.isoformat())
 
     try:
-        due_habits = get_due_habits(now_local)
+        habit = Habit.objects.select_related("user", "related_habit").get(id=habit_id)
+    except Habit.DoesNotExist:
+        logger.warning("process_single_habit: habit not found id=%s", habit_id)
+        stats["errors"] += 1
+        record_stats("process", stats)
+        return stats
+
+    _process_habit(habit, now_local, stats)
+    record_stats("process", stats)
+    return stats
+
+
+def process_habit_batch(habit_ids: Sequence[int], now: datetime) -> Dict[str, int]:
+    """Отправляет напоминания по пачке привычек: одна выборка из БД и один запрос к API бота."""
+    stats = {"sent": 0, "skipped": 0, "errors": 0}
+
+    now_local = _normalize_local_datetime(now)
+    # Повторы id внутри пачки обрабатываются один раз — как и задачи с одинаковым task_id
+    habit_ids = list(dict.fromkeys(habit_ids))
+    logger.info("process_habit_batch: start size=%s now=%s", len(habit_ids), now_local.isoformat())
+
+    habits = Habit.objects.select_related("user", "related_habit").in_bulk(habit_ids)
+
+    prepared: List[Tuple[Habit, str, str]] = []
+    for habit_id in habit_ids:
+        habit = habits.get(habit_id)
+        if habit is None:
+            logger.warning("process_habit_batch: habit not found id=%s", habit_id)
+            stats["errors"] += 1
+            continue
 
-        if not due_habits:
-            logger.info("enqueue_due_habits: no due habits now=%s", now_local.isoformat())
-            return stats
+        item = _prepare_habit_message(habit, now_local, stats)
+        if item is not None:
+            prepared.append((habit, *item))
+
+    # Все сообщения пачки уходят в бот одним запросом POST /send-batch/,
+    # а успешные отметки записываются одним UPDATE; неудачные и пропущенные не трогаем
+    if prepared:
+        results = send_telegram_notifications_bulk([(telegram_id, text) for _, telegram_id, text in prepared])
+        sent_habits: List[Habit] = []
+        for (habit, _, _), success in zip(prepared, results):
+            _finish_habit(habit, now_local, success, stats, save=False)
+            if success:
+                sent_habits.append(habit)
+        _save_sent_habits(sent_habits, now_local)
+
+    logger.info(
+        "process_habit_batch: done size=%s sent=%s skipped=%s errors=%s",
+        len(habit_ids),
+        stats["sent"],
+        stats["skipped"],
+        stats["errors"],
+    )
+    record_stats("process", stats)
+    return stats
 
-        logger.info("enqueue_due_habits: due habits count=%s now=%s", len(due_habits), now_local.isoformat())
 
-        from .tasks import send_single_habit_reminder
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
-        for habit in due_habits:
-            telegram_id = _get_user_telegram_id(habit)
-            if not telegram_id:
-                logger.info(
-                    "enqueue_due_habits: skipped enqueue habit_id=%s user_id=%s reason=telegram_not_linked",
-                    habit.id,
-                    habit.user_id,
-                )
-                stats["skipped"] += 1
-                continue
 
-            task_id = f"habit:{habit.id}:{now_local.strftime('%Y%m%d%H%M')}"
+def _enqueue_due_chunk(
+    rows: List[Dict[str, Any]], slot: str, batch_size: int, stats: Dict[str, int], handled: Set[int]
+) -> None:
+    """Ставит задачи по одному куску строк get_due_habits; в handled — id поставленных и пропущенных."""
+    from .tasks import send_habit_reminder_batch, send_single_habit_reminder
 
+    batch_ids: List[int] = []
+
+    for row in rows:
+        telegram_id = _normalize_telegram_id(row["user__telegram_id"])
+        if not telegram_id:
             logger.info(
-                "enqueue_due_habits: enqueue habit_id=%s user_id=%s task_id=%s telegram_id=%s",
-                habit.id,
-                habit.user_id,
-                task_id,
-                telegram_id,
+                "enqueue_due_habits: skipped enqueue habit_id=%s user_id=%s reason=telegram_not_linked",
+                row["id"],
+                row["user_id"],
             )
+            stats["skipped"] += 1
+            handled.add(row["id"])
+            continue
+
+        if batch_size > 0:
+            batch_ids.append(row["id"])
+            continue
+
+        task_id = f"habit:{row['id']}:{slot}"
+
+        logger.info(
+            "enqueue_due_habits: enqueue habit_id=%s user_id=%s task_id=%s telegram_id=%s",
+            row["id"],
+            row["user_id"],
+            task_id,
+            telegram_id,
+        )
+
+        send_single_habit_reminder.apply_async(
+            args=[row["id"]],
+            task_id=task_id,
+        )
+        handled.add(row["id"])
+        stats["enqueued"] += 1
 
-            send_single_habit_reminder.apply_async(
-                args=[habit.id],
-                task_id=task_id,
+    for chunk in _chunked(batch_ids, batch_size):
+        # Привычка попадает ровно в одну пачку за слот, поэтому первый id однозначно задаёт пачку
+        task_id = f"habit-batch:{chunk[0]}:{slot}"
+
+        logger.info(
+            "enqueue_due_habits: enqueue batch size=%s first_habit_id=%s task_id=%s",
+            len(chunk),
+            chunk[0],
+            task_id,
+        )
+
+        send_habit_reminder_batch.apply_async(
+            args=[chunk],
+            task_id=task_id,
+        )
+        handled.update(chunk)
+        stats["enqueued"] += len(chunk)
+
+
+def _release_unsent_claims(
+    rows: List[Dict[str, Any]], ids_by_next: Dict[Optional[datetime], List[int]], handled: Set[int]
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает прежний next_reminder_at привычкам куска, чьи задачи не удалось поставить
+    (ошибка брокера): иначе их слот уже перенесён и напоминание за него не придёт. Слот
+    возвращается, только если в БД ещё записан перенос этого тика. Возвращает такие строки.
+    """
+    claimed_next = {habit_id: next_at for next_at, ids in ids_by_next.items() for habit_id in ids}
+    unsent = [row for row in rows if row["id"] not in handled and row["id"] in claimed_next]
+    groups: Dict[Tuple[Optional[datetime], datetime], List[int]] = {}
+    for row in unsent:
+        groups.setdefault((claimed_next[row["id"]], row["next_reminder_at"]), []).append(row["id"])
+    for (claimed, previous), ids in groups.items():
+        Habit.objects.filter(id__in=ids, next_reminder_at=claimed).update(
+            next_reminder_at=previous, updated_at=timezone.now()
+        )
+    publish_changes(habit_ids=[row["id"] for row in unsent])
+    return unsent
+
+
+def enqueue_due_habits(now: datetime) -> Dict[str, int]:
+    """
+    Находит привычки, которым пора, и ставит задачи в очередь.
+
+    Привычки читаются кусками по HABIT_REMINDER_SCAN_CHUNK_SIZE: у каждого куска сразу переносятся
+    слоты и ставятся задачи, так что память beat не зависит от числа привычек.
+    """
+    stats = {"enqueued": 0, "skipped": 0, "errors": 0}
+
+    now_local = _normalize_local_datetime(now)
+    logger.info("enqueue_due_habits: tick now=%s", now_local.isoformat())
+
+    # HABIT_REMINDER_BATCH_SIZE > 0 включает пакетный режим: одна задача на пачку привычек.
+    # Пачки не переходят через границу куска, поэтому размер куска лучше делать кратным размеру пачки.
+    batch_size = getattr(settings, "HABIT_REMINDER_BATCH_SIZE", 0)
+    chunk_size = getattr(settings, "HABIT_REMINDER_SCAN_CHUNK_SIZE", 2000)
+    slot = now_local.strftime("%Y%m%d%H%M")
+    due_count = 0
+
+    with TICK_DURATION.time():
+        try:
+            for rows in _chunked(get_due_habits(now_local, chunk_size=chunk_size), chunk_size):
+                due_count += len(rows)
+                # Сначала перенос слотов, потом задачи: иначе быстрый воркер успеет записать
+                # next_reminder_at по новому last_reminder, а перенос затрёт его значением по старому
+                ids_by_next = _claim_due_habits(rows, now_local)
+                handled: Set[int] = set()
+                try:
+                    _enqueue_due_chunk(rows, slot, batch_size, stats, handled)
+                except Exception:
+                    _release_unsent_claims(rows, ids_by_next, handled)
+                    raise
+
+        except Exception as e:
+            stats["errors"] += 1
+            logger.exception("enqueue_due_habits: critical error: %s", e)
+
+    record_stats("enqueue", stats)
+
+    if not due_count and not stats["errors"]:
+        logger.info("enqueue_due_habits: no due habits now=%s", now_local.isoformat())
+        return stats
+
+    logger.info(
+        "enqueue_due_habits: done due=%s enqueued=%s skipped=%s errors=%s now=%s",
+        due_count,
+        stats["enqueued"],
+        stats["skipped"],
+        stats["errors"],
+        now_local.isoformat(),
+    )
+    return stats
+
+
+def _claim_indexed_habits(
+    rows: List[Dict[str, Any]], now: datetime
+) -> Tuple[List[Dict[str, Any]], Dict[int, Dict[str, Any]], Dict[Optional[datetime], List[int]]]:
+    """
+    Переносит слоты строк индекса, которые и в БД всё ещё наступили.
+
+    Индекс отстаёт от БД на задержку ленты изменений (при потерянном сообщении — до сверки),
+    поэтому строки перечитываются по первичному ключу под блокировкой: привычку, которую
+    только что перенесли или удалили через API, тик не отправляет и её слот не затирает.
+    Следующий слот считается по данным БД. Возвращает (строки для постановки в очередь,
+    строки БД по id, слоты переноса).
+    """
+    with transaction.atomic(savepoint=False):
+        current = {
+            row["id"]: row
+            for row in Habit.objects.select_for_update(of=("self",))
+            .filter(id__in=[row["id"] for row in rows])
+            .order_by("id")
+            .values("id", "time", "frequency", "last_reminder", "next_reminder_at", "user_id", "user__timezone")
+        }
+        due = []
+        for row in rows:
+            stored = current.get(row["id"])
+            if stored is not None and stored["next_reminder_at"] is not None and stored["next_reminder_at"] <= now:
+                # Telegram пользователя — из индекса: воркер всё равно перечитывает его перед отправкой
+                due.append({**row, **stored})
+        ids_by_next = _claim_due_habits(due, now)
+    return due, current, ids_by_next
+
+
+def _sync_index_with_claim(
+    index: ReminderIndex,
+    rows: List[Dict[str, Any]],
+    current: Dict[int, Dict[str, Any]],
+    ids_by_next: Dict[Optional[datetime], List[int]],
+) -> None:
+    """Переносит в индексе отправленные привычки, а устаревшие строки заменяет данными БД."""
+    index.move(ids_by_next)
+    claimed = {habit_id for ids in ids_by_next.values() for habit_id in ids}
+    for row in rows:
+        if row["id"] in claimed:
+            continue
+        stored = current.get(row["id"])
+        if stored is None:
+            index.discard(row["id"])
+        else:
+            index.put_habit(
+                stored["id"],
+                stored["next_reminder_at"],
+                stored["time"],
+                stored["frequency"],
+                stored["last_reminder"],
+                stored["user_id"],
             )
-            stats["enqueued"] += 1
 
-    except Exception as e:
-        stats["errors"] += 1
-        logger.exception("enqueue_due_habits: critical error: %s", e)
 
+def enqueue_due_habits_from_index(index: ReminderIndex, now: datetime) -> Dict[str, int]:
+    """
+    enqueue_due_habits по расписанию в памяти beat (habits/reminder_index.py): привычки берутся
+    из наступивших корзин индекса без сканирования БД. Перед постановкой в очередь строки куска
+    перечитываются по первичному ключу и переносятся только те, что наступили и в БД
+    (_claim_indexed_habits); перенос сразу применяется к индексу.
+    """
+    stats = {"enqueued": 0, "skipped": 0, "errors": 0}
+
+    now_local = _normalize_local_datetime(now)
+    batch_size = getattr(settings, "HABIT_REMINDER_BATCH_SIZE", 0)
+    chunk_size = getattr(settings, "HABIT_REMINDER_SCAN_CHUNK_SIZE", 2000)
+    slot = now_local.strftime("%Y%m%d%H%M")
+    due_count = 0
+
+    # lock держится только на время работы с памятью: запросы к БД и брокеру идут без него,
+    # и поток ленты изменений не ждёт тик
+    with TICK_DURATION.time():
+        with index.lock:
+            rows = index.pop_due(now_local)
+        claimed = 0
+        try:
+            while claimed < len(rows):
+                end = claimed + chunk_size
+                chunk = rows[claimed:end]
+                due, current, ids_by_next = _claim_indexed_habits(chunk, now_local)
+                with index.lock:
+                    _sync_index_with_claim(index, chunk, current, ids_by_next)
+                claimed += len(chunk)
+                due_count += len(due)
+                handled: Set[int] = set()
+                try:
+                    _enqueue_due_chunk(due, slot, batch_size, stats, handled)
+                except Exception:
+                    unsent = _release_unsent_claims(due, ids_by_next, handled)
+                    with index.lock:
+                        for row in unsent:
+                            index.put_habit(
+                                row["id"],
+                                row["next_reminder_at"],
+                                row["time"],
+                                row["frequency"],
+                                row["last_reminder"],
+                                row["user_id"],
+                            )
+                    raise
+        except Exception as e:
+            stats["errors"] += 1
+            logger.exception("enqueue_due_habits_from_index: critical error: %s", e)
+            # Неперенесённые слоты остаются наступившими — как строки в БД, их заберёт следующий тик
+            with index.lock:
+                for row in rows[claimed:]:
+                    index.put_habit(
+                        row["id"],
+                        row["next_reminder_at"],
+                        row["time"],
+                        row["frequency"],
+                        row["last_reminder"],
+                        row["user_id"],
+                    )
+
+    record_stats("enqueue", stats)
     logger.info(
-        "enqueue_due_habits: done enqueued=%s skipped=%s errors=%s now=%s",
+        "enqueue_due_habits_from_index: done due=%s stale=%s enqueued=%s skipped=%s errors=%s now=%s",
+        due_count,
+        claimed - due_count,
         stats["enqueued"],
         stats["skipped"],
         stats["errors"],
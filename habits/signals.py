@@ -0,0 +1,129 @@
+from typing import Iterable
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from habits.cache import bump_generation
+from habits.models import Habit
+from habits.reminder_index import publish_changes
+from habits.services import reschedule_habits
+from habits.sync import record_tombstone
+from users.models import TokenUser, User
+
+# Поля, попадающие в публичную ленту (HabitPublicSerializer), и сам флаг публичности
+PUBLIC_FEED_FIELDS = (
+    "is_public",
+    "place",
+    "time",
+    "action",
+    "is_pleasant",
+    "frequency",
+    "duration",
+    "reward",
+    "related_habit_id",
+)
+
+# Поля пользователя, которые хранит расписание в памяти beat (habits/reminder_index.py)
+REMINDER_INDEX_USER_FIELDS = {"telegram_id", "timezone"}
+
+_MISSING = object()
+
+
+def _public_snapshot(instance: Habit) -> tuple:
+    return tuple(instance.__dict__.get(field, _MISSING) for field in PUBLIC_FEED_FIELDS)
+
+
+def _bump_on_commit(using: str) -> None:
+    # Сбрасываем кеш после коммита, иначе параллельный запрос закеширует ещё старые данные
+    transaction.on_commit(bump_generation, using=using)
+
+
+@receiver(post_init, sender=Habit)
+def remember_public_state(sender, instance, **kwargs):
+    instance._public_feed_snapshot = _public_snapshot(instance)
+
+
+def _public_feed_changed(instance: Habit, created: bool) -> bool:
+    previous = instance._public_feed_snapshot
+    current = _public_snapshot(instance)
+    instance._public_feed_snapshot = current
+
+    was_public = not created and previous[0] is True
+    if not (was_public or instance.is_public):
+        return False
+    return created or previous != current
+
+
+@receiver(post_save, sender=Habit)
+def invalidate_public_feed_on_save(sender, instance, created, using, **kwargs):
+    if _public_feed_changed(instance, created):
+        _bump_on_commit(using)
+
+
+def bulk_saved(instances: Iterable[Habit], created: bool, using: str = DEFAULT_DB_ALIAS) -> None:
+    """Аналог post_save для bulk_create/bulk_update, которые сигналов не отправляют."""
+    instances = list(instances)
+    # Список, а не генератор: снимок должен обновиться у каждого объекта
+    if any([_public_feed_changed(instance, created) for instance in instances]):
+        _bump_on_commit(using)
+    publish_changes(habit_ids=[instance.pk for instance in instances], using=using)
+
+
+@receiver(post_save, sender=Habit)
+@receiver(post_delete, sender=Habit)
+def publish_habit_change(sender, instance, using, **kwargs):
+    publish_changes(habit_ids=[instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Habit)
+def invalidate_public_feed_on_delete(sender, instance, using, **kwargs):
+    # related_habit ссылающихся привычек обнуляется UPDATE-ом без сигналов. Ссылаться можно
+    # только на приятную привычку, поэтому её удаление тоже сбрасывает ленту — без лишних запросов
+    if instance.is_public or instance.is_pleasant:
+        _bump_on_commit(using)
+
+
+@receiver(pre_delete, sender=Habit)
+def touch_habits_referencing_deleted(sender, instance, origin, using, **kwargs):
+    # Обнуление related_habit не сдвигает updated_at ссылающихся привычек, и /habits/changes/
+    # не вернул бы их клиенту. Ссылаться можно только на приятную привычку
+    origin_model = getattr(origin, "model", type(origin))
+    if instance.is_pleasant and origin_model is Habit:
+        Habit.objects.using(using).filter(related_habit_id=instance.pk).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Habit)
+def record_habit_tombstone(sender, instance, origin, **kwargs):
+    # При удалении пользователя его отметки всё равно удалятся каскадом — не создаём их
+    origin_model = getattr(origin, "model", type(origin))
+    if origin_model is Habit:
+        record_tombstone(instance)
+
+
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=TokenUser)
+def remember_user_timezone(sender, instance, **kwargs):
+    instance._timezone_snapshot = instance.__dict__.get("timezone", _MISSING)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=TokenUser)
+def reschedule_on_timezone_change(sender, instance, created, **kwargs):
+    # Время привычек задано в поясе пользователя: при смене пояса слоты переносятся сразу
+    previous = instance._timezone_snapshot
+    current = instance._timezone_snapshot = instance.__dict__.get("timezone", _MISSING)
+    if created or current is _MISSING or current == previous:
+        return
+    reschedule_habits(Habit.objects.filter(user_id=instance.pk), timezone.now())
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=TokenUser)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=TokenUser)
+def publish_user_change(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and not REMINDER_INDEX_USER_FIELDS.intersection(update_fields):
+        return
+    publish_changes(user_ids=[instance.pk], using=using)
@@ -0,0 +1,116 @@
+"""
+Дельта-синхронизация привычек пользователя (GET /api/habits/changes/).
+
+Токен — позиция клиента в двух потоках: изменённые привычки по (updated_at, id) и отметки
+об удалении (HabitTombstone) по (deleted_at, id). Каждый поток читается по ключу через
+индекс, поэтому стоимость запроса зависит от числа изменений, а не от числа привычек.
+
+updated_at выставляется в момент save(), а транзакция может закоммититься позже, поэтому
+после полного прочтения потока позиция откатывается на HABIT_SYNC_OVERLAP_SECONDS назад:
+клиент может получить запись повторно, но не пропустит её.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from rest_framework.exceptions import APIException, NotFound
+
+from habits.models import Habit, HabitTombstone
+
+Position = Tuple[datetime, int]
+
+
+class SyncTokenExpired(APIException):
+    status_code = 410
+    default_detail = "Токен синхронизации устарел, выполните полную синхронизацию (без since)."
+    default_code = "sync_token_expired"
+
+
+def encode_token(changed: Position, deleted: Position) -> str:
+    data = {"h": [changed[0].isoformat(), changed[1]], "t": [deleted[0].isoformat(), deleted[1]]}
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Tuple[Position, Position]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return tuple((datetime.fromisoformat(data[key][0]), int(data[key][1])) for key in ("h", "t"))
+    except (binascii.Error, ValueError, TypeError, KeyError, IndexError):
+        raise NotFound("Некорректный токен синхронизации.")
+
+
+def _after(queryset: QuerySet, field: str, position: Position) -> QuerySet:
+    # Как в KeysetPagination: избыточная нижняя граница даёт диапазон по индексу
+    moment, pk = position
+    return queryset.filter(Q(**{f"{field}__gt": moment}) | Q(id__gt=pk), **{f"{field}__gte": moment})
+
+
+def _read_stream(queryset: QuerySet, field: str, position: Optional[Position], limit: int, floor: Position):
+    """Читает до limit записей после position; возвращает (записи, новая позиция, есть ли ещё)."""
+    if position is not None:
+        queryset = _after(queryset, field, position)
+    rows = list(queryset.order_by(field, "id")[: limit + 1])
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (getattr(last, field), last.pk), True
+
+    # Поток прочитан до конца: следующая синхронизация начнётся с окна перекрытия
+    return rows, floor, False
+
+
+def get_changes(user, token: Optional[str] = None) -> Dict:
+    """
+    Изменения привычек пользователя после токена.
+
+    Без токена возвращаются все привычки (полная синхронизация) без отметок об удалении.
+    Результат: changed — привычки, deleted — [{id, deleted_at}], next_token, has_more.
+    """
+    now = timezone.now()
+    limit = getattr(settings, "HABIT_SYNC_PAGE_SIZE", 500)
+    floor = (now - timedelta(seconds=getattr(settings, "HABIT_SYNC_OVERLAP_SECONDS", 5)), 0)
+
+    if token:
+        changed_position, deleted_position = decode_token(token)
+        retention = timedelta(days=getattr(settings, "HABIT_SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+        if deleted_position[0] < now - retention:
+            raise SyncTokenExpired()
+    else:
+        changed_position = deleted_position = None
+
+    changed, changed_position, changed_more = _read_stream(
+        Habit.objects.filter(user=user), "updated_at", changed_position, limit, floor
+    )
+    if token:
+        deleted, deleted_position, deleted_more = _read_stream(
+            HabitTombstone.objects.filter(user=user), "deleted_at", deleted_position, limit, floor
+        )
+    else:
+        deleted, deleted_position, deleted_more = [], floor, False
+
+    return {
+        "changed": changed,
+        "deleted": [{"id": tombstone.habit_id, "deleted_at": tombstone.deleted_at} for tombstone in deleted],
+        "next_token": encode_token(changed_position, deleted_position),
+        "has_more": changed_more or deleted_more,
+    }
+
+
+def record_tombstone(habit: Habit) -> None:
+    HabitTombstone.objects.create(user_id=habit.user_id, habit_id=habit.pk, deleted_at=timezone.now())
+
+
+def prune_tombstones(now: Optional[datetime] = None) -> int:
+    """Удаляет отметки старше HABIT_SYNC_TOMBSTONE_RETENTION_DAYS; возвращает их число."""
+    now = now or timezone.now()
+    retention = timedelta(days=getattr(settings, "HABIT_SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+    deleted, _ = HabitTombstone.objects.filter(deleted_at__lt=now - retention).delete()
+    return deleted
@@ -4,7 +4,8 @@ import httpx
 from celery import shared_task
 from django.utils import timezone
 
-from .services import enqueue_due_habits, process_single_habit
+from .services import enqueue_due_habits, process_habit_batch, process_single_habit, reschedule_for_offset_changes
+from .sync import prune_tombstones
 
 logger = logging.getLogger(__name__)
 
@@ -55,3 +56,41 @@ def send_single_habit_reminder(self, habit_id: int) -> dict:
         stats.get("errors", 0),
     )
     return stats
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(httpx.RequestError, httpx.HTTPStatusError),
+    retry_backoff=True,
+    retry_jitter=True,
+    max_retries=5,
+)
+def send_habit_reminder_batch(self, habit_ids: list[int]) -> dict:
+    """Воркер: отправляет напоминания по пачке привычек (HABIT_REMINDER_BATCH_SIZE > 0)."""
+    now = timezone.localtime(timezone.now())
+    stats = process_habit_batch(habit_ids=habit_ids, now=now)
+
+    logger.info(
+        "Habit reminder batch processed: size=%s sent=%s skipped=%s errors=%s",
+        len(habit_ids),
+        stats.get("sent", 0),
+        stats.get("skipped", 0),
+        stats.get("errors", 0),
+    )
+    return stats
+
+
+@shared_task
+def prune_habit_tombstones() -> int:
+    """Периодическая задача: удаляет старые отметки об удалении привычек."""
+    deleted = prune_tombstones()
+    logger.info("Habit tombstones pruned: deleted=%s", deleted)
+    return deleted
+
+
+@shared_task
+def reschedule_habit_reminders() -> dict:
+    """Периодическая задача: пересчитывает слоты в поясах, где скоро переводят часы."""
+    result = reschedule_for_offset_changes(timezone.now())
+    logger.info("Habit reminders rescheduled: timezones=%s moved=%s", result["timezones"], result["moved"])
+    return result
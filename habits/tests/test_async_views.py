@@ -0,0 +1,135 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.async_views import with_async_reads
+from habits import urls as habit_urls
+from habits.models import Habit
+from habits.views import HabitViewSet
+from users.models import User
+
+# URL-конфигурация с API_ASYNC_READS=True (как в config/urls.py под ASGI)
+urlpatterns = [
+    path(
+        "api/habits/",
+        include((with_async_reads(habit_urls.urlpatterns, habit_urls.async_read_views), habit_urls.app_name)),
+    ),
+]
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class AsyncHabitReadsTest(TestCase):
+    """Async-представления отдают те же байты, статусы и валидаторы, что и sync-представления."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.other = User.objects.create_user(email="other@example.com", password="testpass123")
+        self.habits = [
+            Habit.objects.create(
+                user=self.user, place="Дом", time="10:00", action=f"Зарядка {i}", reward="Кофе", is_public=i % 2 == 0
+            )
+            for i in range(7)
+        ]
+        self.foreign = Habit.objects.create(user=self.other, place="Парк", time="08:00", action="Бег", is_public=True)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def sync_get(self, url, **headers):
+        return self.client.get(url, headers={**self.headers, **headers})
+
+    def async_get(self, url, **headers):
+        with override_settings(ROOT_URLCONF=__name__):
+            return async_to_sync(self.async_client.get)(url, headers={**self.headers, **headers})
+
+    def assertSameResponse(self, url, **headers):
+        expected = self.sync_get(url, **headers)
+        cache.clear()
+        response = self.async_get(url, **headers)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        for header in ("Content-Type", "ETag", "Last-Modified", "WWW-Authenticate"):
+            self.assertEqual(response.get(header), expected.get(header), header)
+        return response
+
+    def test_habit_list(self):
+        for url in (
+            "/api/habits/",
+            "/api/habits/?page=2",
+            "/api/habits/?page=9",
+            "/api/habits/?pagination=cursor&page_size=3",
+            "/api/habits/?ordering=action",
+        ):
+            with self.subTest(url=url):
+                self.assertSameResponse(url)
+
+    def test_habit_list_cursor_pages(self):
+        first = self.async_get("/api/habits/?pagination=cursor").json()
+        second = self.async_get(first["next"]).json()
+        back = self.async_get(second["previous"]).json()
+
+        self.assertEqual(back, first)
+        self.assertEqual(
+            [habit["id"] for habit in first["results"] + second["results"]],
+            [habit.id for habit in reversed(self.habits)],
+        )
+
+    @override_settings(HABIT_FAST_READ_PATH=False)
+    def test_habit_list_serializer_path(self):
+        self.assertSameResponse("/api/habits/?page=2")
+        self.assertSameResponse("/api/habits/public/")
+
+    def test_habit_detail(self):
+        for url in (f"/api/habits/{self.habits[0].id}/", f"/api/habits/{self.foreign.id}/", "/api/habits/abc/"):
+            with self.subTest(url=url):
+                self.assertSameResponse(url)
+
+    def test_public_feed(self):
+        self.assertSameResponse("/api/habits/public/")
+
+        cache.clear()
+        self.assertEqual(self.async_get("/api/habits/public/")["X-Cache"], "MISS")
+        # Только пользователь из JWT
+        with self.assertNumQueries(1):
+            hit = self.async_get("/api/habits/public/")
+        self.assertEqual(hit["X-Cache"], "HIT")
+        self.assertEqual(self.async_get("/api/habits/public/", if_none_match=hit["ETag"]).status_code, 304)
+
+    def test_not_modified(self):
+        etag = self.async_get("/api/habits/")["ETag"]
+
+        # Пользователь и агрегат для ETag; страница не читается
+        with self.assertNumQueries(2):
+            response = self.async_get("/api/habits/", if_none_match=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_authentication_errors(self):
+        self.headers = {}
+        self.assertSameResponse("/api/habits/")
+        self.assertSameResponse("/api/habits/", authorization="Bearer broken")
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertSameResponse("/api/habits/", authorization=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_other_methods_use_sync_views(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            response = async_to_sync(self.async_client.post)(
+                "/api/habits/",
+                {"place": "Дом", "time": "10:00", "action": "Чтение", "reward": "Чай"},
+                content_type="application/json",
+                headers=self.headers,
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Habit.objects.filter(user=self.user, action="Чтение").exists())
+
+    def test_swagger_and_csrf_attributes_preserved(self):
+        callback = next(pattern.callback for pattern in urlpatterns[0].url_patterns if pattern.name == "habits-list")
+
+        self.assertIs(callback.cls, HabitViewSet)
+        self.assertEqual((callback.actions["get"], callback.actions["post"]), ("list", "create"))
+        self.assertTrue(callback.csrf_exempt)
@@ -0,0 +1,29 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class BenchmarkJSONCommandTest(SimpleTestCase):
+    def test_writes_report_with_speedup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "result.json"
+            call_command("benchmark_json", rows=20, repeat=2, output=str(output), stdout=StringIO())
+            report = json.loads(output.read_text())
+
+        self.assertEqual(
+            [(r["operation"], r["document"], r["backend"]) for r in report["results"]],
+            [
+                ("render", "habit_page", "stdlib"),
+                ("render", "habit_page", "orjson"),
+                ("render", "typed", "stdlib"),
+                ("render", "typed", "orjson"),
+                ("parse", "habit_list", "stdlib"),
+                ("parse", "habit_list", "orjson"),
+            ],
+        )
+        for result in report["results"][1::2]:
+            self.assertIn("speedup", result)
@@ -0,0 +1,34 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from habits.models import Habit
+from users.models import User
+
+
+class BenchmarkSchedulerCommandTest(TestCase):
+    def test_writes_report_and_rolls_back_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "result.json"
+            call_command(
+                "benchmark_scheduler",
+                habits=50,
+                ticks="09:00",
+                batch_size=10,
+                process=True,
+                no_trace_memory=True,
+                output=str(output),
+                stdout=StringIO(),
+            )
+            report = json.loads(output.read_text())
+
+        self.assertEqual(report["params"]["habits"], 50)
+        self.assertEqual([r["phase"] for r in report["results"]], ["enqueue", "process"])
+        for key in ("wall_time_s", "queries", "db_time_s", "peak_memory_bytes"):
+            self.assertIn(key, report["results"][0])
+        self.assertEqual(Habit.objects.count(), 0)
+        self.assertEqual(User.objects.count(), 0)
@@ -0,0 +1,26 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from habits.models import Habit
+from users.models import User
+
+
+class BenchmarkSerializersCommandTest(TestCase):
+    def test_writes_report_and_rolls_back_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "result.json"
+            call_command("benchmark_serializers", rows=20, repeat=2, output=str(output), stdout=StringIO())
+            report = json.loads(output.read_text())
+
+        self.assertEqual(
+            [(r["serializer"], r["mode"]) for r in report["results"]],
+            [("habit", "drf"), ("habit", "values"), ("public", "drf"), ("public", "values")],
+        )
+        self.assertIn("speedup", report["results"][1])
+        self.assertEqual(Habit.objects.count(), 0)
+        self.assertEqual(User.objects.count(), 0)
@@ -0,0 +1,150 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from habits.cache import get_generation
+from habits.models import Habit, HabitTombstone
+from users.models import User
+
+
+class HabitBulkAPITest(TestCase):
+    url = "/api/habits/bulk/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.other_user = User.objects.create_user(email="other@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pleasant = Habit.objects.create(
+            user=self.user, place="Дом", time="10:00", action="Ванна", is_pleasant=True
+        )
+
+    def _items(self, count):
+        return [
+            {"place": "Дом", "time": "08:00", "action": f"Привычка {i}", "related_habit": self.pleasant.id}
+            for i in range(count)
+        ]
+
+    def test_bulk_create(self):
+        response = self.client.post(self.url, self._items(3), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 3)
+        created = Habit.objects.filter(pk__in=[item["id"] for item in response.json()])
+        self.assertEqual(created.count(), 3)
+        self.assertTrue(all(habit.next_reminder_at and habit.user_id == self.user.id for habit in created))
+
+    def test_bulk_create_query_count_does_not_grow(self):
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, self._items(size), format="json")
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(queries.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_create_per_item_errors(self):
+        foreign = Habit.objects.create(
+            user=self.other_user, place="Дом", time="10:00", action="Чужая", is_pleasant=True
+        )
+        items = self._items(4)
+        items[1]["reward"] = "Конфета"
+        items[3]["related_habit"] = foreign.id
+
+        response = self.client.post(self.url, items, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(set(errors), {"1", "3"})
+        self.assertIn("related_habit", errors["1"])
+        self.assertIn("related_habit", errors["3"])
+        self.assertEqual(Habit.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(HABIT_BULK_MAX_ITEMS=2)
+    def test_bulk_limit(self):
+        response = self.client.post(self.url, self._items(3), format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_update(self):
+        habits = [Habit.objects.create(user=self.user, place="Дом", time="08:00", action=f"П{i}") for i in range(2)]
+        before = {habit.pk: (habit.updated_at, habit.next_reminder_at) for habit in habits}
+
+        response = self.client.patch(
+            self.url,
+            [{"id": habits[0].id, "time": "21:00"}, {"id": habits[1].id, "action": "Бег"}],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        first, second = (Habit.objects.get(pk=habit.pk) for habit in habits)
+        self.assertEqual(first.time.hour, 21)
+        self.assertEqual(first.next_reminder_at.astimezone().hour, 21)
+        self.assertEqual(second.action, "Бег")
+        self.assertGreater(second.updated_at, before[second.pk][0])
+
+    def test_bulk_update_errors(self):
+        habit = Habit.objects.create(user=self.user, place="Дом", time="08:00", action="П")
+        foreign = Habit.objects.create(user=self.other_user, place="Дом", time="08:00", action="Чужая")
+
+        response = self.client.patch(
+            self.url,
+            [
+                {"id": habit.id, "action": "Новое"},
+                {"id": habit.id, "action": "Ещё"},
+                {"id": foreign.id, "action": "Взлом"},
+                {"id": self.pleasant.id, "related_habit": self.pleasant.id},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(set(errors), {"1", "2", "3"})
+        self.assertEqual(errors["1"], {"id": ["Привычка повторяется в запросе."]})
+        self.assertEqual(errors["2"], {"id": ["Привычка не найдена."]})
+        self.assertIn("related_habit", errors["3"])
+        habit.refresh_from_db()
+        self.assertEqual(habit.action, "П")
+
+    def test_bulk_delete(self):
+        habits = [Habit.objects.create(user=self.user, place="Дом", time="08:00", action=f"П{i}") for i in range(2)]
+        ids = [habit.id for habit in habits]
+
+        response = self.client.delete(self.url, {"ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Habit.objects.filter(pk__in=ids).exists())
+        self.assertEqual(set(HabitTombstone.objects.values_list("habit_id", flat=True)), set(ids))
+
+    def test_bulk_delete_missing_id(self):
+        foreign = Habit.objects.create(user=self.other_user, place="Дом", time="08:00", action="Чужая")
+
+        response = self.client.delete(self.url, {"ids": [self.pleasant.id, foreign.id]}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"ids": {"1": ["Привычка не найдена."]}})
+        self.assertTrue(Habit.objects.filter(pk=self.pleasant.id).exists())
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_bulk_writes_invalidate_public_feed(self):
+        cache.clear()
+        generation = get_generation()
+        items = self._items(2)
+        items[0]["is_public"] = True
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, items, format="json")
+        self.assertEqual(get_generation(), generation + 1)
+
+        private_id = response.json()[1]["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.url, [{"id": private_id, "action": "Тихо"}], format="json")
+        self.assertEqual(get_generation(), generation + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.url, [{"id": private_id, "is_public": True}], format="json")
+        self.assertEqual(get_generation(), generation + 2)
@@ -0,0 +1,130 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from habits.models import Habit
+from habits.services import process_single_habit
+from users.models import User
+
+
+class HabitConditionalGetTest(TestCase):
+    list_url = "/api/habits/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123", telegram_id="1")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.habit = Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Зарядка")
+        self.detail_url = f"/api/habits/{self.habit.id}/"
+
+    def test_retrieve_not_modified(self):
+        response = self.client.get(self.detail_url)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    def test_retrieve_after_update(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.client.patch(self.detail_url, {"action": "Бег"}, format="json")
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_retrieve_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_not_modified_uses_single_aggregate_query(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_etag_changes_on_create_and_delete(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        other = Habit.objects.create(user=self.user, place="Дом", time="11:00", action="Чтение")
+        created = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(created.status_code, 200)
+
+        other.delete()
+        deleted = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=created["ETag"])
+        self.assertEqual(deleted.status_code, 200)
+
+    def test_list_without_last_modified(self):
+        older = Habit.objects.create(user=self.user, place="Дом", time="11:00", action="Чтение")
+        Habit.objects.filter(id=older.id).update(updated_at=self.habit.updated_at.replace(year=2020))
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+
+        response = self.client.get(self.list_url)
+        self.assertNotIn("Last-Modified", response)
+
+        # Удаление не самой свежей привычки не сдвигает max(updated_at): по дате списка был бы 304
+        older.delete()
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_list_etag_depends_on_page_and_user(self):
+        first = self.client.get(self.list_url)["ETag"]
+        cursor = self.client.get(self.list_url, {"pagination": "cursor"})["ETag"]
+
+        other_user = User.objects.create_user(email="other@example.com", password="testpass123")
+        Habit.objects.create(
+            user=other_user, place="Дом", time="10:00", action="Зарядка", updated_at=self.habit.updated_at
+        )
+        self.client.force_authenticate(other_user)
+        other = self.client.get(self.list_url)["ETag"]
+
+        self.assertEqual(len({first, cursor, other}), 3)
+
+    @patch("habits.services.send_telegram_notification", return_value=True)
+    def test_reminder_send_changes_etag(self, mock_send):
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        process_single_habit(self.habit.id, datetime(2030, 1, 1, 10, 0))
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()["last_reminder"])
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class PublicFeedConditionalGetTest(TestCase):
+    url = "/api/habits/public/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Зарядка", is_public=True)
+
+    def test_not_modified_on_miss_and_on_cache_hit(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            hit = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(hit.status_code, 304)
+
+        cache.clear()
+        with self.assertNumQueries(1):
+            miss = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(miss.status_code, 304)
@@ -0,0 +1,113 @@
+import os
+import runpy
+from pathlib import Path
+from unittest import mock
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from config import celery as celery_config
+from config.celery import BeatScheduler, app, close_db_connections_before_fork
+from habits.tasks import prune_habit_tombstones
+
+SETTINGS_PATH = Path(settings.BASE_DIR) / "config" / "settings.py"
+SETTINGS_ENV = (
+    "API_ASYNC_READS",
+    "CELERY_DB_REUSE_MAX",
+    "DB_CONN_HEALTH_CHECKS",
+    "DB_CONN_MAX_AGE",
+    "DB_POOL",
+    "DB_POOL_MAX_SIZE",
+    "DB_POOL_MIN_SIZE",
+    "DB_POOL_TIMEOUT",
+)
+
+
+def load_settings(**env) -> dict:
+    """Исполняет config/settings.py только с заданными переменными из SETTINGS_ENV (без .env)."""
+    with mock.patch.dict("os.environ"), mock.patch("dotenv.load_dotenv"):
+        for name in SETTINGS_ENV:
+            os.environ.pop(name, None)
+        os.environ.update(env)
+        return runpy.run_path(str(SETTINGS_PATH))
+
+
+class DatabaseSettingsTest(SimpleTestCase):
+    def test_persistent_connections_by_default(self):
+        database = load_settings()["DATABASES"]["default"]
+
+        self.assertEqual(database["CONN_MAX_AGE"], 60)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertEqual(database["OPTIONS"], {})
+
+    def test_env_configuration(self):
+        database = load_settings(DB_CONN_MAX_AGE="300", DB_CONN_HEALTH_CHECKS="False")["DATABASES"]["default"]
+
+        self.assertEqual(database["CONN_MAX_AGE"], 300)
+        self.assertFalse(database["CONN_HEALTH_CHECKS"])
+
+    def test_pool_disables_persistent_connections(self):
+        database = load_settings(DB_POOL="True", DB_CONN_MAX_AGE="300", DB_POOL_MAX_SIZE="20")["DATABASES"]["default"]
+
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(database["OPTIONS"]["pool"], {"min_size": 2, "max_size": 20, "timeout": 10.0})
+
+    def test_asgi_disables_persistent_connections(self):
+        database = load_settings(API_ASYNC_READS="True", DB_CONN_MAX_AGE="300")["DATABASES"]["default"]
+
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+
+    def test_celery_reuses_connections_between_tasks(self):
+        self.assertEqual(load_settings()["CELERY_DB_REUSE_MAX"], 1000)
+        self.assertIsNone(load_settings(CELERY_DB_REUSE_MAX="0")["CELERY_DB_REUSE_MAX"])
+        self.assertEqual(app.conf.beat_scheduler, "config.celery:BeatScheduler")
+
+
+class CeleryConnectionsTest(SimpleTestCase):
+    def send_task_signals(self, is_eager):
+        task = prune_habit_tombstones
+        task.push_request(is_eager=is_eager)
+        try:
+            with mock.patch.object(celery_config, "close_old_connections") as close_old:
+                task_prerun.send(sender=task, task_id="1", task=task, args=(), kwargs={})
+                task_postrun.send(
+                    sender=task, task_id="1", task=task, args=(), kwargs={}, retval=None, state="SUCCESS"
+                )
+        finally:
+            task.pop_request()
+        return close_old
+
+    def test_old_connections_closed_around_task(self):
+        self.assertEqual(self.send_task_signals(is_eager=False).call_count, 2)
+
+    def test_eager_task_keeps_caller_connection(self):
+        self.send_task_signals(is_eager=True).assert_not_called()
+
+    def test_connections_and_pools_closed_before_fork(self):
+        opened = mock.Mock(spec=["close", "close_pool"])
+        sqlite = mock.Mock(spec=["close"])
+        with mock.patch.object(celery_config, "connections") as connections:
+            connections.all.side_effect = lambda initialized_only=False: (
+                [opened] if initialized_only else [opened, sqlite]
+            )
+            close_db_connections_before_fork()
+
+        opened.close.assert_called_once_with()
+        opened.close_pool.assert_called_once_with()
+        sqlite.close.assert_not_called()
+
+
+class BeatSchedulerTest(SimpleTestCase):
+    def test_old_connections_closed_around_tick(self):
+        scheduler = BeatScheduler(app=app, schedule_filename="unused", lazy=True)
+
+        with (
+            mock.patch.object(celery_config, "close_old_connections") as close_old,
+            mock.patch("celery.beat.PersistentScheduler.tick", side_effect=[5.0, RuntimeError]),
+        ):
+            self.assertEqual(scheduler.tick(), 5.0)
+            self.assertEqual(close_old.call_count, 2)
+            with self.assertRaises(RuntimeError):
+                scheduler.tick()
+            self.assertEqual(close_old.call_count, 4)
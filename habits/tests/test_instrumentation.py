@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from config.instrumentation import QueryStats, report
+from habits.models import Habit
+from habits.tasks import send_single_habit_reminder
+from users.models import User
+
+
+# Без кеша публичная лента всегда читается из БД; общий Redis из CACHE_REDIS_URL тесты не трогают
+@override_settings(
+    QUERY_INSTRUMENTATION_ENABLED=True,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+)
+class QueryInstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Зарядка", is_public=True)
+
+        with self.assertLogs("config.instrumentation", level="INFO") as logs:
+            response = self.client.get("/api/habits/public/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("app;dur=", response["Server-Timing"])
+        record = logs.records[-1]
+        self.assertEqual(record.name, "config.instrumentation")
+        self.assertEqual(record.kind, "request")
+        self.assertGreater(record.query_count, 0)
+
+    @override_settings(QUERY_ALERT_COUNT=1)
+    def test_alert_when_threshold_exceeded(self):
+        Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Зарядка")
+
+        with self.assertLogs("config.instrumentation", level="WARNING") as logs:
+            self.client.get("/api/habits/")
+
+        self.assertIn("query_count>1", logs.records[-1].exceeded)
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get("/api/habits/")
+
+        self.assertNotIn("Server-Timing", response)
+
+
+class QueryStatsTest(TestCase):
+    def test_counts_queries_and_slowest(self):
+        stats = QueryStats().start()
+        User.objects.count()
+        User.objects.exists()
+        duration = stats.stop()
+        User.objects.count()
+
+        fields = stats.as_fields(duration)
+        self.assertEqual(fields["query_count"], 2)
+        self.assertIsNotNone(fields["slowest_query"])
+        self.assertGreaterEqual(fields["db_time_ms"], fields["slowest_query_ms"])
+
+    def test_report_without_thresholds(self):
+        stats = QueryStats()
+        with override_settings(
+            QUERY_ALERT_COUNT=0, QUERY_ALERT_DB_TIME_MS=0, QUERY_ALERT_SLOW_QUERY_MS=0, QUERY_ALERT_DURATION_MS=0
+        ):
+            fields = report("task", "example", stats, 5.0)
+
+        self.assertNotIn("exceeded", fields)
+
+
+@override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+class TaskInstrumentationTest(TestCase):
+    @patch("habits.tasks.process_single_habit")
+    def test_reminder_task_is_reported(self, mock_process):
+        mock_process.side_effect = lambda habit_id, now: {"queries": User.objects.count()}
+
+        with self.assertLogs("config.instrumentation", level="INFO") as logs:
+            send_single_habit_reminder.apply(args=[1])
+
+        record = logs.records[-1]
+        self.assertEqual(record.kind, "task")
+        self.assertIn("send_single_habit_reminder", record.getMessage())
+        self.assertEqual(record.query_count, 1)
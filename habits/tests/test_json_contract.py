@@ -0,0 +1,141 @@
+import io
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from config.parsers import ORJSONParser
+from config.renderers import ORJSONRenderer
+from habits.models import Habit
+from users.models import User
+
+
+class ORJSONRendererContractTest(SimpleTestCase):
+    """ORJSONRenderer отдаёт те же байты, что стандартный JSONRenderer DRF."""
+
+    VALUES = {
+        "unicode": 'Привет 🏃 "кавычки" \\ \n\t    \x00',
+        "aware_utc": datetime(2030, 1, 1, 7, 30, 0, 123456, tzinfo=dt_timezone.utc),
+        "aware_offset": datetime(2030, 1, 1, 7, 30, tzinfo=dt_timezone(timedelta(hours=3))),
+        "naive": datetime(2030, 1, 1, 7, 30, 15),
+        "date": date(2030, 1, 1),
+        "time": time(7, 30, 0, 1500),
+        "timedelta": timedelta(minutes=90),
+        "decimal": Decimal("1.50"),
+        "decimal_exp": Decimal("1E+20"),
+        "decimal_small": Decimal("0.00001"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "lazy": gettext_lazy("Привычка"),
+        "tuple": (1, "a", None),
+        "error": ErrorDetail("Обязательное поле.", code="required"),
+        "int_keys": {0: ["ошибка"], 5: {}},
+        "big_int": 2**70,
+        "nested": ReturnDict(OrderedDict([("results", ReturnList([{"id": 1}], serializer=None))]), serializer=None),
+    }
+
+    def test_each_value(self):
+        for name, value in self.VALUES.items():
+            with self.subTest(name):
+                data = {"value": value, "list": [value]}
+                self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_whole_payload(self):
+        self.assertEqual(ORJSONRenderer().render(self.VALUES), JSONRenderer().render(self.VALUES))
+
+    def test_empty_and_scalar(self):
+        for data in (None, [], {}, "строка", 0, True):
+            with self.subTest(data=data):
+                self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class ORJSONParserContractTest(SimpleTestCase):
+    """ORJSONParser разбирает и отвергает те же тела, что стандартный JSONParser DRF."""
+
+    def _parse(self, parser, body, encoding="utf-8"):
+        return parser.parse(io.BytesIO(body), "application/json", {"encoding": encoding})
+
+    def test_same_result(self):
+        bodies = [
+            '{"place": "Дом 🏠", "time": "07:30", "related_habit": null, "is_public": true}'.encode(),
+            b'[{"id": 1, "action": "\\u0411\\u0435\\u0433 \\"q\\""}, {"id": 2}]',
+            b'{"nested": {"a": [1, 2.5, -0.1, 1e3, 12345678901234567]}}',
+            b'{"big": 123456789012345678901234567890}',
+            b'{"dup": 1, "dup": 2}',
+            b'"\\ud800"',
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                self.assertEqual(self._parse(ORJSONParser(), body), self._parse(JSONParser(), body))
+
+    def test_non_utf8_charset(self):
+        body = '{"place": "Дом"}'.encode("cp1251")
+
+        self.assertEqual(self._parse(ORJSONParser(), body, "cp1251"), {"place": "Дом"})
+
+    def test_same_errors(self):
+        for body in (b"", b"{", b'{"a": NaN}', b'{"a": Infinity}', b"\xef\xbb\xbf{}", b"\xff"):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self._parse(JSONParser(), body)
+                with self.assertRaises(ParseError):
+                    self._parse(ORJSONParser(), body)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+class HabitEndpointsJSONContractTest(TestCase):
+    """Ответы эндпоинтов привычек совпадают с рендерингом тех же данных стандартным JSONRenderer."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pleasant = Habit.objects.create(
+            user=self.user, place="Дом", time="10:00", action="Ванна", is_pleasant=True, is_public=True
+        )
+        self.habit = Habit.objects.create(
+            user=self.user, place="Парк «Сокольники»", time="07:30:15", action="Бег", related_habit=self.pleasant
+        )
+
+    def assertStockJSON(self, response, status_code):
+        self.assertEqual(response.status_code, status_code)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        expected = JSONRenderer().render(response.data, response.accepted_media_type, response.renderer_context)
+        self.assertEqual(response.content, expected)
+
+    def test_reads(self):
+        self.assertStockJSON(self.client.get("/api/habits/"), 200)
+        self.assertStockJSON(self.client.get("/api/habits/", {"pagination": "cursor"}), 200)
+        self.assertStockJSON(self.client.get(f"/api/habits/{self.habit.id}/"), 200)
+        self.assertStockJSON(self.client.get("/api/habits/public/"), 200)
+        self.assertStockJSON(self.client.get("/api/habits/changes/"), 200)
+        self.assertStockJSON(self.client.get("/api/habits/999999/"), 404)
+
+    def test_writes(self):
+        created = self.client.post(
+            "/api/habits/", {"place": "Офис 🏢", "time": "09:00", "action": "Зарядка"}, format="json"
+        )
+        self.assertStockJSON(created, 201)
+        self.assertEqual(Habit.objects.get(pk=created.data["id"]).place, "Офис 🏢")
+
+        self.assertStockJSON(
+            self.client.patch(f"/api/habits/{self.habit.id}/", {"action": "Ходьба"}, format="json"), 200
+        )
+        self.assertStockJSON(self.client.post("/api/habits/", {"place": "Дом"}, format="json"), 400)
+        self.assertStockJSON(
+            self.client.post("/api/habits/bulk/", [{"place": "Дом"}, {"time": "нет"}], format="json"), 400
+        )
+        self.assertStockJSON(self.client.post("/api/habits/", b"{broken", content_type="application/json"), 400)
+
+    def test_unauthenticated(self):
+        self.client.force_authenticate(None)
+
+        self.assertStockJSON(self.client.get("/api/habits/"), 401)
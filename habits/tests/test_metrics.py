@@ -0,0 +1,73 @@
+from datetime import datetime, time
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from config.metrics import observe_queue_lag
+from habits.models import Habit
+from habits.services import enqueue_due_habits, process_single_habit
+from users.models import User
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class ReminderMetricsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123", telegram_id="123456789")
+        self.habit = Habit.objects.create(
+            user=self.user,
+            place="Home",
+            time="10:00:00",
+            action="Exercise",
+            frequency=1,
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+        )
+
+    @patch("habits.tasks.send_single_habit_reminder")
+    def test_enqueue_records_stats_and_tick_duration(self, mock_task):
+        enqueued = _sample("habit_reminder_events_total", phase="enqueue", outcome="enqueued")
+        ticks = _sample("habit_reminder_tick_duration_seconds_count")
+
+        enqueue_due_habits(datetime(2023, 1, 1, 10, 0, 0))
+
+        self.assertEqual(_sample("habit_reminder_events_total", phase="enqueue", outcome="enqueued"), enqueued + 1)
+        self.assertEqual(_sample("habit_reminder_tick_duration_seconds_count"), ticks + 1)
+
+    @patch("habits.services.send_telegram_notification", return_value=True)
+    def test_process_records_sent_and_queue_lag(self, mock_send):
+        sent = _sample("habit_reminder_events_total", phase="process", outcome="sent")
+        lags = _sample("habit_reminder_queue_lag_seconds_count")
+
+        process_single_habit(self.habit.id, datetime(2023, 1, 1, 10, 0, 0))
+
+        self.assertEqual(_sample("habit_reminder_events_total", phase="process", outcome="sent"), sent + 1)
+        self.assertEqual(_sample("habit_reminder_queue_lag_seconds_count"), lags + 1)
+
+    def test_metrics_endpoint(self):
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"habit_reminder_tick_duration_seconds", response.content)
+
+
+class ObserveQueueLagTest(TestCase):
+    def _aware(self, *args):
+        return timezone.make_aware(datetime(*args))
+
+    def test_lag_from_todays_slot(self):
+        before = _sample("habit_reminder_queue_lag_seconds_sum")
+
+        observe_queue_lag(time(10, 0), self._aware(2023, 1, 1, 10, 0, 42))
+
+        self.assertAlmostEqual(_sample("habit_reminder_queue_lag_seconds_sum") - before, 42)
+
+    def test_lag_across_midnight(self):
+        before = _sample("habit_reminder_queue_lag_seconds_sum")
+
+        observe_queue_lag(time(23, 59), self._aware(2023, 1, 2, 0, 1))
+
+        self.assertAlmostEqual(_sample("habit_reminder_queue_lag_seconds_sum") - before, 120)
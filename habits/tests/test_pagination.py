@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from habits.models import Habit
+from users.models import User
+
+
+class KeysetPaginationTest(TestCase):
+    url = "/api/habits/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.habits = [
+            Habit.objects.create(user=self.user, place="Дом", time="10:00", action=f"Привычка {i}") for i in range(12)
+        ]
+        # Ожидаемый порядок: от новых к старым, при равном created_at — по убыванию id
+        self.expected = [h.id for h in sorted(self.habits, key=lambda h: (h.created_at, h.id), reverse=True)]
+
+    def _walk(self):
+        ids, url, params = [], self.url, {"pagination": "cursor"}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item["id"] for item in response.json()["results"])
+            url, params = response.json()["next"], None
+        return ids
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()["count"], 12)
+        self.assertEqual([item["id"] for item in response.json()["results"]], self.expected[:5])
+
+    def test_cursor_mode_walks_all_pages(self):
+        self.assertEqual(self._walk(), self.expected)
+
+    def test_cursor_mode_with_equal_created_at(self):
+        Habit.objects.update(created_at=timezone.make_aware(datetime(2024, 1, 1, 12, 0)))
+
+        self.assertEqual(self._walk(), sorted(self.expected, reverse=True))
+
+    def test_cursor_mode_skips_count_query(self):
+        # Первый запрос — агрегат валидаторов ETag (habits/conditional.py), второй — сама страница
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get(self.url, {"pagination": "cursor"})
+
+        page_sql = queries.captured_queries[-1]["sql"].upper()
+        self.assertNotIn("COUNT", page_sql)
+        self.assertNotIn("OFFSET", page_sql)
+
+        self.assertNotIn("count", response.json())
+        self.assertIsNone(response.json()["previous"])
+        self.assertIn("pagination=cursor", response.json()["next"])
+
+    def test_previous_link(self):
+        first = self.client.get(self.url, {"pagination": "cursor"}).json()
+        second = self.client.get(first["next"]).json()
+        third = self.client.get(second["next"]).json()
+
+        back = self.client.get(third["previous"]).json()
+
+        self.assertEqual(back["results"], second["results"])
+        self.assertIsNotNone(back["previous"])
+        self.assertEqual(self.client.get(back["previous"]).json()["results"], first["results"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"pagination": "cursor", "cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 404)
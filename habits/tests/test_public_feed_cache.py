@@ -0,0 +1,115 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from habits.cache import get_generation, get_page
+from habits.models import Habit
+from users.models import User
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PublicFeedCacheTest(TestCase):
+    url = "/api/habits/public/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create(self, **kwargs):
+        defaults = {"user": self.user, "place": "Дом", "time": "10:00", "action": "Зарядка", "is_public": True}
+        defaults.update(kwargs)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Habit.objects.create(**defaults)
+
+    def test_second_request_is_served_from_cache(self):
+        self._create()
+
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.content, second.content)
+
+    def test_query_params_are_part_of_key(self):
+        for _ in range(6):
+            self._create()
+
+        self.client.get(self.url)
+        response = self.client.get(self.url, {"page": 2})
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_new_public_habit_invalidates(self):
+        self.client.get(self.url)
+
+        self._create(action="Новая")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["results"][0]["action"], "Новая")
+
+    def test_private_habit_does_not_invalidate(self):
+        generation = get_generation()
+
+        self._create(is_public=False)
+
+        self.assertEqual(get_generation(), generation)
+
+    def test_non_public_field_change_does_not_invalidate(self):
+        habit = self._create()
+        generation = get_generation()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.last_reminder = timezone.now()
+            habit.save()
+
+        self.assertEqual(get_generation(), generation)
+
+    def test_public_field_change_and_unpublish_invalidate(self):
+        habit = self._create()
+        generation = get_generation()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.action = "Бег"
+            habit.save()
+        self.assertEqual(get_generation(), generation + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.is_public = False
+            habit.save()
+        self.assertEqual(get_generation(), generation + 2)
+
+    def test_delete_invalidates(self):
+        habit = self._create()
+        generation = get_generation()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            habit.delete()
+
+        self.assertEqual(get_generation(), generation + 1)
+
+    def test_browsable_api_is_not_cached(self):
+        request = Mock(accepted_renderer=Mock(format="api"))
+
+        self.assertIsNone(get_page(request))
+        self.assertIsNone(request.public_feed_generation)
+
+    def test_cache_failure_falls_back_to_database(self):
+        self._create()
+
+        with patch("habits.cache._cache", side_effect=ConnectionError("redis down")):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+        self.assertNotIn("X-Cache", response)
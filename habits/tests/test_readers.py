@@ -0,0 +1,84 @@
+from datetime import datetime, time
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from config.renderers import ORJSONRenderer
+from habits.models import Habit
+from users.models import User
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+class ValuesReadPathContractTest(TestCase):
+    """Быстрый путь списков отдаёт те же байты, что сериализаторы DRF."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        pleasant = Habit.objects.create(
+            user=self.user, place="Дом", time=time(10, 0), action="Ванна", is_pleasant=True, is_public=True
+        )
+        for i in range(7):
+            Habit.objects.create(
+                user=self.user,
+                place=f"Парк «{i}» \u2028 emoji 🏃",
+                time=time(7, 30, 15, 123456 * (i % 2)),
+                action=f'Пробежка "{i}"\\',
+                related_habit=pleasant if i % 3 == 0 else None,
+                reward="Кофе" if i % 3 == 1 else None,
+                frequency=i % 7 + 1,
+                is_public=i % 2 == 0,
+                last_reminder=datetime(2030, 1, 1, 7, 30, 0, 1500, tzinfo=dt_timezone.utc) if i % 2 else None,
+            )
+
+    def _both_paths(self, url, params=None):
+        with override_settings(HABIT_FAST_READ_PATH=False):
+            expected = self.client.get(url, params)
+        with override_settings(HABIT_FAST_READ_PATH=True):
+            actual = self.client.get(url, params)
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(actual.content, expected.content)
+        self.assertEqual(actual["ETag"], expected["ETag"])
+        return actual.json()
+
+    def test_habit_list(self):
+        data = self._both_paths("/api/habits/")
+        self._both_paths("/api/habits/", {"page": 2})
+        self._both_paths("/api/habits/", {"ordering": "action"})
+        self.assertIn("last_reminder", data["results"][0])
+
+    def test_habit_list_cursor(self):
+        first = self._both_paths("/api/habits/", {"pagination": "cursor"})
+        second = self._both_paths(first["next"])
+        self._both_paths(second["previous"])
+
+    def test_public_list(self):
+        self._both_paths("/api/habits/public/")
+        self._both_paths("/api/habits/public/", {"pagination": "cursor", "page_size": 2})
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_same_bytes_as_json_renderer(self):
+        data = {
+            "text": 'Привет \u2028 \u2029 "quoted" \\ emoji 🏃',
+            "detail": ErrorDetail("Ошибка.", code="invalid"),
+            1: {"nested": [None, True, False, 0, -5]},
+            "when": datetime(2030, 1, 1, 7, 30, 0, 123456, tzinfo=dt_timezone.utc),
+            "amount": Decimal("1.50"),
+            "big": 2**70,
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {"a": [1, 2]}
+
+        rendered = ORJSONRenderer().render(data, "application/json; indent=2")
+
+        self.assertEqual(rendered, JSONRenderer().render(data, "application/json; indent=2"))
@@ -0,0 +1,80 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from habits.models import Habit
+from users.models import User
+
+
+class RelatedHabitQueryCountTest(TestCase):
+    """Связанные привычки разрешаются одним запросом на запрос API, а не на каждую привычку."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pleasant = [
+            Habit.objects.create(user=self.user, place="Дом", time="10:00", action=f"Приятная {i}", is_pleasant=True)
+            for i in range(3)
+        ]
+
+    def _create_linked(self, count):
+        return [
+            Habit.objects.create(
+                user=self.user,
+                place="Дом",
+                time="08:00",
+                action=f"Привычка {i}",
+                related_habit=self.pleasant[i % len(self.pleasant)],
+            )
+            for i in range(count)
+        ]
+
+    @staticmethod
+    def _selects(queries):
+        return [query["sql"] for query in queries.captured_queries if query["sql"].startswith("SELECT")]
+
+    def test_bulk_create_resolves_related_habits_once(self):
+        items = [
+            {"place": "Дом", "time": "08:00", "action": f"П{i}", "related_habit": self.pleasant[i % 3].id}
+            for i in range(20)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/habits/bulk/", items, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self._selects(queries)), 1)
+        self.assertEqual({item["related_habit"] for item in response.json()}, {habit.id for habit in self.pleasant})
+
+    def test_bulk_update_reads_existing_related_habits_once(self):
+        habits = self._create_linked(10)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                "/api/habits/bulk/", [{"id": habit.id, "action": "Бег"} for habit in habits], format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        # Привычки под блокировкой + связанные привычки
+        self.assertEqual(len(self._selects(queries)), 2)
+
+    def test_partial_update_does_not_load_related_habit_separately(self):
+        habit = self._create_linked(1)[0]
+
+        # get_object + связанные привычки + UPDATE
+        with self.assertNumQueries(3):
+            response = self.client.patch(f"/api/habits/{habit.id}/", {"action": "Бег"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["related_habit"], habit.related_habit_id)
+
+    def test_list_serializes_related_habit_from_id(self):
+        self._create_linked(5)
+
+        # Валидаторы ETag + COUNT + страница; связанные привычки не загружаются
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/habits/")
+
+        self.assertTrue(all("related_habit" in item for item in response.json()["results"]))
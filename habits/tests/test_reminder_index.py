@@ -0,0 +1,342 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock, skipUnless
+
+import redis
+from celery.beat import ScheduleEntry
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from config.celery import BeatScheduler, app, start_beat_metrics_server
+from habits import reminder_index
+from habits.models import Habit
+from habits.reminder_index import REMINDER_TASK, IndexListener, ReminderIndex
+from habits.services import calculate_next_reminder_at, enqueue_due_habits_from_index
+from users.models import User
+
+REDIS_URL = os.getenv("CELERY_BROKER_URL", "redis://127.0.0.1:6379/0")
+
+
+def redis_available() -> bool:
+    try:
+        return redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.2).ping()
+    except redis.RedisError:
+        return False
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class ReminderIndexTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123", telegram_id="42")
+        self.habits = [
+            self.create_habit(time(10, 0), utc(2026, 1, 10, 6, 0)),
+            self.create_habit(time(10, 0), utc(2026, 1, 10, 6, 0)),
+            self.create_habit(time(11, 30), utc(2026, 1, 10, 6, 0)),
+        ]
+        self.index = ReminderIndex()
+        self.index.load()
+
+    def create_habit(self, habit_time, now) -> Habit:
+        return Habit.objects.create(
+            user=self.user,
+            place="Дом",
+            time=habit_time,
+            action="Зарядка",
+            next_reminder_at=calculate_next_reminder_at(habit_time, 1, None, now),
+        )
+
+    @mock.patch("habits.tasks.send_single_habit_reminder.apply_async")
+    def test_tick_reads_bucket_without_scan(self, mock_apply):
+        # 10:00 МСК — 07:00 UTC; строки куска перечитываются по id и слоты переносятся одним UPDATE
+        with self.assertNumQueries(2):
+            stats = enqueue_due_habits_from_index(self.index, utc(2026, 1, 10, 7, 0))
+
+        self.assertEqual(stats, {"enqueued": 2, "skipped": 0, "errors": 0})
+        self.assertEqual(
+            {call.kwargs["args"][0] for call in mock_apply.call_args_list}, {h.id for h in self.habits[:2]}
+        )
+        self.assertEqual(
+            set(
+                Habit.objects.filter(id__in=[h.id for h in self.habits[:2]]).values_list("next_reminder_at", flat=True)
+            ),
+            {utc(2026, 1, 11, 7, 0)},
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(enqueue_due_habits_from_index(self.index, utc(2026, 1, 10, 7, 1))["enqueued"], 0)
+
+        # Перенесённые слоты — в корзине следующего дня, после пропущенного слота 11:30
+        self.assertEqual(
+            [row["id"] for row in self.index.pop_due(utc(2026, 1, 11, 7, 0))],
+            [self.habits[2].id, self.habits[0].id, self.habits[1].id],
+        )
+
+    @mock.patch("habits.tasks.send_single_habit_reminder.apply_async")
+    def test_broker_error_releases_unsent(self, mock_apply):
+        mock_apply.side_effect = [None, Exception("Broker error"), None]
+
+        stats = enqueue_due_habits_from_index(self.index, utc(2026, 1, 10, 7, 0))
+
+        self.assertEqual(stats, {"enqueued": 1, "skipped": 0, "errors": 1})
+        sent, unsent = (Habit.objects.get(id=call.kwargs["args"][0]) for call in mock_apply.call_args_list)
+        self.assertEqual(sent.next_reminder_at, utc(2026, 1, 11, 7, 0))
+        self.assertEqual(unsent.next_reminder_at, utc(2026, 1, 10, 7, 0))
+
+        # Неотправленная привычка возвращена в наступившую корзину и уходит следующим тиком
+        stats = enqueue_due_habits_from_index(self.index, utc(2026, 1, 10, 7, 1))
+
+        self.assertEqual(stats["enqueued"], 1)
+        self.assertEqual(mock_apply.call_args.kwargs["args"], [unsent.id])
+        self.assertEqual(Habit.objects.get(id=unsent.id).next_reminder_at, utc(2026, 1, 11, 7, 0))
+
+    @mock.patch("habits.tasks.send_single_habit_reminder.apply_async")
+    def test_habit_changed_after_load_not_sent_at_old_time(self, mock_apply):
+        moved, deleted = self.habits[0], self.habits[1]
+        # Пользователь перенёс привычку на 18:00 МСК, а индекс ещё не получил изменение
+        evening = calculate_next_reminder_at(time(18, 0), 1, None, utc(2026, 1, 10, 6, 59))
+        Habit.objects.filter(id=moved.id).update(time=time(18, 0), next_reminder_at=evening)
+        Habit.objects.filter(id=deleted.id).delete()
+
+        stats = enqueue_due_habits_from_index(self.index, utc(2026, 1, 10, 7, 0))
+
+        self.assertEqual(stats, {"enqueued": 0, "skipped": 0, "errors": 0})
+        mock_apply.assert_not_called()
+        self.assertEqual(Habit.objects.get(id=moved.id).next_reminder_at, utc(2026, 1, 10, 15, 0))
+        self.assertEqual(
+            [row["id"] for row in self.index.pop_due(utc(2026, 1, 10, 15, 0))], [self.habits[2].id, moved.id]
+        )
+        self.assertNotIn(deleted.id, self.index.habits)
+
+    @mock.patch("habits.tasks.send_single_habit_reminder.apply_async")
+    def test_tick_during_reload(self, mock_apply):
+        read_snapshot = ReminderIndex._read_snapshot
+        lock_free = []
+
+        def probe_lock():
+            if self.index.lock.acquire(timeout=1):
+                lock_free.append(True)
+                self.index.lock.release()
+
+        def read_then_tick():
+            # Снимок прочитан до тика: в нём слоты 07:00 ещё не перенесены
+            snapshot = read_snapshot()
+            probe = threading.Thread(target=probe_lock)
+            probe.start()
+            probe.join()
+            enqueue_due_habits_from_index(self.index, utc(2026, 1, 10, 7, 0))
+            return snapshot
+
+        with mock.patch.object(ReminderIndex, "_read_snapshot", side_effect=read_then_tick):
+            self.index.load()
+
+        self.assertEqual(lock_free, [True])
+        self.assertEqual(mock_apply.call_count, 2)
+        # Переносы тика не затёрты устаревшим снимком: повторно слоты 07:00 не наступают
+        self.assertEqual([row["id"] for row in self.index.pop_due(utc(2026, 1, 10, 9, 0))], [self.habits[2].id])
+        self.assertEqual(
+            sorted(row["id"] for row in self.index.pop_due(utc(2026, 1, 11, 7, 0))), [h.id for h in self.habits[:2]]
+        )
+
+    def test_missed_minutes_caught_up(self):
+        self.index.pop_due(utc(2026, 1, 10, 6, 59))
+
+        rows = self.index.pop_due(utc(2026, 1, 10, 9, 0))
+
+        self.assertEqual([row["id"] for row in rows], [h.id for h in self.habits])
+        self.assertEqual(rows[0]["user__telegram_id"], "42")
+        self.assertEqual(rows[0]["user__timezone"], "Europe/Moscow")
+
+    def test_refresh_moves_and_removes_habits(self):
+        moved, deleted = self.habits[0], self.habits[1]
+        Habit.objects.filter(id=moved.id).update(next_reminder_at=utc(2026, 1, 10, 8, 0))
+        Habit.objects.filter(id=deleted.id).delete()
+
+        self.index.refresh(habit_ids=[moved.id, deleted.id])
+
+        self.assertEqual(self.index.pop_due(utc(2026, 1, 10, 7, 0)), [])
+        self.assertEqual([row["id"] for row in self.index.pop_due(utc(2026, 1, 10, 8, 0))], [moved.id])
+
+    def test_refresh_reads_without_lock(self):
+        moved = self.habits[0]
+        Habit.objects.filter(id=moved.id).update(next_reminder_at=utc(2026, 1, 10, 8, 0))
+        values_list = QuerySet.values_list
+        lock_free = []
+
+        def probe_lock():
+            if self.index.lock.acquire(timeout=1):
+                lock_free.append(True)
+                self.index.lock.release()
+
+        def read_with_probe(queryset, *fields, **kwargs):
+            probe = threading.Thread(target=probe_lock)
+            probe.start()
+            probe.join()
+            return values_list(queryset, *fields, **kwargs)
+
+        with mock.patch.object(QuerySet, "values_list", autospec=True, side_effect=read_with_probe):
+            self.index.refresh(habit_ids=[moved.id], user_ids=[self.user.id])
+
+        self.assertEqual(lock_free, [True, True])
+        self.assertEqual(
+            [row["id"] for row in self.index.pop_due(utc(2026, 1, 10, 8, 0))], [self.habits[1].id, moved.id]
+        )
+
+    def test_past_slot_goes_to_next_tick(self):
+        self.index.pop_due(utc(2026, 1, 10, 7, 0))
+        late = self.create_habit(time(9, 0), utc(2026, 1, 10, 5, 0))
+
+        self.index.refresh(habit_ids=[late.id])
+
+        self.assertEqual([row["id"] for row in self.index.pop_due(utc(2026, 1, 10, 7, 1))], [late.id])
+
+    def test_refresh_user(self):
+        User.objects.filter(id=self.user.id).update(telegram_id=None)
+
+        self.index.refresh(user_ids=[self.user.id])
+
+        self.assertIsNone(self.index.pop_due(utc(2026, 1, 10, 7, 0))[0]["user__telegram_id"])
+
+    def test_reload_restores_state_after_failure(self):
+        with mock.patch.object(Habit.objects, "filter", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.index.load()
+
+        self.assertEqual(len(self.index.pop_due(utc(2026, 1, 10, 7, 0))), 2)
+
+
+@override_settings(HABIT_REMINDER_INDEX=True)
+class PublishChangesTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        patcher = mock.patch.object(reminder_index, "_redis")
+        self.redis = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def published(self) -> list:
+        return [json.loads(call.args[1]) for call in self.redis.return_value.publish.call_args_list]
+
+    def test_habit_save_and_delete_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            habit = Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Зарядка")
+            self.assertEqual(self.published(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            habit_id = habit.id
+            habit.delete()
+
+        self.assertEqual([message["habits"] for message in self.published()], [[habit_id], [habit_id]])
+        self.assertEqual(self.published()[0]["origin"], reminder_index.ORIGIN)
+
+    def test_user_fields_of_schedule_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["last_login"])
+            self.user.telegram_id = "42"
+            self.user.save(update_fields=["telegram_id"])
+
+        self.assertEqual([message["users"] for message in self.published()], [[self.user.id]])
+
+    @override_settings(HABIT_REMINDER_INDEX=False)
+    def test_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Зарядка")
+
+        self.redis.assert_not_called()
+
+
+@skipUnless(redis_available(), "нужен Redis (CELERY_BROKER_URL)")
+@override_settings(HABIT_REMINDER_INDEX=True, HABIT_REMINDER_INDEX_REDIS_URL=REDIS_URL)
+class IndexListenerTest(SimpleTestCase):
+    def setUp(self):
+        channel_override = override_settings(HABIT_REMINDER_INDEX_CHANNEL=f"test-reminder-index-{uuid.uuid4().hex}")
+        channel_override.enable()
+        self.addCleanup(channel_override.disable)
+        reminder_index._client = None
+        self.addCleanup(setattr, reminder_index, "_client", None)
+
+    def test_changes_from_other_processes_refreshed(self):
+        index = mock.Mock()
+        refreshed = threading.Event()
+        index.refresh.side_effect = lambda *args: refreshed.set()
+        listener = IndexListener(index)
+        pubsub = reminder_index._redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(reminder_index._channel())
+        self.addCleanup(pubsub.close)
+        thread = threading.Thread(target=listener._listen, args=(pubsub,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(listener.stop)
+
+        with mock.patch("django.db.transaction.on_commit", lambda send, using: send()):
+            reminder_index.publish_changes(habit_ids=[1])
+        message = {"origin": "api-1", "habits": [2, 3], "users": [7]}
+        reminder_index._redis().publish(reminder_index._channel(), json.dumps(message))
+
+        self.assertTrue(refreshed.wait(5))
+        index.refresh.assert_called_once_with({2, 3}, {7})
+
+
+class BeatSchedulerIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.scheduler = BeatScheduler(app=app, schedule_filename="unused", lazy=True)
+        self.entry = ScheduleEntry(name="send-habit-reminders", task=REMINDER_TASK, app=app)
+
+    @mock.patch("habits.services.enqueue_due_habits_from_index", return_value={})
+    def test_tick_runs_in_beat_when_index_loaded(self, mock_enqueue):
+        self.scheduler.reminder_index = index = ReminderIndex()
+        index.loaded_at = 1.0
+
+        with mock.patch.object(self.scheduler, "apply_async") as apply_async:
+            self.scheduler.apply_entry(self.entry)
+
+        apply_async.assert_not_called()
+        self.assertIs(mock_enqueue.call_args.args[0], index)
+
+    def test_task_sent_until_index_loaded(self):
+        self.scheduler.reminder_index = ReminderIndex()
+
+        with mock.patch.object(self.scheduler, "apply_async") as apply_async:
+            self.scheduler.apply_entry(self.entry)
+
+        apply_async.assert_called_once()
+
+    def test_listener_started_only_when_enabled(self):
+        with mock.patch.object(reminder_index, "start", return_value=(None, None)) as start:
+            with mock.patch("celery.beat.PersistentScheduler.setup_schedule"):
+                self.scheduler.setup_schedule()
+                with override_settings(HABIT_REMINDER_INDEX=True):
+                    self.scheduler.setup_schedule()
+
+        start.assert_called_once()
+
+
+class BeatMetricsServerTest(SimpleTestCase):
+    @mock.patch("prometheus_client.start_http_server")
+    def test_started_on_port(self, start_http_server):
+        with override_settings(BEAT_METRICS_PORT=0):
+            start_beat_metrics_server()
+        with override_settings(BEAT_METRICS_PORT=9809):
+            start_beat_metrics_server()
+
+        start_http_server.assert_called_once()
+        self.assertEqual(start_http_server.call_args.args, (9809,))
+
+
+class ReminderIndexMemoryTest(SimpleTestCase):
+    def test_stale_bucket_entries_skipped(self):
+        index = ReminderIndex()
+        index.loaded_at = 1.0
+        index.put_user(1, "42", "Europe/Moscow")
+        index.put_habit(10, utc(2026, 1, 10, 7, 0), time(10), 1, None, 1)
+        index.put_habit(10, utc(2026, 1, 10, 7, 5), time(10, 5), 1, None, 1)
+        index.put_habit(10, utc(2026, 1, 10, 7, 0), time(10), 1, None, 1)
+
+        rows = index.pop_due(utc(2026, 1, 10, 7, 10))
+
+        self.assertEqual([(row["id"], row["time"]) for row in rows], [(10, time(10))])
+        self.assertEqual(index.pop_due(utc(2026, 1, 10, 7, 10) + timedelta(minutes=1)), [])
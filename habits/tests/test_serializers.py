@@ -2,6 +2,7 @@ from datetime import time
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework.test import APIRequestFactory
 
 from habits.models import Habit
@@ -71,6 +72,30 @@ class HabitSerializerTests(TestCase):
         serializer = HabitSerializer(data=data, context=self.get_serializer_context())
         self.assertTrue(serializer.is_valid())
 
+    def test_create_schedules_next_reminder(self):
+        """Тест: при создании вычисляется слот следующего напоминания"""
+        data = {"place": "Офис", "time": "09:00:00", "action": "Делать зарядку", "frequency": 1}
+
+        serializer = HabitSerializer(data=data, context=self.get_serializer_context())
+        self.assertTrue(serializer.is_valid())
+        habit = serializer.save()
+
+        next_local = timezone.localtime(habit.next_reminder_at)
+        self.assertEqual(next_local.time(), time(9, 0))
+        self.assertGreater(habit.next_reminder_at, timezone.now())
+
+    def test_update_reschedules_next_reminder(self):
+        """Тест: изменение времени переносит слот следующего напоминания"""
+        habit = Habit.objects.create(user=self.user, place="Офис", time=time(9, 0), action="Зарядка")
+
+        serializer = HabitSerializer(
+            habit, data={"time": "21:30:00"}, partial=True, context=self.get_serializer_context()
+        )
+        self.assertTrue(serializer.is_valid())
+        habit = serializer.save()
+
+        self.assertEqual(timezone.localtime(habit.next_reminder_at).time(), time(21, 30))
+
     def test_pleasant_habit_cannot_have_reward_or_related(self):
         """Тест: приятная привычка не может иметь вознаграждение или связанную привычку"""
         # Тест с вознаграждением
@@ -178,7 +203,7 @@ class HabitSerializerTests(TestCase):
 
         # Проверяем, что в queryset только привычки текущего пользователя
         serializer = HabitSerializer(context=self.get_serializer_context())
-        queryset = serializer.fields["related_habit"].queryset
+        queryset = serializer.fields["related_habit"].get_queryset()
 
         self.assertIn(self.pleasant_habit, queryset)
         self.assertNotIn(other_habit, queryset)
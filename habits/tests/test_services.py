@@ -1,19 +1,23 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from unittest.mock import Mock, patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from habits.models import Habit
 from habits.services import (
+    DUE_HABIT_FIELDS,
     _get_user_telegram_id,
     _normalize_local_datetime,
     _same_minute,
+    calculate_next_reminder_at,
     enqueue_due_habits,
     get_due_habits,
     is_habit_due,
+    process_habit_batch,
     process_single_habit,
     send_telegram_notification,
+    send_telegram_notifications_bulk,
 )
 from users.models import User
 
@@ -136,24 +140,93 @@ class IsHabitDueTest(TestCase):
         self.assertTrue(result)  # Функция возвращает True, т.к. frequency не None
 
 
+class CalculateNextReminderAtTest(TestCase):
+    def _aware(self, *args) -> datetime:
+        return timezone.make_aware(datetime(*args))
+
+    def test_first_reminder_today_if_slot_not_passed(self):
+        result = calculate_next_reminder_at(time(10, 0), 1, None, self._aware(2023, 1, 1, 9, 0))
+        self.assertEqual(result, self._aware(2023, 1, 1, 10, 0))
+
+    def test_first_reminder_tomorrow_if_slot_passed(self):
+        result = calculate_next_reminder_at(time(10, 0), 1, None, self._aware(2023, 1, 1, 10, 0, 30))
+        self.assertEqual(result, self._aware(2023, 1, 2, 10, 0))
+
+    def test_respects_frequency_after_last_reminder(self):
+        now = self._aware(2023, 1, 1, 10, 0, 5)
+        result = calculate_next_reminder_at(time(10, 0), 3, now, now)
+        self.assertEqual(result, self._aware(2023, 1, 4, 10, 0))
+
+    def test_stale_last_reminder_uses_next_slot_from_now(self):
+        result = calculate_next_reminder_at(
+            time(10, 0), 2, self._aware(2022, 12, 1, 10, 0), self._aware(2023, 1, 1, 12, 0)
+        )
+        self.assertEqual(result, self._aware(2023, 1, 2, 10, 0))
+
+    def test_seconds_are_truncated(self):
+        result = calculate_next_reminder_at(time(10, 0, 45), 1, None, self._aware(2023, 1, 1, 9, 0))
+        self.assertEqual(result, self._aware(2023, 1, 1, 10, 0))
+
+    def test_no_frequency(self):
+        self.assertIsNone(calculate_next_reminder_at(time(10, 0), None, None, self._aware(2023, 1, 1, 9, 0)))
+
+
 class GetDueHabitsTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(email="test@example.com", password="testpass123", telegram_id="123456789")
 
     def test_get_due_habits_time_match(self):
-        habit = Habit.objects.create(user=self.user, place="Home", time="10:00:00", action="Exercise", frequency=1)
+        habit = Habit.objects.create(
+            user=self.user,
+            place="Home",
+            time="10:00:00",
+            action="Exercise",
+            frequency=1,
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+        )
 
         now = datetime(2023, 1, 1, 10, 0, 0)
-        result = get_due_habits(now)
+        result = list(get_due_habits(now))
 
         self.assertEqual(len(result), 1)
-        self.assertEqual(result[0].id, habit.id)
+        self.assertEqual(result[0]["id"], habit.id)
 
     def test_get_due_habits_no_time_match(self):
+        Habit.objects.create(
+            user=self.user,
+            place="Home",
+            time="10:00:00",
+            action="Exercise",
+            frequency=1,
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+        )
+
+        now = datetime(2023, 1, 1, 9, 59, 0)
+        result = list(get_due_habits(now))
+
+        self.assertEqual(len(result), 0)
+
+    def test_get_due_habits_overdue_slot(self):
+        # Пропущенный тик (например, beat был перезапущен) не теряет напоминание
+        habit = Habit.objects.create(
+            user=self.user,
+            place="Home",
+            time="10:00:00",
+            action="Exercise",
+            frequency=1,
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+        )
+
+        now = datetime(2023, 1, 1, 10, 3, 0)
+        result = list(get_due_habits(now))
+
+        self.assertEqual([row["id"] for row in result], [habit.id])
+
+    def test_get_due_habits_not_scheduled(self):
         Habit.objects.create(user=self.user, place="Home", time="10:00:00", action="Exercise", frequency=1)
 
-        now = datetime(2023, 1, 1, 11, 0, 0)
-        result = get_due_habits(now)
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        result = list(get_due_habits(now))
 
         self.assertEqual(len(result), 0)
 
@@ -165,24 +238,64 @@ class GetDueHabitsTest(TestCase):
             action="Exercise",
             frequency=1,
             last_reminder=datetime(2023, 1, 1, 10, 0, 0),
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0)),
         )
 
         now = datetime(2023, 1, 2, 10, 0, 0)
-        result = get_due_habits(now)
+        result = list(get_due_habits(now))
 
         self.assertEqual(len(result), 1)
-        self.assertEqual(result[0].id, habit.id)
+        self.assertEqual(result[0]["id"], habit.id)
 
     def test_get_due_habits_skip_frequency_none(self):
         # Используем frequency=0 - функция get_due_habits не фильтрует по frequency
-        habit = Habit.objects.create(user=self.user, place="Home", time="10:00:00", action="Exercise", frequency=0)
+        habit = Habit.objects.create(
+            user=self.user,
+            place="Home",
+            time="10:00:00",
+            action="Exercise",
+            frequency=0,
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+        )
 
         now = datetime(2023, 1, 1, 10, 0, 0)
-        result = get_due_habits(now)
+        result = list(get_due_habits(now))
 
         # get_due_habits возвращает все привычки по времени, фильтрация по частоте в is_habit_due
         self.assertEqual(len(result), 1)
-        self.assertEqual(result[0].id, habit.id)
+        self.assertEqual(result[0]["id"], habit.id)
+
+    def test_get_due_habits_values_only(self):
+        Habit.objects.create(
+            user=self.user,
+            place="Home",
+            time="10:00:00",
+            action="Exercise",
+            frequency=1,
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+        )
+
+        result = list(get_due_habits(datetime(2023, 1, 1, 10, 0, 0)))
+
+        self.assertEqual(set(result[0]), set(DUE_HABIT_FIELDS))
+        self.assertEqual(result[0]["user__telegram_id"], "123456789")
+
+    def test_get_due_habits_streams_in_chunks(self):
+        for _ in range(5):
+            Habit.objects.create(
+                user=self.user,
+                place="Home",
+                time="10:00:00",
+                action="Exercise",
+                frequency=1,
+                next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+            )
+
+        with patch("django.db.models.query.QuerySet.iterator", autospec=True) as mock_iterator:
+            mock_iterator.return_value = iter([])
+            list(get_due_habits(datetime(2023, 1, 1, 10, 0, 0), chunk_size=2))
+
+        self.assertEqual(mock_iterator.call_args.kwargs, {"chunk_size": 2})
 
 
 class SendTelegramNotificationTest(TestCase):
@@ -219,6 +332,24 @@ class SendTelegramNotificationTest(TestCase):
         self.assertFalse(result)
 
 
+class SendTelegramNotificationsBulkTest(TestCase):
+    @patch("habits.services.get_telegram_service")
+    def test_send_telegram_notifications_bulk(self, mock_get_service):
+        mock_get_service.return_value.send_messages_bulk.return_value = [True, False]
+
+        result = send_telegram_notifications_bulk([("1", "a"), ("2", "b")])
+
+        self.assertEqual(result, [True, False])
+
+    @patch("habits.services.get_telegram_service")
+    def test_send_telegram_notifications_bulk_exception(self, mock_get_service):
+        mock_get_service.return_value.send_messages_bulk.side_effect = Exception("Connection error")
+
+        result = send_telegram_notifications_bulk([("1", "a"), ("2", "b")])
+
+        self.assertEqual(result, [False, False])
+
+
 class ProcessSingleHabitTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(email="test@example.com", password="testpass123", telegram_id="123456789")
@@ -241,6 +372,7 @@ class ProcessSingleHabitTest(TestCase):
 
         self.habit.refresh_from_db()
         self.assertIsNotNone(self.habit.last_reminder)
+        self.assertEqual(self.habit.next_reminder_at, timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0)))
 
     def test_process_single_habit_not_found(self):
         now = datetime(2023, 1, 1, 10, 0, 0)
@@ -299,16 +431,105 @@ class ProcessSingleHabitTest(TestCase):
         self.assertEqual(result["errors"], 1)
 
 
+class ProcessHabitBatchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123", telegram_id="123456789")
+        self.habits = [
+            Habit.objects.create(user=self.user, place="Home", time="10:00:00", action=f"Exercise {i}", frequency=1)
+            for i in range(3)
+        ]
+
+    @patch("habits.services.send_telegram_notifications_bulk")
+    def test_process_habit_batch_success(self, mock_send):
+        mock_send.return_value = [True, True, True]
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        # Одна выборка пачки и один UPDATE для всех успешно отправленных
+        with self.assertNumQueries(2):
+            result = process_habit_batch([h.id for h in self.habits], now)
+
+        self.assertEqual(result, {"sent": 3, "skipped": 0, "errors": 0})
+        mock_send.assert_called_once()
+        self.assertEqual([tid for tid, _ in mock_send.call_args.args[0]], ["123456789"] * 3)
+        for habit in self.habits:
+            habit.refresh_from_db()
+            self.assertEqual(habit.last_reminder, timezone.make_aware(now))
+            self.assertEqual(habit.next_reminder_at, timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0)))
+
+    @patch("habits.services.send_telegram_notifications_bulk")
+    def test_process_habit_batch_different_next_slots(self, mock_send):
+        mock_send.return_value = [True, True, True]
+        Habit.objects.filter(id=self.habits[1].id).update(frequency=3)
+        Habit.objects.filter(id=self.habits[2].id).update(time="11:00:00")
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        with self.assertNumQueries(2):
+            process_habit_batch([h.id for h in self.habits], now)
+
+        next_slots = [Habit.objects.get(id=h.id).next_reminder_at for h in self.habits]
+        self.assertEqual(
+            next_slots,
+            [
+                timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0)),
+                timezone.make_aware(datetime(2023, 1, 4, 10, 0, 0)),
+                timezone.make_aware(datetime(2023, 1, 2, 11, 0, 0)),
+            ],
+        )
+
+    @patch("habits.services.send_telegram_notifications_bulk")
+    def test_process_habit_batch_missing_and_duplicate_ids(self, mock_send):
+        mock_send.return_value = [True]
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        habit_id = self.habits[0].id
+        result = process_habit_batch([habit_id, habit_id, 999], now)
+
+        self.assertEqual(result, {"sent": 1, "skipped": 0, "errors": 1})
+        mock_send.assert_called_once()
+
+    @patch("habits.services.send_telegram_notifications_bulk")
+    def test_process_habit_batch_partial_failure(self, mock_send):
+        mock_send.return_value = [True, False, True]
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        result = process_habit_batch([h.id for h in self.habits], now)
+
+        self.assertEqual(result, {"sent": 2, "skipped": 0, "errors": 1})
+        failed = Habit.objects.get(id=self.habits[1].id)
+        self.assertIsNone(failed.last_reminder)
+        self.assertIsNone(failed.next_reminder_at)
+
+    @patch("habits.services.send_telegram_notifications_bulk")
+    def test_process_habit_batch_skips_without_request(self, mock_send):
+        self.habits[0].last_reminder = timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0))
+        self.habits[0].save()
+
+        result = process_habit_batch([self.habits[0].id], datetime(2023, 1, 1, 10, 0, 0))
+
+        self.assertEqual(result, {"sent": 0, "skipped": 1, "errors": 0})
+        mock_send.assert_not_called()
+
+
 class EnqueueDueHabitsTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(email="test@example.com", password="testpass123", telegram_id="123456789")
 
+    def _create_due_habit(self, user) -> Habit:
+        return Habit.objects.create(
+            user=user,
+            place="Home",
+            time="10:00:00",
+            action="Exercise",
+            frequency=1,
+            next_reminder_at=timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)),
+        )
+
     @patch("habits.tasks.send_single_habit_reminder")
     def test_enqueue_due_habits_success(self, mock_task):
         mock_task.apply_async = Mock()
 
         # Создаем привычку для этого теста
-        Habit.objects.create(user=self.user, place="Home", time="10:00:00", action="Exercise", frequency=1)
+        self._create_due_habit(self.user)
 
         now = datetime(2023, 1, 1, 10, 0, 0)
         result = enqueue_due_habits(now)
@@ -334,7 +555,7 @@ class EnqueueDueHabitsTest(TestCase):
 
     def test_enqueue_due_habits_no_telegram(self):
         user_no_telegram = User.objects.create_user(email="notelegram@example.com", password="testpass123")
-        Habit.objects.create(user=user_no_telegram, place="Home", time="10:00:00", action="Exercise", frequency=1)
+        self._create_due_habit(user_no_telegram)
 
         now = datetime(2023, 1, 1, 10, 0, 0)
         result = enqueue_due_habits(now)
@@ -349,7 +570,7 @@ class EnqueueDueHabitsTest(TestCase):
         mock_task.apply_async.side_effect = Exception("Task error")
 
         # Создаем привычку для этого теста
-        Habit.objects.create(user=self.user, place="Home", time="10:00:00", action="Exercise", frequency=1)
+        self._create_due_habit(self.user)
 
         now = datetime(2023, 1, 1, 10, 0, 0)
         result = enqueue_due_habits(now)
@@ -357,3 +578,90 @@ class EnqueueDueHabitsTest(TestCase):
         self.assertEqual(result["enqueued"], 0)
         self.assertEqual(result["skipped"], 0)
         self.assertEqual(result["errors"], 1)
+
+    @patch("habits.tasks.send_single_habit_reminder")
+    def test_enqueue_due_habits_broker_error_releases_unsent(self, mock_task):
+        mock_task.apply_async.side_effect = [None, Exception("Broker error"), None, None]
+        habits = [self._create_due_habit(self.user) for _ in range(3)]
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        result = enqueue_due_habits(now)
+
+        self.assertEqual(result["enqueued"], 1)
+        self.assertEqual(result["errors"], 1)
+        slots = dict(Habit.objects.values_list("id", "next_reminder_at"))
+        # Поставленная привычка перенесена, остальным куска слот возвращён
+        self.assertEqual(slots[habits[0].id], timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0)))
+        self.assertEqual(slots[habits[1].id], timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)))
+        self.assertEqual(slots[habits[2].id], timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0)))
+
+        # Следующий тик ставит неотправленные
+        result = enqueue_due_habits(now + timedelta(minutes=1))
+
+        self.assertEqual(result["enqueued"], 2)
+        self.assertEqual(
+            [call.kwargs["args"][0] for call in mock_task.apply_async.call_args_list[2:]],
+            [habits[1].id, habits[2].id],
+        )
+
+    @patch("habits.tasks.send_single_habit_reminder")
+    def test_enqueue_due_habits_claims_slot(self, mock_task):
+        mock_task.apply_async = Mock()
+        habit = self._create_due_habit(self.user)
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        enqueue_due_habits(now)
+        # Повторный тик в ту же минуту не ставит задачу второй раз
+        result = enqueue_due_habits(now)
+
+        self.assertEqual(result["enqueued"], 0)
+        mock_task.apply_async.assert_called_once()
+        habit.refresh_from_db()
+        self.assertEqual(habit.next_reminder_at, timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0)))
+
+    @patch("habits.tasks.send_single_habit_reminder")
+    def test_enqueue_due_habits_claims_before_enqueue(self, mock_task):
+        habit = self._create_due_habit(self.user)
+        next_slots = []
+        # Задача может выполниться сразу после постановки: к этому моменту слот уже перенесён
+        mock_task.apply_async.side_effect = lambda **kwargs: next_slots.append(
+            Habit.objects.get(id=habit.id).next_reminder_at
+        )
+
+        enqueue_due_habits(datetime(2023, 1, 1, 10, 0, 0))
+
+        self.assertEqual(next_slots, [timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0))])
+
+    @override_settings(HABIT_REMINDER_BATCH_SIZE=2)
+    @patch("habits.tasks.send_single_habit_reminder")
+    @patch("habits.tasks.send_habit_reminder_batch")
+    def test_enqueue_due_habits_batch_mode(self, mock_batch_task, mock_single_task):
+        habits = [self._create_due_habit(self.user) for _ in range(5)]
+        user_no_telegram = User.objects.create_user(email="notelegram@example.com", password="testpass123")
+        self._create_due_habit(user_no_telegram)
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        result = enqueue_due_habits(now)
+
+        self.assertEqual(result, {"enqueued": 5, "skipped": 1, "errors": 0})
+        mock_single_task.apply_async.assert_not_called()
+
+        calls = mock_batch_task.apply_async.call_args_list
+        ids = [h.id for h in habits]
+        self.assertEqual([c.kwargs["args"][0] for c in calls], [ids[0:2], ids[2:4], ids[4:5]])
+        self.assertEqual(calls[0].kwargs["task_id"], f"habit-batch:{habits[0].id}:202301011000")
+
+    @override_settings(HABIT_REMINDER_SCAN_CHUNK_SIZE=2)
+    @patch("habits.tasks.send_single_habit_reminder")
+    def test_enqueue_due_habits_claims_each_chunk(self, mock_task):
+        habits = [self._create_due_habit(self.user) for _ in range(5)]
+
+        now = datetime(2023, 1, 1, 10, 0, 0)
+        result = enqueue_due_habits(now)
+
+        self.assertEqual(result, {"enqueued": 5, "skipped": 0, "errors": 0})
+        self.assertEqual(mock_task.apply_async.call_count, 5)
+        next_slot = timezone.make_aware(datetime(2023, 1, 2, 10, 0, 0))
+        for habit in habits:
+            habit.refresh_from_db()
+            self.assertEqual(habit.next_reminder_at, next_slot)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from habits.models import Habit, HabitTombstone
+from habits.sync import encode_token, prune_tombstones
+from users.models import User
+
+
+@override_settings(HABIT_SYNC_OVERLAP_SECONDS=0)
+class HabitChangesTest(TestCase):
+    url = "/api/habits/changes/"
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.habits = [
+            Habit.objects.create(user=self.user, place="Дом", time="10:00", action=f"Привычка {i}") for i in range(3)
+        ]
+
+    def _sync(self, token=None):
+        response = self.client.get(self.url, {"since": token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_sync(self):
+        other_user = User.objects.create_user(email="other@example.com", password="testpass123")
+        Habit.objects.create(user=other_user, place="Дом", time="10:00", action="Чужая")
+
+        data = self._sync()
+
+        self.assertEqual({item["id"] for item in data["changed"]}, {habit.id for habit in self.habits})
+        self.assertEqual(data["deleted"], [])
+        self.assertFalse(data["has_more"])
+
+    def test_incremental_sync_returns_only_changes(self):
+        token = self._sync()["next_token"]
+        self.client.patch(f"/api/habits/{self.habits[0].id}/", {"action": "Бег"}, format="json")
+        self.client.delete(f"/api/habits/{self.habits[1].id}/")
+
+        with self.assertNumQueries(2):
+            data = self._sync(token)
+
+        self.assertEqual([item["id"] for item in data["changed"]], [self.habits[0].id])
+        self.assertEqual(data["changed"][0]["action"], "Бег")
+        self.assertEqual([item["id"] for item in data["deleted"]], [self.habits[1].id])
+
+        data = self._sync(data["next_token"])
+        self.assertEqual((data["changed"], data["deleted"]), ([], []))
+
+    @override_settings(HABIT_SYNC_PAGE_SIZE=2)
+    def test_paging_with_equal_timestamps(self):
+        token = self._sync()["next_token"]
+        extra = [Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Ещё") for _ in range(2)]
+        # Массовое обновление (как у планировщика) даёт одинаковый updated_at
+        Habit.objects.filter(user=self.user).update(updated_at=timezone.now())
+
+        seen = []
+        data = {"has_more": True, "next_token": token}
+        while data["has_more"]:
+            data = self._sync(data["next_token"])
+            seen.extend(item["id"] for item in data["changed"])
+
+        self.assertEqual(sorted(seen), sorted(habit.id for habit in self.habits + extra))
+
+    def test_overlap_window_resends_recent_changes(self):
+        with override_settings(HABIT_SYNC_OVERLAP_SECONDS=60):
+            token = self._sync()["next_token"]
+            data = self._sync(token)
+
+        self.assertEqual(len(data["changed"]), 3)
+
+    def test_deleting_related_habit_reports_referencing_habits(self):
+        pleasant = Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Ванна", is_pleasant=True)
+        Habit.objects.filter(id=self.habits[0].id).update(related_habit=pleasant)
+        token = self._sync()["next_token"]
+
+        self.client.delete(f"/api/habits/{pleasant.id}/")
+        data = self._sync(token)
+
+        self.assertEqual(
+            [(item["id"], item["related_habit"]) for item in data["changed"]], [(self.habits[0].id, None)]
+        )
+        self.assertEqual([item["id"] for item in data["deleted"]], [pleasant.id])
+
+    def test_expired_and_invalid_token(self):
+        old = timezone.now() - timedelta(days=31)
+        expired = self.client.get(self.url, {"since": encode_token((old, 0), (old, 0))})
+        invalid = self.client.get(self.url, {"since": "not-a-token"})
+
+        self.assertEqual(expired.status_code, 410)
+        self.assertEqual(invalid.status_code, 404)
+
+    def test_user_deletion_skips_tombstones(self):
+        self.user.delete()
+
+        self.assertFalse(HabitTombstone.objects.exists())
+
+    def test_prune_tombstones(self):
+        Habit.objects.filter(pk__in=[self.habits[0].pk, self.habits[1].pk]).delete()
+        HabitTombstone.objects.filter(habit_id=self.habits[0].pk).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertEqual(list(HabitTombstone.objects.values_list("habit_id", flat=True)), [self.habits[1].pk])
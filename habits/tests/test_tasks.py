@@ -5,7 +5,7 @@ from django.test import TestCase
 from django.utils import timezone
 
 from habits.models import Habit
-from habits.tasks import send_habit_reminders, send_single_habit_reminder
+from habits.tasks import send_habit_reminder_batch, send_habit_reminders, send_single_habit_reminder
 from users.models import User
 
 
@@ -125,6 +125,21 @@ class SendSingleHabitReminderTaskTest(TestCase):
             self.assertEqual(result, {})
 
 
+class SendHabitReminderBatchTaskTest(TestCase):
+    @patch("habits.tasks.process_habit_batch")
+    def test_send_habit_reminder_batch_success(self, mock_process):
+        mock_process.return_value = {"sent": 2, "skipped": 1, "errors": 0}
+
+        with patch("habits.tasks.timezone.now") as mock_now:
+            base_time = timezone.make_aware(datetime(2023, 1, 1, 10, 0, 0))
+            mock_now.return_value = base_time
+
+            result = send_habit_reminder_batch([1, 2, 3])
+
+            self.assertEqual(result, {"sent": 2, "skipped": 1, "errors": 0})
+            mock_process.assert_called_once_with(habit_ids=[1, 2, 3], now=timezone.localtime(base_time))
+
+
 class TaskConfigurationTest(TestCase):
     def test_send_habit_reminders_retry_configuration(self):
         task = send_habit_reminders
@@ -142,6 +157,14 @@ class TaskConfigurationTest(TestCase):
         self.assertTrue(task.retry_jitter)
         self.assertEqual(task.max_retries, 5)
 
+    def test_send_habit_reminder_batch_retry_configuration(self):
+        task = send_habit_reminder_batch
+
+        self.assertTrue(task.autoretry_for)
+        self.assertTrue(task.retry_backoff)
+        self.assertTrue(task.retry_jitter)
+        self.assertEqual(task.max_retries, 5)
+
     def test_tasks_are_shared_tasks(self):
         self.assertTrue(hasattr(send_habit_reminders, "delay"))
         self.assertTrue(hasattr(send_single_habit_reminder, "delay"))
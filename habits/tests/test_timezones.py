@@ -0,0 +1,147 @@
+from datetime import datetime, time
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from habits.models import Habit
+from habits.services import (
+    calculate_next_reminder_at,
+    enqueue_due_habits,
+    get_due_habits,
+    is_habit_due,
+    reschedule_for_offset_changes,
+    timezones_with_offset_change,
+)
+from users.models import User
+
+UTC = dt_timezone.utc
+VLADIVOSTOK = ZoneInfo("Asia/Vladivostok")
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+class CalculateInUserTimezoneTest(TestCase):
+    def test_slot_in_user_timezone(self):
+        # 10:00 во Владивостоке (UTC+10) — полночь UTC
+        next_at = calculate_next_reminder_at(time(10, 0), 1, None, utc(2026, 1, 10, 12, 0), VLADIVOSTOK)
+
+        self.assertEqual(next_at, utc(2026, 1, 11, 0, 0))
+
+    def test_offset_of_slot_date_across_dst(self):
+        # 8 марта 2026 Нью-Йорк переходит с UTC-5 на UTC-4: 09:00 — уже 13:00 UTC
+        next_at = calculate_next_reminder_at(time(9, 0), 1, None, utc(2026, 3, 7, 17, 0), NEW_YORK)
+
+        self.assertEqual(next_at, utc(2026, 3, 8, 13, 0))
+
+    def test_skipped_local_time_shifts_forward(self):
+        next_at = calculate_next_reminder_at(time(2, 30), 1, None, utc(2026, 3, 7, 17, 0), NEW_YORK)
+
+        self.assertEqual(next_at.astimezone(NEW_YORK).time(), time(3, 30))
+
+    def test_days_counted_in_user_timezone(self):
+        user = User.objects.create_user(email="vl@example.com", password="testpass123", timezone="Asia/Vladivostok")
+        # 23:30 UTC 1 января — уже 2 января во Владивостоке
+        habit = Habit.objects.create(
+            user=user, place="Дом", time="09:30", action="Зарядка", frequency=1, last_reminder=utc(2026, 1, 1, 23, 30)
+        )
+
+        self.assertFalse(is_habit_due(habit, utc(2026, 1, 2, 12, 0)))
+        self.assertTrue(is_habit_due(habit, utc(2026, 1, 2, 23, 30)))
+
+
+class DueAcrossTimezonesTest(TestCase):
+    def setUp(self):
+        moscow = User.objects.create_user(email="msk@example.com", password="testpass123", telegram_id="1")
+        vladivostok = User.objects.create_user(
+            email="vl@example.com", password="testpass123", telegram_id="2", timezone="Asia/Vladivostok"
+        )
+        now = utc(2026, 1, 10, 12, 0)
+        self.habits = {}
+        for user in (moscow, vladivostok):
+            habit = Habit(user=user, place="Дом", time=time(10, 0), action="Зарядка", frequency=1)
+            habit.next_reminder_at = calculate_next_reminder_at(habit.time, 1, None, now, ZoneInfo(user.timezone))
+            habit.save()
+            self.habits[user.timezone] = habit
+
+    def test_single_lookup_finds_habits_of_each_zone_at_their_local_time(self):
+        with self.assertNumQueries(1):
+            due = [row["id"] for row in get_due_habits(utc(2026, 1, 11, 0, 0))]
+        self.assertEqual(due, [self.habits["Asia/Vladivostok"].id])
+
+        due = [row["id"] for row in get_due_habits(utc(2026, 1, 11, 7, 0))]
+        self.assertEqual(due, [self.habits["Asia/Vladivostok"].id, self.habits["Europe/Moscow"].id])
+
+    @patch("habits.tasks.send_single_habit_reminder.apply_async")
+    def test_tick_moves_slot_in_user_timezone(self, mock_apply):
+        enqueue_due_habits(utc(2026, 1, 11, 0, 0))
+
+        mock_apply.assert_called_once()
+        habit = self.habits["Asia/Vladivostok"]
+        habit.refresh_from_db()
+        self.assertEqual(habit.next_reminder_at, utc(2026, 1, 12, 0, 0))
+
+
+class TimezoneChangeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_habit_created_in_user_timezone(self):
+        self.user.timezone = "Asia/Vladivostok"
+        self.user.save()
+
+        response = self.client.post(
+            "/api/habits/", {"place": "Дом", "time": "10:00", "action": "Зарядка", "duration": 60}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        next_at = Habit.objects.get().next_reminder_at
+        self.assertEqual((next_at.astimezone(VLADIVOSTOK).time(), next_at.astimezone(UTC).time()), (time(10), time(0)))
+
+    def test_timezone_change_reschedules_habits(self):
+        response = self.client.post(
+            "/api/habits/", {"place": "Дом", "time": "10:00", "action": "Зарядка", "duration": 60}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Habit.objects.get().next_reminder_at.astimezone(UTC).time(), time(7, 0))
+
+        response = self.client.patch("/api/users/update/me/", {"timezone": "Asia/Vladivostok"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["timezone"], "Asia/Vladivostok")
+        self.assertEqual(Habit.objects.get().next_reminder_at.astimezone(UTC).time(), time(0, 0))
+
+    def test_unknown_timezone_rejected(self):
+        response = self.client.patch("/api/users/update/me/", {"timezone": "Mars/Olympus"}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("timezone", response.json())
+
+
+class OffsetChangeRescheduleTest(TestCase):
+    def test_zones_with_upcoming_offset_change(self):
+        # 29 марта 2026 Европа переходит на летнее время, Москва и UTC — нет
+        zones = timezones_with_offset_change(["Europe/Berlin", "Europe/Moscow", "UTC"], utc(2026, 3, 25, 0, 0))
+
+        self.assertEqual(zones, ["Europe/Berlin"])
+
+    def test_stale_slots_in_changing_zones_are_fixed(self):
+        berlin = User.objects.create_user(email="de@example.com", password="testpass123", timezone="Europe/Berlin")
+        moscow = User.objects.create_user(email="msk@example.com", password="testpass123")
+        # Слоты 30 марта, посчитанные с зимним смещением Берлина (например, до обновления tzdata)
+        stale = utc(2026, 3, 30, 8, 0)
+        for user in (berlin, moscow):
+            Habit.objects.create(user=user, place="Дом", time="09:00", action="Зарядка", next_reminder_at=stale)
+
+        result = reschedule_for_offset_changes(utc(2026, 3, 29, 12, 0))
+
+        self.assertEqual(result, {"timezones": ["Europe/Berlin"], "moved": 1})
+        self.assertEqual(Habit.objects.get(user=berlin).next_reminder_at, utc(2026, 3, 30, 7, 0))
+        self.assertEqual(Habit.objects.get(user=moscow).next_reminder_at, stale)
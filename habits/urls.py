@@ -1,8 +1,18 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
+from config.async_views import with_async_reads
 from habits.apps import HabitsConfig
-from habits.views import HabitViewSet, PublicListAPIView
+from habits.views import (
+    AsyncHabitDetailAPIView,
+    AsyncHabitListAPIView,
+    AsyncPublicListAPIView,
+    HabitBulkAPIView,
+    HabitChangesAPIView,
+    HabitViewSet,
+    PublicListAPIView,
+)
 
 app_name = HabitsConfig.name
 
@@ -11,4 +21,16 @@ router.register(r"", HabitViewSet, basename="habits")
 
 urlpatterns = [
     path("public/", PublicListAPIView.as_view(), name="public-habits"),
+    path("changes/", HabitChangesAPIView.as_view(), name="habit-changes"),
+    path("bulk/", HabitBulkAPIView.as_view(), name="habit-bulk"),
 ] + router.urls
+
+# GET горячих эндпоинтов под ASGI обслуживают async-представления (config/async_views.py)
+async_read_views = {
+    "habits-list": AsyncHabitListAPIView.as_view(),
+    "habits-detail": AsyncHabitDetailAPIView.as_view(),
+    "public-habits": AsyncPublicListAPIView.as_view(),
+}
+
+if getattr(settings, "API_ASYNC_READS", False):
+    urlpatterns = with_async_reads(urlpatterns, async_read_views)
@@ -1,22 +1,89 @@
+from django.conf import settings
+from django.db import transaction
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import generics, viewsets
+from rest_framework import generics, serializers, status, viewsets
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from config.async_views import AsyncGenericAPIView
+from habits import cache as public_feed_cache
+from habits.conditional import (
+    alist_validators,
+    list_validators,
+    not_modified_response,
+    object_validators,
+    set_validators,
+    validators_from_headers,
+)
 from habits.models import Habit
-from habits.serializers import HabitPublicSerializer, HabitSerializer
+from habits.paginators import HabitPagination
+from habits.readers import get_reader
+from habits.serializers import HabitBulkDeleteSerializer, HabitPublicSerializer, HabitSerializer
+from habits.sync import get_changes
 
 
-class HabitViewSet(viewsets.ModelViewSet):
+class ValuesListMixin:
+    """
+    JSON-списки строятся через ValuesReader (habits/readers.py): values_list по полям
+    сериализатора без объектов модели. Browsable API идёт обычным путём.
+    """
+
+    def use_values_path(self, request) -> bool:
+        renderer = getattr(request, "accepted_renderer", None)
+        return getattr(settings, "HABIT_FAST_READ_PATH", True) and renderer is not None and renderer.format == "json"
+
+    def list_values(self, queryset):
+        reader = get_reader(self.get_serializer_class())
+        rows = reader.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.to_representation(page))
+        return Response(reader.to_representation(rows))
+
+    async def alist_values(self, queryset):
+        reader = get_reader(self.get_serializer_class())
+        rows = reader.values(queryset)
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.to_representation(page))
+        return Response(reader.to_representation([row async for row in rows]))
+
+
+class UserHabitsMixin:
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Habit.objects.none()
+
+        if not self.request.user.is_authenticated:
+            return Habit.objects.none()
+
+        return Habit.objects.filter(user=self.request.user).order_by("-created_at", "-id")
+
+
+class HabitViewSet(UserHabitsMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = HabitSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = HabitPagination
 
     @swagger_auto_schema(
         operation_summary="Список привычек пользователя",
-        operation_description="Возвращает список привычек текущего пользователя.",
+        operation_description=(
+            "Возвращает список привычек текущего пользователя, от новых к старым. "
+            "С ?pagination=cursor страницы выбираются по курсору (без count). "
+            "Поддерживает If-None-Match (ответ 304)."
+        ),
         tags=["Habits"],
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = list_validators(request, queryset, request.user.pk)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        if self.use_values_path(request):
+            return set_validators(self.list_values(queryset), validators)
+        return set_validators(super().list(request, *args, **kwargs), validators)
 
     @swagger_auto_schema(
         operation_summary="Создать привычку",
@@ -28,11 +95,19 @@ class HabitViewSet(viewsets.ModelViewSet):
 
     @swagger_auto_schema(
         operation_summary="Получить привычку",
-        operation_description="Возвращает данные привычки по ID.",
+        operation_description=(
+            "Возвращает данные привычки по ID. Поддерживает If-None-Match / If-Modified-Since (ответ 304)."
+        ),
         tags=["Habits"],
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        validators = object_validators(request, instance)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), validators)
 
     @swagger_auto_schema(
         operation_summary="Обновить привычку",
@@ -58,25 +133,209 @@ class HabitViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
-    def get_queryset(self):
-        if getattr(self, "swagger_fake_view", False):
-            return Habit.objects.none()
 
-        if not self.request.user.is_authenticated:
-            return Habit.objects.none()
+class PublicListAPIView(ValuesListMixin, generics.ListAPIView):
+    queryset = Habit.objects.filter(is_public=True).order_by("-created_at", "-id")
+    serializer_class = HabitPublicSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = HabitPagination
 
-        return Habit.objects.filter(user=self.request.user)
+    @swagger_auto_schema(
+        operation_summary="Публичные привычки",
+        operation_description=(
+            "Возвращает список публичных привычек, от новых к старым (страницы кешируются в Redis). "
+            "С ?pagination=cursor страницы выбираются по курсору (без count). "
+            "Поддерживает If-None-Match (ответ 304)."
+        ),
+        tags=["Habits"],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Попадание в кеш отдаёт готовые байты (или 304) без ORM и сериализатора
+        cached = public_feed_cache.get_page(request)
+        if cached is not None:
+            return not_modified_response(request, validators_from_headers(cached)) or cached
 
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = list_validators(request, queryset)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        if self.use_values_path(request):
+            return set_validators(self.list_values(queryset), validators)
+        return set_validators(super().list(request, *args, **kwargs), validators)
 
-class PublicListAPIView(generics.ListAPIView):
-    queryset = Habit.objects.filter(is_public=True)
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method == "GET" and response.status_code == 200 and isinstance(response, Response):
+            public_feed_cache.store_page(request, response)
+        return response
+
+
+class AsyncHabitListAPIView(UserHabitsMixin, ValuesListMixin, AsyncGenericAPIView):
+    """HabitViewSet.list на async ORM (API_ASYNC_READS, ASGI)."""
+
+    serializer_class = HabitSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = HabitPagination
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = await alist_validators(request, queryset, request.user.pk)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        if self.use_values_path(request):
+            return set_validators(await self.alist_values(queryset), validators)
+        return set_validators(await self.alist(queryset), validators)
+
+
+class AsyncHabitDetailAPIView(UserHabitsMixin, AsyncGenericAPIView):
+    """HabitViewSet.retrieve на async ORM (API_ASYNC_READS, ASGI)."""
+
+    serializer_class = HabitSerializer
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        validators = object_validators(request, instance)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), validators)
+
+
+class AsyncPublicListAPIView(ValuesListMixin, AsyncGenericAPIView):
+    """PublicListAPIView на async ORM и async-кеше (API_ASYNC_READS, ASGI)."""
+
+    queryset = Habit.objects.filter(is_public=True).order_by("-created_at", "-id")
     serializer_class = HabitPublicSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = HabitPagination
+
+    async def get(self, request, *args, **kwargs):
+        cached = await public_feed_cache.aget_page(request)
+        if cached is not None:
+            return not_modified_response(request, validators_from_headers(cached)) or cached
+
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = await alist_validators(request, queryset)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        if self.use_values_path(request):
+            return set_validators(await self.alist_values(queryset), validators)
+        return set_validators(await self.alist(queryset), validators)
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        response = self.finalize_response(request, response, *args, **kwargs)
+        if request.method == "GET" and response.status_code == 200 and isinstance(response, Response):
+            await public_feed_cache.astore_page(request, response)
+        return response
+
+
+class HabitChangesAPIView(generics.GenericAPIView):
+    serializer_class = HabitSerializer
+    permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_summary="Публичные привычки",
-        operation_description="Возвращает список публичных привычек.",
+        operation_summary="Изменения привычек",
+        operation_description=(
+            "Возвращает привычки, созданные или изменённые после токена since, и ID удалённых привычек. "
+            "Без since отдаёт все привычки. Ответ содержит next_token для следующего запроса; "
+            "has_more=true означает, что изменения не поместились и нужно сразу запросить следующую порцию. "
+            "Записи на границе токена могут прийти повторно. Устаревший токен — ответ 410, "
+            "нужна полная синхронизация."
+        ),
+        manual_parameters=[
+            openapi.Parameter("since", openapi.IN_QUERY, description="Токен из next_token.", type=openapi.TYPE_STRING)
+        ],
         tags=["Habits"],
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        changes = get_changes(request.user, request.query_params.get("since"))
+        changes["changed"] = self.get_serializer(changes["changed"], many=True).data
+        return Response(changes)
+
+
+class HabitBulkAPIView(generics.GenericAPIView):
+    serializer_class = HabitSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Habit.objects.none()
+
+        return Habit.objects.filter(user=self.request.user)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, allow_empty=False, max_length=getattr(settings, "HABIT_BULK_MAX_ITEMS", 100))
+        return super().get_serializer(*args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary="Создать несколько привычек",
+        operation_description=(
+            "Создает список привычек одной транзакцией. При ошибках ничего не сохраняется, "
+            "ответ 400 содержит ошибки по индексам элементов."
+        ),
+        request_body=HabitSerializer(many=True),
+        responses={201: HabitSerializer(many=True)},
+        tags=["Habits"],
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_summary="Частично обновить несколько привычек",
+        operation_description=(
+            "Обновляет привычки по списку объектов с полем id одной транзакцией. При ошибках ничего "
+            "не сохраняется, ответ 400 содержит ошибки по индексам элементов."
+        ),
+        request_body=HabitSerializer(many=True),
+        responses={200: HabitSerializer(many=True)},
+        tags=["Habits"],
+    )
+    def patch(self, request, *args, **kwargs):
+        items = request.data if isinstance(request.data, list) else []
+        ids = [item["id"] for item in items if isinstance(item, dict) and isinstance(item.get("id"), int)]
+
+        with transaction.atomic():
+            habits = list(self.get_queryset().filter(pk__in=ids).select_for_update())
+            serializer = self.get_serializer(habits, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_summary="Удалить несколько привычек",
+        operation_description=(
+            "Удаляет привычки по списку ID одной транзакцией. Если какой-то ID не найден, "
+            "ничего не удаляется и ответ 400 указывает индексы ненайденных ID."
+        ),
+        request_body=HabitBulkDeleteSerializer,
+        responses={204: "Привычки удалены."},
+        tags=["Habits"],
+    )
+    def delete(self, request, *args, **kwargs):
+        serializer = HabitBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        limit = getattr(settings, "HABIT_BULK_MAX_ITEMS", 100)
+        if len(ids) > limit:
+            raise serializers.ValidationError({"ids": [f"Не больше {limit} привычек за запрос."]})
+
+        with transaction.atomic():
+            habits = self.get_queryset().filter(pk__in=ids)
+            found = set(habits.values_list("pk", flat=True))
+            missing = {index: ["Привычка не найдена."] for index, pk in enumerate(ids) if pk not in found}
+            if missing:
+                raise serializers.ValidationError({"ids": missing})
+            habits.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
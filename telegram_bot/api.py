@@ -1,10 +1,18 @@
+import asyncio
 import os
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Header, HTTPException, status
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Query, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST
+from pydantic import BaseModel, Field
 
-from telegram_bot.main import send_notification_to_user  # поправь импорт под свою структуру
+from telegram_bot.main import (  # поправь импорт под свою структуру
+    enqueue_notification_to_user,
+    send_notification_to_user,
+    send_queue,
+    submit_notification_to_user,
+)
+from telegram_bot.metrics import API_SEND_DURATION, SEND_QUEUE_PENDING, render_metrics
 
 load_dotenv()
 
@@ -12,6 +20,11 @@ BOT_SECRET = os.getenv("TELEGRAM_BOT_SECRET")
 if not BOT_SECRET:
     raise RuntimeError("Не задан TELEGRAM_BOT_SECRET")
 
+# Ограничения пакетной отправки: размер одного запроса и сколько секунд ждать результатов.
+# Таймаут должен быть меньше таймаута клиента (TELEGRAM_HTTP_TIMEOUT в Django, по умолчанию 10 с)
+SEND_BATCH_MAX_ITEMS = int(os.getenv("TELEGRAM_SEND_BATCH_MAX_ITEMS", "500"))
+SEND_BATCH_TIMEOUT = float(os.getenv("TELEGRAM_SEND_BATCH_TIMEOUT", "8"))
+
 app = FastAPI(title="Telegram Bot API")
 
 
@@ -20,25 +33,49 @@ class TelegramMessage(BaseModel):
     message: str
 
 
+class TelegramMessageBatch(BaseModel):
+    messages: list[TelegramMessage] = Field(min_length=1, max_length=SEND_BATCH_MAX_ITEMS)
+
+
+def _check_secret(x_bot_secret: str | None) -> None:
+    if x_bot_secret != BOT_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Неверный секретный ключ",
+        )
+
+
 @app.post("/send/")
 async def send_message(
     message_data: TelegramMessage,
+    response: Response,
+    wait: bool = Query(default=True, description="Ждать результата отправки или только поставить в очередь."),
     x_bot_secret: str | None = Header(default=None, alias="X-BOT-SECRET"),
 ):
     """
     Отправляет сообщение пользователю в Telegram.
     Заголовок: X-BOT-SECRET: <secret>
+    С ?wait=false сообщение только ставится в очередь отправки (ответ 202).
     """
-    if x_bot_secret != BOT_SECRET:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Неверный секретный ключ",
-        )
+    _check_secret(x_bot_secret)
 
-    success = await send_notification_to_user(
-        telegram_id=message_data.telegram_id,
-        message=message_data.message,
-    )
+    if not wait:
+        if not enqueue_notification_to_user(
+            telegram_id=message_data.telegram_id,
+            message=message_data.message,
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный telegram_id",
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"status": "queued", "message": "Сообщение поставлено в очередь"}
+
+    with API_SEND_DURATION.labels(endpoint="send").time():
+        success = await send_notification_to_user(
+            telegram_id=message_data.telegram_id,
+            message=message_data.message,
+        )
 
     if success:
         return {"status": "success", "message": "Сообщение отправлено"}
@@ -49,6 +86,56 @@ async def send_message(
     )
 
 
+@app.post("/send-batch/")
+async def send_message_batch(
+    batch: TelegramMessageBatch,
+    x_bot_secret: str | None = Header(default=None, alias="X-BOT-SECRET"),
+):
+    """
+    Отправляет пачку сообщений через очередь и ждёт результата каждого.
+    Заголовок: X-BOT-SECRET: <secret>
+    Статус возвращается для каждого сообщения в порядке запроса: "success", "error" или
+    "timeout". Очередь общая и разбирает не больше TELEGRAM_SEND_RATE сообщений в секунду, поэтому
+    ожидание ограничено TELEGRAM_SEND_BATCH_TIMEOUT: не отправленные к этому моменту сообщения
+    снимаются с очереди и получают "timeout" — клиент считает их неотправленными.
+    """
+    _check_secret(x_bot_secret)
+
+    futures = [
+        submit_notification_to_user(telegram_id=item.telegram_id, message=item.message) for item in batch.messages
+    ]
+    queued = [future for future in futures if future is not None]
+
+    with API_SEND_DURATION.labels(endpoint="send_batch").time():
+        if queued:
+            _, pending = await asyncio.wait(queued, timeout=SEND_BATCH_TIMEOUT)
+            for future in pending:
+                # Отменённое сообщение воркер очереди пропустит
+                future.cancel()
+
+    results = [
+        {"telegram_id": item.telegram_id, "status": _batch_item_status(future)}
+        for item, future in zip(batch.messages, futures)
+    ]
+    sent = sum(result["status"] == "success" for result in results)
+    return {"sent": sent, "failed": len(results) - sent, "results": results}
+
+
+def _batch_item_status(future: asyncio.Future | None) -> str:
+    if future is None:
+        return "error"
+    if future.cancelled():
+        return "timeout"
+    return "success" if future.result() else "error"
+
+
 @app.get("/health/")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "send_queue_pending": send_queue.pending}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Метрики Prometheus: задержки отправки в Telegram и размер очереди."""
+    SEND_QUEUE_PENDING.set(send_queue.pending)
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
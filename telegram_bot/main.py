@@ -1,12 +1,17 @@
 import asyncio
 import os
 import re
+import time
 
 import httpx
 from aiogram import Bot, Dispatcher, types
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.filters import CommandStart
 from dotenv import load_dotenv
 
+from telegram_bot.metrics import TELEGRAM_SEND_LATENCY
+from telegram_bot.send_queue import SendQueue
+
 load_dotenv()
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -23,6 +28,29 @@ bot = Bot(token=BOT_TOKEN)
 dp = Dispatcher()
 
 
+async def _deliver_message(chat_id: int, text: str) -> None:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        await bot.send_message(chat_id=chat_id, text=text)
+        outcome = "ok"
+    except TelegramRetryAfter:
+        outcome = "retry_after"
+        raise
+    finally:
+        TELEGRAM_SEND_LATENCY.labels(outcome=outcome).observe(time.perf_counter() - started)
+
+
+# Лимиты Telegram: ~30 сообщений/с на бота и ~1 сообщение/с в один чат
+send_queue = SendQueue(
+    _deliver_message,
+    global_rate=float(os.getenv("TELEGRAM_SEND_RATE", "25")),
+    per_chat_rate=float(os.getenv("TELEGRAM_SEND_PER_CHAT_RATE", "1")),
+    workers=int(os.getenv("TELEGRAM_SEND_WORKERS", "8")),
+    max_retries=int(os.getenv("TELEGRAM_SEND_MAX_RETRIES", "3")),
+)
+
+
 async def confirm_telegram_link(code: str, chat_id: int) -> tuple[bool, str]:
     """Возвращает (ok, message)."""
     url = f"{BACKEND_BASE_URL}/api/users/telegram/confirm/"
@@ -45,14 +73,28 @@ async def confirm_telegram_link(code: str, chat_id: int) -> tuple[bool, str]:
     return False, f"Не получилось привязать. {detail}"
 
 
-async def send_notification_to_user(telegram_id: str, message: str) -> bool:
-    """Отправляет сообщение пользователю в Telegram."""
+def submit_notification_to_user(telegram_id: str, message: str) -> asyncio.Future | None:
+    """Ставит сообщение в очередь отправки; future завершится True/False. None — telegram_id некорректен."""
     try:
-        await bot.send_message(chat_id=int(telegram_id), text=message)
-        return True
-    except Exception as e:
-        print(f"Ошибка отправки сообщения пользователю {telegram_id}: {e}")
+        chat_id = int(telegram_id)
+    except (TypeError, ValueError):
+        print(f"Некорректный telegram_id: {telegram_id}")
+        return None
+
+    return send_queue.submit(chat_id, message)
+
+
+def enqueue_notification_to_user(telegram_id: str, message: str) -> bool:
+    """Ставит сообщение в очередь отправки, не дожидаясь результата. False — если telegram_id некорректен."""
+    return submit_notification_to_user(telegram_id, message) is not None
+
+
+async def send_notification_to_user(telegram_id: str, message: str) -> bool:
+    """Отправляет сообщение пользователю в Telegram через очередь с ограничением скорости."""
+    future = submit_notification_to_user(telegram_id, message)
+    if future is None:
         return False
+    return await future
 
 
 @dp.message(CommandStart())
@@ -0,0 +1,36 @@
+"""
+Метрики Prometheus сервиса бота (эндпоинт GET /metrics в telegram_bot/api.py).
+
+Как и в Django, при заданном PROMETHEUS_MULTIPROC_DIR метрики собираются со всех процессов.
+"""
+
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess
+
+TELEGRAM_SEND_LATENCY = Histogram(
+    "telegram_bot_send_latency_seconds",
+    "Время вызова Telegram Bot API sendMessage: outcome — ok/retry_after/error.",
+    ["outcome"],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+API_SEND_DURATION = Histogram(
+    "telegram_bot_api_send_duration_seconds",
+    "Время обработки /send/ и /send-batch/ (включая ожидание в очереди отправки).",
+    ["endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+SEND_QUEUE_PENDING = Gauge(
+    "telegram_bot_send_queue_pending",
+    "Сообщений в очереди отправки на момент сбора метрик.",
+    multiprocess_mode="livesum",
+)
+
+
+def render_metrics() -> bytes:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
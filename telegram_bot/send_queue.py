@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from aiogram.exceptions import TelegramRetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Сколько «простаивающих» per-chat корзин держать в памяти, прежде чем чистить полные
+CHAT_BUCKETS_PRUNE_THRESHOLD = 10_000
+
+
+class TokenBucket:
+    """Корзина токенов: не более rate операций в секунду с всплеском до capacity."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд появится токен (0 — можно отправлять сейчас)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.delay(time.monotonic())
+            if wait <= 0:
+                self.consume(time.monotonic())
+                return
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class _SendJob:
+    chat_id: int
+    text: str
+    future: asyncio.Future
+    attempt: int = 0
+
+
+class SendQueue:
+    """
+    Очередь исходящих сообщений бота с ограничением скорости.
+
+    Глобальная корзина держит общий темп ниже лимита Telegram, per-chat корзины — лимит на один чат.
+    Сообщение, чей чат ещё «остывает», откладывается и не блокирует воркер. Ответ 429 (retry_after)
+    приостанавливает все отправки на указанное время, после чего сообщение повторяется.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[int, str], Awaitable[None]],
+        *,
+        global_rate: float,
+        per_chat_rate: float,
+        workers: int,
+        max_retries: int,
+    ) -> None:
+        self._send = send
+        # Глобальный темп сглаживаем (без всплеска), чтобы в любом окне в 1 с было не больше global_rate
+        self._global_bucket = TokenBucket(global_rate, capacity=1)
+        self._per_chat_rate = per_chat_rate
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self._workers_count = workers
+        self._max_retries = max_retries
+        self._paused_until = 0.0
+
+        self._queue: asyncio.Queue[_SendJob] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._delayed: set[asyncio.Task] = set()
+
+    def _ensure_started(self) -> asyncio.Queue:
+        # Очередь и воркеры создаются лениво внутри работающего event loop (бот и API живут в одном loop)
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self._workers_count)]
+        return self._queue
+
+    async def stop(self) -> None:
+        for task in [*self._workers, *self._delayed]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._delayed, return_exceptions=True)
+        self._workers = []
+        self._delayed = set()
+        self._queue = None
+
+    def submit(self, chat_id: int, text: str) -> asyncio.Future:
+        """Ставит сообщение в очередь; future завершится True/False по результату отправки."""
+        queue = self._ensure_started()
+        job = _SendJob(chat_id=chat_id, text=text, future=asyncio.get_running_loop().create_future())
+        queue.put_nowait(job)
+        return job.future
+
+    @property
+    def pending(self) -> int:
+        return (self._queue.qsize() if self._queue else 0) + len(self._delayed)
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= CHAT_BUCKETS_PRUNE_THRESHOLD:
+                self._chat_buckets = {cid: b for cid, b in self._chat_buckets.items() if not b.is_full(now)}
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self._per_chat_rate, capacity=1)
+        return bucket
+
+    def _put_later(self, job: _SendJob, delay: float) -> None:
+        async def put() -> None:
+            await asyncio.sleep(delay)
+            self._queue.put_nowait(job)
+
+        task = asyncio.create_task(put())
+        self._delayed.add(task)
+        task.add_done_callback(self._delayed.discard)
+
+    async def _wait_pause(self) -> None:
+        while (wait := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    def _resolve(job: _SendJob, result: bool) -> None:
+        if not job.future.done():
+            job.future.set_result(result)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._handle(job)
+            except Exception:
+                logger.exception("Сбой обработки сообщения для chat_id=%s", job.chat_id)
+                self._resolve(job, False)
+            finally:
+                self._queue.task_done()
+
+    async def _handle(self, job: _SendJob) -> None:
+        if job.future.cancelled():
+            return
+
+        chat_bucket = self._chat_bucket(job.chat_id, time.monotonic())
+        chat_wait = chat_bucket.delay(time.monotonic())
+        if chat_wait > 0:
+            self._put_later(job, chat_wait)
+            return
+
+        await self._wait_pause()
+        await self._global_bucket.acquire()
+
+        # Пока ждали, отправитель мог отказаться от сообщения (таймаут /send-batch/)
+        if job.future.cancelled():
+            return
+
+        # Пока ждали глобальный токен, этот чат мог занять другой воркер — проверяем ещё раз
+        now = time.monotonic()
+        chat_wait = chat_bucket.delay(now)
+        if chat_wait > 0:
+            self._put_later(job, chat_wait)
+            return
+        chat_bucket.consume(now)
+
+        try:
+            await self._send(job.chat_id, job.text)
+        except TelegramRetryAfter as e:
+            self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+            if job.attempt >= self._max_retries:
+                logger.error("Telegram flood limit: chat_id=%s, попытки исчерпаны", job.chat_id)
+                self._resolve(job, False)
+                return
+            job.attempt += 1
+            logger.warning(
+                "Telegram flood limit: chat_id=%s retry_after=%s попытка=%s",
+                job.chat_id,
+                e.retry_after,
+                job.attempt,
+            )
+            self._put_later(job, e.retry_after)
+        except Exception as e:
+            logger.error("Ошибка отправки сообщения пользователю %s: %s", job.chat_id, e)
+            self._resolve(job, False)
+        else:
+            self._resolve(job, True)
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import time
+from unittest import IsolatedAsyncioTestCase, mock
+
+import httpx
+
+# Модули бота читают токен и секрет при импорте; токен только проверяется на формат
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:TEST")
+os.environ.setdefault("TELEGRAM_BOT_SECRET", "test-secret")
+
+from telegram_bot import api, main  # noqa: E402
+from telegram_bot.send_queue import SendQueue  # noqa: E402
+
+
+class SendBatchTests(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sent = []
+        self.blocked = set()
+        # Темп как в проде: пачка из 100 сообщений разбиралась бы 4 с
+        self.queue = SendQueue(self.send, global_rate=25, per_chat_rate=1, workers=2, max_retries=0)
+        patcher = mock.patch.object(main, "send_queue", self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addAsyncCleanup(self.queue.stop)
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bot")
+        self.addAsyncCleanup(self.client.aclose)
+
+    async def send(self, chat_id: int, text: str) -> None:
+        if chat_id in self.blocked:
+            raise RuntimeError("Forbidden: bot was blocked by the user")
+        self.sent.append(chat_id)
+
+    async def post_batch(self, messages):
+        return await self.client.post(
+            "/send-batch/", json={"messages": messages}, headers={"X-BOT-SECRET": api.BOT_SECRET}
+        )
+
+    async def test_batch_returns_send_result_per_item(self):
+        self.blocked.add(2)
+        messages = [{"telegram_id": telegram_id, "message": "Напоминание"} for telegram_id in ("1", "2", "x", "3")]
+
+        with self.assertLogs("telegram_bot.send_queue", "ERROR"):
+            response = await asyncio.wait_for(self.post_batch(messages), 5)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([item["status"] for item in body["results"]], ["success", "error", "error", "success"])
+        self.assertEqual((body["sent"], body["failed"]), (2, 2))
+        self.assertEqual(sorted(self.sent), [1, 3])
+
+    async def test_batch_wait_bounded_by_timeout(self):
+        messages = [{"telegram_id": str(i), "message": "Напоминание"} for i in range(100)]
+
+        started = time.monotonic()
+        with mock.patch.object(api, "SEND_BATCH_TIMEOUT", 0.5):
+            response = await self.post_batch(messages)
+
+        # Ответ укладывается в таймаут клиента, хотя очередь разобрала бы пачку лишь за 4 с
+        self.assertLess(time.monotonic() - started, 1.5)
+        results = response.json()["results"]
+        statuses = [item["status"] for item in results]
+        self.assertEqual(set(statuses), {"success", "timeout"})
+        self.assertEqual(response.json()["sent"], len(self.sent))
+        self.assertEqual({int(item["telegram_id"]) for item in results if item["status"] == "success"}, set(self.sent))
+
+        # Снятые по таймауту сообщения не отправляются позже: клиент считает их неотправленными
+        sent_count = len(self.sent)
+        await asyncio.sleep(0.5)
+        self.assertEqual(len(self.sent), sent_count)
+        self.assertEqual(self.queue.pending, 0)
+
+    async def test_batch_requires_secret(self):
+        response = await self.client.post("/send-batch/", json={"messages": [{"telegram_id": "1", "message": "a"}]})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.queue.pending, 0)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from telegram_bot.send_queue import SendQueue, TokenBucket
+
+
+def retry_after(chat_id: int, seconds: int) -> TelegramRetryAfter:
+    return TelegramRetryAfter(SendMessage(chat_id=chat_id, text="x"), "Too Many Requests", seconds)
+
+
+class TokenBucketTests(TestCase):
+    def test_delay_until_next_token(self):
+        bucket = TokenBucket(2, capacity=1)
+        bucket.updated = 0.0
+
+        self.assertEqual(bucket.delay(0.0), 0)
+        bucket.consume(0.0)
+        self.assertEqual(bucket.delay(0.0), 0.5)
+        self.assertEqual(bucket.delay(0.25), 0.25)
+        self.assertEqual(bucket.delay(0.5), 0)
+
+    def test_refill_capped_by_capacity(self):
+        bucket = TokenBucket(10, capacity=3)
+        bucket.updated = 0.0
+        for _ in range(3):
+            bucket.consume(0.0)
+
+        self.assertFalse(bucket.is_full(0.1))
+        self.assertTrue(bucket.is_full(100.0))
+        self.assertEqual(bucket.tokens, 3)
+
+
+class SendQueueTests(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sent = []
+        self.failures = {}
+
+    async def send(self, chat_id: int, text: str) -> None:
+        error = self.failures.pop((chat_id, text), None)
+        if error is not None:
+            raise error
+        self.sent.append((chat_id, text, time.monotonic()))
+
+    def make_queue(self, **kwargs) -> SendQueue:
+        options = {"global_rate": 1000, "per_chat_rate": 5, "workers": 1, "max_retries": 3, **kwargs}
+        queue = SendQueue(self.send, **options)
+        self.addAsyncCleanup(queue.stop)
+        return queue
+
+    async def test_cooling_chat_requeued_without_blocking_others(self):
+        queue = self.make_queue()
+
+        futures = [queue.submit(1, "a"), queue.submit(1, "b"), queue.submit(2, "c")]
+        results = await asyncio.wait_for(asyncio.gather(*futures), 5)
+
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual([text for _, text, _ in self.sent], ["a", "c", "b"])
+        # Второе сообщение в чат 1 — не раньше, чем через 1 / per_chat_rate
+        self.assertGreaterEqual(self.sent[2][2] - self.sent[0][2], 0.19)
+
+    async def test_global_rate(self):
+        queue = self.make_queue(global_rate=20, workers=4)
+
+        started = time.monotonic()
+        await asyncio.wait_for(asyncio.gather(*(queue.submit(chat_id, "a") for chat_id in range(5))), 5)
+
+        # Корзина без всплеска: пять сообщений при 20/с — не быстрее чем за 4 интервала по 50 мс
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    async def test_retry_after_pauses_all_sends(self):
+        queue = self.make_queue()
+        self.failures[(1, "a")] = retry_after(1, 1)
+
+        paused_at = time.monotonic()
+        with self.assertLogs("telegram_bot.send_queue", "WARNING"):
+            futures = [queue.submit(1, "a"), queue.submit(2, "b")]
+            results = await asyncio.wait_for(asyncio.gather(*futures), 5)
+
+        self.assertEqual(results, [True, True])
+        self.assertEqual(sorted(text for _, text, _ in self.sent), ["a", "b"])
+        self.assertTrue(all(sent_at - paused_at >= 0.95 for _, _, sent_at in self.sent))
+
+    async def test_retry_after_attempts_exhausted(self):
+        queue = self.make_queue(max_retries=0)
+        self.failures[(1, "a")] = retry_after(1, 1)
+
+        with self.assertLogs("telegram_bot.send_queue", "ERROR"):
+            self.assertFalse(await asyncio.wait_for(queue.submit(1, "a"), 5))
+        self.assertEqual(self.sent, [])
+
+    async def test_send_error_resolves_false(self):
+        queue = self.make_queue()
+        self.failures[(1, "a")] = RuntimeError("blocked")
+
+        with self.assertLogs("telegram_bot.send_queue", "ERROR"):
+            self.assertFalse(await asyncio.wait_for(queue.submit(1, "a"), 5))
+
+    async def test_stop_cancels_workers_and_delayed_messages(self):
+        queue = self.make_queue()
+        queue.submit(1, "a")
+        queue.submit(1, "b")
+        while len(self.sent) < 1 or queue.pending == 0 or queue._queue.qsize():
+            await asyncio.sleep(0.01)
+
+        # "b" ждёт остывания чата в отложенной задаче
+        self.assertEqual(queue.pending, 1)
+        await queue.stop()
+
+        self.assertEqual(queue.pending, 0)
+        self.assertEqual(queue._workers, [])
+        await asyncio.sleep(0.3)
+        self.assertEqual([text for _, text, _ in self.sent], ["a"])
+
+        # После остановки очередь поднимается заново при следующей отправке
+        self.assertTrue(await asyncio.wait_for(queue.submit(2, "c"), 5))
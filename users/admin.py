@@ -20,7 +20,7 @@ class CustomUserAdmin(UserAdmin):
         (None, {"fields": ("email", "password")}),
         (
             _("Personal info"),
-            {"fields": ("first_name", "last_name", "phone_number", "city", "avatar", "telegram_id")},
+            {"fields": ("first_name", "last_name", "phone_number", "city", "avatar", "telegram_id", "timezone")},
         ),
         (
             _("Permissions"),
@@ -0,0 +1,150 @@
+"""
+JWT-аутентификация simplejwt с async-вариантом для async-представлений (config/async_views.py).
+
+Проверки те же, что у rest_framework_simplejwt.authentication.JWTAuthentication; отличается
+чтение пользователя: в aauthenticate оно идёт через async ORM, без перехода в sync-поток.
+
+Если токен выпущен с claims пользователя (users/tokens.py) и AUTH_STATELESS_JWT включён,
+строка users.User не читается: request.user — TokenUser из claims, а активность и часовой пояс
+берутся из кеша статуса процесса (AUTH_USER_STATUS_TTL секунд). Изменение пользователя в этом
+процессе сбрасывает запись сразу (users/signals.py), в остальных — не позже чем через TTL.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.models import TokenUser, User
+from users.tokens import IS_ACTIVE_CLAIM, TELEGRAM_LINKED_CLAIM
+
+# id пользователя -> ((is_active, timezone) или None, если пользователя нет; момент истечения по time.monotonic())
+_USER_STATUS = {}
+STATUS_FIELDS = ("is_active", "timezone")
+_USER_STATUS_MAX_SIZE = 10_000
+
+
+def _cached_status(user_id):
+    entry = _USER_STATUS.get(user_id)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry
+    return None
+
+
+def _remember_status(user_id, status):
+    if len(_USER_STATUS) >= _USER_STATUS_MAX_SIZE:
+        _USER_STATUS.clear()
+    _USER_STATUS[user_id] = (status, time.monotonic() + getattr(settings, "AUTH_USER_STATUS_TTL", 5))
+    return status
+
+
+def get_user_status(user_id):
+    """(is_active, timezone) пользователя из кеша процесса или БД; None — пользователя нет."""
+    entry = _cached_status(user_id)
+    if entry is not None:
+        return entry[0]
+    return _remember_status(user_id, User.objects.filter(pk=user_id).values_list(*STATUS_FIELDS).first())
+
+
+async def aget_user_status(user_id):
+    entry = _cached_status(user_id)
+    if entry is not None:
+        return entry[0]
+    return _remember_status(user_id, await User.objects.filter(pk=user_id).values_list(*STATUS_FIELDS).afirst())
+
+
+def forget_user_status(user_id) -> None:
+    _USER_STATUS.pop(user_id, None)
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        if self.is_stateless(validated_token):
+            user_id = self.token_user_id(validated_token)
+            return self.token_user(validated_token, user_id, get_user_status(user_id))
+
+        try:
+            user = self.user_model.objects.get(**self.user_lookup(validated_token))
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        return self.check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        if self.is_stateless(validated_token):
+            user_id = self.token_user_id(validated_token)
+            return self.token_user(validated_token, user_id, await aget_user_status(user_id))
+
+        try:
+            user = await self.user_model.objects.aget(**self.user_lookup(validated_token))
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        return self.check_user(user, validated_token)
+
+    @staticmethod
+    def is_stateless(validated_token) -> bool:
+        """Токен с claims users/tokens.py; для проверки отзыва по паролю нужна строка пользователя."""
+        return (
+            getattr(settings, "AUTH_STATELESS_JWT", True)
+            and not api_settings.CHECK_REVOKE_TOKEN
+            and api_settings.USER_ID_FIELD == TokenUser._meta.pk.name
+            and IS_ACTIVE_CLAIM in validated_token
+            and TELEGRAM_LINKED_CLAIM in validated_token
+        )
+
+    @classmethod
+    def token_user_id(cls, validated_token):
+        (user_id,) = cls.user_lookup(validated_token).values()
+        try:
+            return TokenUser._meta.pk.to_python(user_id)
+        except ValidationError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    @classmethod
+    def token_user(cls, validated_token, user_id, status):
+        if status is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        is_active, timezone = status
+        user = TokenUser.from_claims(
+            user_id,
+            is_active=is_active and validated_token[IS_ACTIVE_CLAIM],
+            telegram_linked=validated_token[TELEGRAM_LINKED_CLAIM],
+            timezone=timezone,
+        )
+        return cls.check_user(user, validated_token)
+
+    @staticmethod
+    def user_lookup(validated_token) -> dict:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+        return {api_settings.USER_ID_FIELD: user_id}
+
+    @staticmethod
+    def check_user(user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
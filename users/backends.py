@@ -0,0 +1,23 @@
+from django.contrib.auth import backends
+
+from users.hashers import amake_password
+from users.models import User
+
+
+class ModelBackend(backends.ModelBackend):
+    """ModelBackend, у которого async-вход не считает хеши в event loop (users/hashers.py)."""
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await User._default_manager.aget_by_natural_key(username)
+        except User.DoesNotExist:
+            # Как в Django: хеш для несуществующего пользователя, чтобы время ответа не выдавало email
+            await amake_password(password)
+            return None
+        if await user.acheck_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
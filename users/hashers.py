@@ -0,0 +1,63 @@
+"""
+Хеширование паролей: Argon2 с параметрами из настроек и пул потоков для async-представлений.
+
+Параметры Argon2 (PASSWORD_ARGON2_*) задают стоимость одного хеша; при их смене и для хешей
+PBKDF2 пароль пересчитывается при следующем входе (Django вызывает setter в check_password).
+
+Под ASGI хеш считается в отдельном пуле потоков (PASSWORD_HASHING_THREADS): argon2-cffi
+и hashlib отпускают GIL, поэтому хеши идут параллельно, а event loop продолжает обслуживать
+запросы. django.contrib.auth.hashers.acheck_password проверяет пароль прямо в event loop.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_executor = None
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id с параметрами PASSWORD_ARGON2_TIME_COST, _MEMORY_COST (КиБ) и _PARALLELISM из настроек."""
+
+    @property
+    def time_cost(self):
+        return getattr(settings, "PASSWORD_ARGON2_TIME_COST", 2)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", 19456)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, "PASSWORD_ARGON2_PARALLELISM", 1)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Хеширование нагружает процессор: потоков сверх числа ядер только добавят ожидания
+        threads = getattr(settings, "PASSWORD_HASHING_THREADS", None) or os.cpu_count()
+        _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="password-hashing")
+    return _executor
+
+
+async def run_hashing(func, *args, **kwargs):
+    """Вызывает func в пуле хеширования; func не должна обращаться к БД (у потоков пула свои соединения)."""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+async def amake_password(password):
+    return await run_hashing(hashers.make_password, password)
+
+
+async def acheck_password(user, raw_password) -> bool:
+    """Как AbstractBaseUser.acheck_password, но проверка и пересчёт хеша — в пуле хеширования."""
+    is_correct, must_update = await run_hashing(hashers.verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        user.password = await amake_password(raw_password)
+        await user.asave(update_fields=["password"])
+    return is_correct
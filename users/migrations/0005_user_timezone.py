@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-17 03:28
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_tokenuser"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="timezone",
+            field=models.CharField(
+                default="Europe/Moscow",
+                max_length=64,
+                validators=[users.models.validate_timezone],
+                verbose_name="Часовой пояс",
+            ),
+        ),
+    ]
@@ -1,21 +1,44 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, router
 from django.utils import timezone
 
+from users import hashers
+
+
+def validate_timezone(value):
+    """Имя часового пояса IANA, например "Asia/Yekaterinburg"."""
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError("Неизвестный часовой пояс: %(value)s.", code="invalid_timezone", params={"value": value})
+
 
 class CustomUserManager(BaseUserManager):
-    def create_user(self, email, password=None, **extra_fields):
+    def _build_user(self, email, **extra_fields):
         if not email:
             raise ValueError("Email is required")
         email = self.normalize_email(email)
         extra_fields.setdefault("is_active", True)
-        user = self.model(email=email, **extra_fields)
+        return self.model(email=email, **extra_fields)
+
+    def create_user(self, email, password=None, **extra_fields):
+        user = self._build_user(email, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
         return user
 
+    async def acreate_user(self, email, password=None, **extra_fields):
+        """create_user для async-представлений: хеш пароля считается в пуле потоков users.hashers."""
+        user = self._build_user(email, **extra_fields)
+        user.password = await hashers.amake_password(password)
+        await user.asave(using=self._db)
+        return user
+
     def create_superuser(self, email, password=None, **extra_fields):
         extra_fields.setdefault("is_staff", True)
         extra_fields.setdefault("is_superuser", True)
@@ -37,6 +60,10 @@ class User(AbstractUser):
     city = models.CharField(max_length=100, blank=True, null=True)
     avatar = models.ImageField(upload_to="users/avatars", blank=True, null=True)
     telegram_id = models.CharField(max_length=100, blank=True, null=True)
+    # Время привычек пользователя задаётся в этом поясе (habits.services.calculate_next_reminder_at)
+    timezone = models.CharField(
+        max_length=64, default=settings.TIME_ZONE, validators=[validate_timezone], verbose_name="Часовой пояс"
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -46,11 +73,65 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    @property
+    def is_telegram_linked(self) -> bool:
+        return bool(self.telegram_id)
+
+    async def acheck_password(self, raw_password):
+        # Django проверяет хеш прямо в event loop; здесь проверка и пересчёт — в пуле потоков
+        return await hashers.acheck_password(self, raw_password)
+
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
 
 
+class TokenUser(User):
+    """
+    Пользователь из claims access-токена (users/authentication.py) без чтения строки users.User.
+
+    Загружены только id, is_active и timezone (по нему считаются слоты привычек), флаг привязки
+    Telegram хранится отдельно; остальные поля отложены, и первое обращение к любому из них
+    читает все отложенные поля одним запросом.
+    save() без update_fields сохраняет только загруженные поля, поэтому представления, которые
+    меняют профиль, должны читать пользователя из БД.
+    """
+
+    class Meta:
+        proxy = True
+        default_permissions = ()
+
+    @classmethod
+    def from_claims(cls, user_id, is_active: bool, telegram_linked: bool, timezone: str) -> "TokenUser":
+        loaded = {
+            cls._meta.pk.attname: cls._meta.pk.to_python(user_id),
+            "is_active": is_active,
+            "timezone": timezone,
+        }
+        user = cls.from_db(
+            router.db_for_read(cls),
+            list(loaded),
+            [loaded[field.attname] for field in cls._meta.concrete_fields if field.attname in loaded],
+        )
+        user._telegram_linked = telegram_linked
+        return user
+
+    @property
+    def is_telegram_linked(self) -> bool:
+        if "telegram_id" in self.get_deferred_fields():
+            return self._telegram_linked
+        return super().is_telegram_linked
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if deferred:
+            if fields is None:
+                fields = [field.attname for field in self._meta.concrete_fields]
+            elif deferred.issuperset(fields):
+                fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
 class TelegramLink(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -2,12 +2,17 @@ import secrets
 import string
 from datetime import timedelta
 
+from django.contrib.auth import aauthenticate
 from django.contrib.auth.password_validation import validate_password
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.fields import CharField
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 
 from users.models import TelegramLink, User
+from users.tokens import RefreshToken, user_claims
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -15,12 +20,13 @@ class UserCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ["email", "password", "phone_number", "city", "avatar"]
+        fields = ["email", "password", "phone_number", "city", "avatar", "timezone"]
         extra_kwargs = {
             "email": {"help_text": "Email пользователя (логин)."},
             "phone_number": {"help_text": "Телефонный номер пользователя."},
             "city": {"help_text": "Город пользователя."},
             "avatar": {"help_text": "Аватар пользователя."},
+            "timezone": {"help_text": "Часовой пояс IANA, в котором задано время привычек (например, Europe/Moscow)."},
         }
 
     def validate_password(self, value):
@@ -32,17 +38,24 @@ class UserCreateSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(password=password, **validated_data)
         return user
 
+    async def asave(self):
+        """save() для async-представления: хеш пароля считается в пуле потоков users.hashers."""
+        validated_data = dict(self.validated_data)
+        self.instance = await User.objects.acreate_user(password=validated_data.pop("password"), **validated_data)
+        return self.instance
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ["email", "phone_number", "city", "avatar"]
+        fields = ["email", "phone_number", "city", "avatar", "timezone"]
         read_only_fields = ["email"]
         extra_kwargs = {
             "email": {"help_text": "Email пользователя (логин)."},
             "phone_number": {"help_text": "Телефонный номер пользователя."},
             "city": {"help_text": "Город пользователя."},
             "avatar": {"help_text": "Аватар пользователя."},
+            "timezone": {"help_text": "Часовой пояс IANA, в котором задано время привычек (например, Europe/Moscow)."},
         }
 
 
@@ -110,3 +123,63 @@ class TelegramConfirmSerializer(serializers.Serializer):
         link.save(update_fields=["used_at"])
 
         return {"detail": "Telegram успешно привязан."}
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """Вход: токены с claims пользователя (users/tokens.py)."""
+
+    token_class = RefreshToken
+
+    async def avalidate(self, attrs) -> dict:
+        """validate для async-представления: пароль проверяет aauthenticate в пуле потоков users.hashers."""
+        self.user = await aauthenticate(
+            self.context.get("request"),
+            **{self.username_field: attrs[self.username_field]},
+            password=attrs["password"],
+        )
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        refresh = self.get_token(self.user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            self.user.last_login = timezone.now()
+            await self.user.asave(update_fields=["last_login"])
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Как в simplejwt, но claims пользователя в новом access-токене берутся из БД, а не из
+    refresh-токена: иначе они отставали бы на срок жизни refresh-токена.
+    """
+
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        refresh.payload.update(user_claims(user))
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Без приложения token_blacklist у токена нет blacklist()
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
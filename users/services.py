@@ -1,9 +1,14 @@
 import logging
-from typing import Optional
+import os
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
 
 import httpx
 from django.conf import settings
 
+from config.metrics import BOT_API_LATENCY
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,11 +22,78 @@ class TelegramNotificationService:
         # Секрет для внутреннего API (бот проверяет X-BOT-SECRET)
         self.bot_secret: Optional[str] = getattr(settings, "TELEGRAM_BOT_SECRET", None)
 
+        # Параметры пула соединений к API бота (keep-alive переиспользуется между отправками)
+        self.timeout: float = getattr(settings, "TELEGRAM_HTTP_TIMEOUT", 10.0)
+        self.connect_timeout: float = getattr(settings, "TELEGRAM_HTTP_CONNECT_TIMEOUT", 5.0)
+        self.max_connections: int = getattr(settings, "TELEGRAM_HTTP_MAX_CONNECTIONS", 10)
+        self.max_keepalive_connections: int = getattr(settings, "TELEGRAM_HTTP_MAX_KEEPALIVE_CONNECTIONS", 10)
+        self.keepalive_expiry: float = getattr(settings, "TELEGRAM_HTTP_KEEPALIVE_EXPIRY", 30.0)
+
+        # Сколько сообщений отправлять одним запросом POST /send-batch/ (не больше лимита бота)
+        self.bulk_batch_size: int = getattr(settings, "TELEGRAM_BULK_BATCH_SIZE", 100)
+
+        self._client: Optional[httpx.Client] = None
+        self._client_pid: Optional[int] = None
+        self._client_lock = threading.Lock()
+
         if not self.telegram_api_base_url:
             logger.warning("TELEGRAM_API_BASE_URL не настроен (например: http://127.0.0.1:8001)")
         if not self.bot_secret:
             logger.warning("TELEGRAM_BOT_SECRET не настроен")
 
+    def _build_client(self) -> httpx.Client:
+        return httpx.Client(
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        )
+
+    def get_client(self) -> httpx.Client:
+        """
+        Возвращает долгоживущий HTTP-клиент с пулом соединений.
+
+        Клиент привязан к процессу: после fork (prefork-воркеры Celery, gunicorn) унаследованные
+        сокеты не переиспользуются — в дочернем процессе создаётся новый клиент.
+        """
+        pid = os.getpid()
+        if self._client is not None and self._client_pid == pid:
+            return self._client
+
+        with self._client_lock:
+            if self._client is None or self._client_pid != pid:
+                # Унаследованный от родителя клиент не закрываем: его сокеты принадлежат родителю
+                self._client = self._build_client()
+                self._client_pid = pid
+            return self._client
+
+    def close(self) -> None:
+        """Закрывает HTTP-клиент текущего процесса (следующая отправка создаст новый)."""
+        with self._client_lock:
+            if self._client is not None and self._client_pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._client_pid = None
+
+    def _reset_after_fork(self) -> None:
+        # В дочернем процессе блокировка могла остаться захваченной потоком родителя
+        self._client_lock = threading.Lock()
+        self._client = None
+        self._client_pid = None
+
+    def _post(self, endpoint: str, url: str, payload: dict, headers: dict) -> httpx.Response:
+        """POST к API бота с замером задержки (метрика habit_reminder_bot_api_latency_seconds)."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self.get_client().post(url, json=payload, headers=headers)
+            outcome = "ok" if 200 <= response.status_code < 300 else "http_error"
+            return response
+        finally:
+            BOT_API_LATENCY.labels(endpoint=endpoint, outcome=outcome).observe(time.perf_counter() - started)
+
     def send_message(self, telegram_id: str, message: str) -> bool:
         """
         Отправляет сообщение через внутренний API Telegram-бота (FastAPI).
@@ -47,8 +119,7 @@ class TelegramNotificationService:
         }
 
         try:
-            with httpx.Client(timeout=10.0) as client:
-                response = client.post(url, json=payload, headers=headers)
+            response = self._post("send", url, payload, headers)
 
             if 200 <= response.status_code < 300:
                 logger.info("Сообщение успешно отправлено пользователю %s", telegram_id)
@@ -69,6 +140,69 @@ class TelegramNotificationService:
             logger.exception("Неожиданная ошибка при отправке пользователю %s: %s", telegram_id, e)
             return False
 
+    def send_messages_bulk(self, messages: Sequence[Tuple[str, str]]) -> List[bool]:
+        """
+        Отправляет пачку сообщений через POST {TELEGRAM_API_BASE_URL}/send-batch/.
+
+        messages: последовательность пар (telegram_id, message).
+        Возвращает список статусов в том же порядке: True — только если бот отправил сообщение
+        ("success"; не отправленные за TELEGRAM_SEND_BATCH_TIMEOUT бот возвращает как "timeout").
+        Большие пачки делятся на запросы по TELEGRAM_BULK_BATCH_SIZE; при ошибке запроса все его
+        сообщения считаются неотправленными.
+        """
+        results: List[bool] = [False] * len(messages)
+        if not messages:
+            return results
+
+        if not self.telegram_api_base_url:
+            logger.error("TELEGRAM_API_BASE_URL не настроен — отправка невозможна")
+            return results
+
+        if not self.bot_secret:
+            logger.error("TELEGRAM_BOT_SECRET не настроен — отправка невозможна")
+            return results
+
+        url = f"{self.telegram_api_base_url.rstrip('/')}/send-batch/"
+        headers = {
+            "X-BOT-SECRET": self.bot_secret,
+            "Content-Type": "application/json",
+        }
+
+        for start in range(0, len(messages), self.bulk_batch_size):
+            end = start + self.bulk_batch_size
+            chunk = messages[start:end]
+            payload = {"messages": [{"telegram_id": str(tid), "message": text} for tid, text in chunk]}
+
+            try:
+                response = self._post("send_batch", url, payload, headers)
+            except httpx.RequestError as e:
+                logger.error("Ошибка сети при пакетной отправке (%s сообщений): %s", len(chunk), e)
+                continue
+            except Exception as e:
+                logger.exception("Неожиданная ошибка при пакетной отправке (%s сообщений): %s", len(chunk), e)
+                continue
+
+            if not 200 <= response.status_code < 300:
+                logger.error(
+                    "Ошибка пакетной отправки (%s сообщений): статус=%s, ответ=%s",
+                    len(chunk),
+                    response.status_code,
+                    response.text,
+                )
+                continue
+
+            try:
+                items = response.json()["results"]
+            except (ValueError, KeyError, TypeError):
+                logger.error("Некорректный ответ пакетной отправки: %s", response.text)
+                continue
+
+            for offset, item in enumerate(items[: len(chunk)]):
+                results[start + offset] = item.get("status") == "success"
+
+        logger.info("Пакетная отправка: успешно=%s из %s", sum(results), len(results))
+        return results
+
 
 # ---- Ленивая (lazy) инициализация, чтобы не фиксировать settings при импорте ----
 
@@ -84,3 +218,12 @@ def get_telegram_service() -> TelegramNotificationService:
     if _telegram_service is None:
         _telegram_service = TelegramNotificationService()
     return _telegram_service
+
+
+def _reset_telegram_service_after_fork() -> None:
+    if _telegram_service is not None:
+        _telegram_service._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_telegram_service_after_fork)
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import forget_user_status
+from users.models import TokenUser, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=TokenUser)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=TokenUser)
+def forget_cached_status(sender, instance, using, **kwargs):
+    # После коммита, иначе параллельный запрос успеет закешировать ещё прежний статус.
+    # pk запоминаем сразу: к коммиту внешней транзакции delete() уже обнулит instance.pk
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_user_status(user_id), using=using)
@@ -0,0 +1,143 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.async_views import with_async_reads
+from users import authentication, tokens
+from users import urls as user_urls
+from users.models import User
+
+# URL-конфигурация с API_ASYNC_READS=True (как в config/urls.py под ASGI)
+urlpatterns = [
+    path(
+        "api/users/",
+        include(
+            (
+                with_async_reads(
+                    with_async_reads(user_urls.urlpatterns, user_urls.async_read_views),
+                    user_urls.async_password_views,
+                    methods=("POST",),
+                ),
+                user_urls.app_name,
+            )
+        ),
+    ),
+]
+
+
+class AsyncUserDetailTest(TestCase):
+    url = "/api/users/detail/me/"
+
+    def setUp(self):
+        authentication._USER_STATUS.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123", city="Москва")
+
+    def get(self, **headers):
+        expected = self.client.get(self.url, headers=headers)
+        with override_settings(ROOT_URLCONF=__name__):
+            response = async_to_sync(self.async_client.get)(self.url, headers=headers)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response.get("WWW-Authenticate"), expected.get("WWW-Authenticate"))
+        return response
+
+    def test_detail_reads_user_once(self):
+        with override_settings(ROOT_URLCONF=__name__), self.assertNumQueries(1):
+            response = async_to_sync(self.async_client.get)(
+                self.url, headers={"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["email"], "test@example.com")
+
+    def test_detail_with_token_claims_loads_profile(self):
+        # Статус пользователя и профиль — по одному запросу, полной строки при аутентификации нет
+        with override_settings(ROOT_URLCONF=__name__), self.assertNumQueries(2):
+            response = async_to_sync(self.async_client.get)(
+                self.url, headers={"Authorization": f"Bearer {tokens.AccessToken.for_user(self.user)}"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["city"], "Москва")
+
+    def test_same_response_as_sync_view(self):
+        self.assertEqual(self.get(authorization=f"Bearer {AccessToken.for_user(self.user)}").status_code, 200)
+
+    def test_authentication_errors(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.get(authorization="Bearer broken").status_code, 401)
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.get(authorization=f"Bearer {token}").json()["code"], "user_inactive")
+
+        self.user.delete()
+        self.assertEqual(self.get(authorization=f"Bearer {token}").json()["code"], "user_not_found")
+
+
+class AsyncPasswordViewsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            email="test@example.com", password=make_password("testpass123", hasher="pbkdf2_sha256")
+        )
+
+    def post(self, url, data):
+        expected_status = self.client.post(url, data).status_code
+        with override_settings(ROOT_URLCONF=__name__):
+            response = async_to_sync(self.async_client.post)(url, data)
+        self.assertEqual(response.status_code, expected_status)
+        return response
+
+    def test_login_rehashes_and_issues_tokens(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            response = async_to_sync(self.async_client.post)(
+                "/api/users/login/", {"email": "test@example.com", "password": "testpass123"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(tokens.AccessToken(response.json()["access"])["is_active"], True)
+        self.assertIn("refresh", response.json())
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).algorithm, "argon2")
+
+    def test_login_errors_as_sync_view(self):
+        response = self.post("/api/users/login/", {"email": "test@example.com", "password": "wrong-password"})
+        self.assertEqual(response.json()["code"], "no_active_account")
+        self.assertEqual(response["WWW-Authenticate"], 'Bearer realm="api"')
+
+        self.assertEqual(
+            self.post("/api/users/login/", {"email": "missing@example.com", "password": "x"}).status_code, 401
+        )
+        self.assertIn("password", self.post("/api/users/login/", {"email": "test@example.com"}).json())
+
+    def test_register(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            response = async_to_sync(self.async_client.post)(
+                "/api/users/register/", {"email": "new@example.com", "password": "Str0ng-passw0rd", "city": "Казань"}
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.json(),
+            {
+                "email": "new@example.com",
+                "phone_number": None,
+                "city": "Казань",
+                "avatar": None,
+                "timezone": "Europe/Moscow",
+            },
+        )
+        self.assertTrue(User.objects.get(email="new@example.com").check_password("Str0ng-passw0rd"))
+
+    def test_register_validation_as_sync_view(self):
+        self.assertIn(
+            "email",
+            self.post("/api/users/register/", {"email": "test@example.com", "password": "Str0ng-passw0rd"}).json(),
+        )
+        self.assertIn(
+            "password", self.post("/api/users/register/", {"email": "new@example.com", "password": "123"}).json()
+        )
@@ -0,0 +1,183 @@
+import time
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken as PlainAccessToken
+
+from habits.models import Habit
+from users import authentication
+from users.authentication import JWTAuthentication
+from users.models import TokenUser, User
+from users.tokens import AccessToken, RefreshToken
+
+
+def user_queries(queries) -> list:
+    return [query["sql"] for query in queries if '"users_user"' in query["sql"]]
+
+
+class TokenClaimsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123")
+
+    def test_login_issues_user_claims(self):
+        response = self.client.post("/api/users/login/", {"email": "test@example.com", "password": "testpass123"})
+
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.json()["access"])
+        self.assertEqual(access["user_id"], str(self.user.pk))
+        self.assertIs(access["is_active"], True)
+        self.assertIs(access["telegram_linked"], False)
+
+    def test_refresh_reads_claims_from_database(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.user.telegram_id = "42"
+        self.user.save(update_fields=["telegram_id"])
+
+        response = self.client.post("/api/users/token/refresh/", {"refresh": str(refresh)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(AccessToken(response.json()["access"])["telegram_linked"], True)
+
+    def test_refresh_rejects_inactive_and_deleted_users(self):
+        refresh = str(RefreshToken.for_user(self.user))
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        response = self.client.post("/api/users/token/refresh/", {"refresh": refresh})
+        self.assertEqual((response.status_code, response.json()["code"]), (401, "no_active_account"))
+
+        self.user.delete()
+        response = self.client.post("/api/users/token/refresh/", {"refresh": refresh})
+        self.assertEqual((response.status_code, response.json()["code"]), (401, "no_active_account"))
+
+
+class StatelessAuthenticationTest(TestCase):
+    def setUp(self):
+        authentication._USER_STATUS.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123", city="Москва")
+        Habit.objects.create(user=self.user, place="Дом", time="10:00", action="Зарядка", reward="Кофе")
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return JWTAuthentication().authenticate(request)[0]
+
+    def test_token_user_from_claims(self):
+        self.user.telegram_id = "42"
+        self.user.save(update_fields=["telegram_id"])
+        token = AccessToken.for_user(self.user)
+        self.authenticate(token)
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+            self.assertIsInstance(user, TokenUser)
+            self.assertEqual((user.pk, user.is_active, user.is_telegram_linked), (self.user.pk, True, True))
+            self.assertEqual(user, self.user)
+
+        # Остальные поля — одним запросом при первом обращении
+        with self.assertNumQueries(1):
+            self.assertEqual((user.email, user.city, user.telegram_id), ("test@example.com", "Москва", "42"))
+
+    def list_habits_queries(self, headers) -> list:
+        # captured_queries вычисляется лениво, а следующий запрос сбрасывает connection.queries
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/api/habits/", headers=headers).status_code, 200)
+        return list(queries)
+
+    def test_habit_list_without_user_row(self):
+        full = self.list_habits_queries({"Authorization": f"Bearer {PlainAccessToken.for_user(self.user)}"})
+        self.list_habits_queries(self.headers)
+        stateless = self.list_habits_queries(self.headers)
+
+        self.assertEqual(len(user_queries(full)), 1)
+        self.assertEqual(user_queries(stateless), [])
+        self.assertEqual(len(stateless), len(full) - 1)
+
+    def test_status_read_once_per_ttl(self):
+        first = self.list_habits_queries(self.headers)
+        with mock.patch("users.authentication.time.monotonic", return_value=time.monotonic() + 60):
+            expired = self.list_habits_queries(self.headers)
+
+        self.assertEqual(len(user_queries(first)), 1)
+        self.assertIn('"is_active"', user_queries(first)[0])
+        self.assertEqual(len(user_queries(expired)), 1)
+
+    def test_create_habit_with_token_user(self):
+        response = self.client.post(
+            "/api/habits/",
+            {"place": "Парк", "time": "08:00", "action": "Бег", "reward": "Чай"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Habit.objects.get(action="Бег").user_id, self.user.pk)
+
+    def test_user_detail_loads_profile(self):
+        response = self.client.get("/api/users/detail/me/", headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["city"], "Москва")
+
+    def test_deactivation_effective_immediately_in_process(self):
+        self.assertEqual(self.client.get("/api/habits/", headers=self.headers).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete("/api/users/delete/me/", headers=self.headers).status_code, 204)
+
+        response = self.client.get("/api/habits/", headers=self.headers)
+        self.assertEqual((response.status_code, response.json()["code"]), (401, "user_inactive"))
+
+    def test_deactivation_elsewhere_effective_after_ttl(self):
+        self.client.get("/api/habits/", headers=self.headers)
+        # Деактивация в другом процессе: сигналы этого процесса о ней не знают
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.client.get("/api/habits/", headers=self.headers).status_code, 200)
+        with mock.patch("users.authentication.time.monotonic", return_value=time.monotonic() + 60):
+            self.assertEqual(self.client.get("/api/habits/", headers=self.headers).status_code, 401)
+
+    def test_update_does_not_restore_stale_status(self):
+        self.client.get("/api/habits/", headers=self.headers)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.patch(
+            "/api/users/update/me/", {"city": "Казань"}, content_type="application/json", headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.city, self.user.is_active), ("Казань", False))
+
+    def test_deleted_user(self):
+        token = AccessToken.for_user(self.user)
+        self.user.delete()
+
+        response = self.client.get("/api/habits/", headers={"Authorization": f"Bearer {token}"})
+
+        self.assertEqual((response.status_code, response.json()["code"]), (401, "user_not_found"))
+
+    def test_delete_inside_transaction_forgets_status(self):
+        self.assertEqual(self.client.get("/api/habits/", headers=self.headers).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.user.delete()
+
+        response = self.client.get("/api/habits/", headers=self.headers)
+        self.assertEqual((response.status_code, response.json()["code"]), (401, "user_not_found"))
+
+    def test_tokens_without_claims_load_user(self):
+        user = self.authenticate(PlainAccessToken.for_user(self.user))
+
+        self.assertIs(type(user), User)
+
+    @override_settings(AUTH_STATELESS_JWT=False)
+    def test_disabled(self):
+        with self.assertNumQueries(1):
+            user = self.authenticate(AccessToken.for_user(self.user))
+
+        self.assertIs(type(user), User)
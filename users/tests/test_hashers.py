@@ -0,0 +1,75 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import hashers
+from django.test import TestCase, override_settings
+
+from users.models import User
+
+PASSWORD = "testpass123"
+
+
+def login(client, password=PASSWORD):
+    return client.post("/api/users/login/", {"email": "test@example.com", "password": password})
+
+
+class Argon2PasswordHasherTest(TestCase):
+    def test_new_passwords_use_tuned_argon2(self):
+        user = User.objects.create_user(email="test@example.com", password=PASSWORD)
+
+        self.assertTrue(user.password.startswith("argon2$argon2id$v=19$m=19456,t=2,p=1$"))
+        self.assertTrue(user.check_password(PASSWORD))
+
+    @override_settings(PASSWORD_ARGON2_MEMORY_COST=8192, PASSWORD_ARGON2_TIME_COST=1, PASSWORD_ARGON2_PARALLELISM=2)
+    def test_parameters_from_settings(self):
+        self.assertIn("$m=8192,t=1,p=2$", hashers.make_password(PASSWORD))
+
+
+class TransparentRehashTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            email="test@example.com", password=hashers.make_password(PASSWORD, hasher="pbkdf2_sha256")
+        )
+
+    def test_login_rehashes_pbkdf2(self):
+        self.assertEqual(login(self.client).status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertEqual(hashers.identify_hasher(self.user.password).algorithm, "argon2")
+        self.assertEqual(login(self.client).status_code, 200)
+
+    def test_wrong_password_keeps_hash(self):
+        encoded = self.user.password
+
+        self.assertEqual(login(self.client, "wrong-password").status_code, 401)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, encoded)
+
+    def test_login_rehashes_after_parameters_change(self):
+        login(self.client)
+        self.user.refresh_from_db()
+        encoded = self.user.password
+
+        with override_settings(PASSWORD_ARGON2_TIME_COST=3):
+            self.assertEqual(login(self.client).status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, encoded)
+        self.assertIn(",t=3,", self.user.password)
+
+    def test_async_check_rehashes_in_hashing_pool(self):
+        threads = []
+
+        def verify_password(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return verify(*args, **kwargs)
+
+        verify = hashers.verify_password
+        with mock.patch.object(hashers, "verify_password", verify_password):
+            self.assertTrue(async_to_sync(self.user.acheck_password)(PASSWORD))
+
+        self.assertTrue(threads[0].startswith("password-hashing"))
+        self.user.refresh_from_db()
+        self.assertEqual(hashers.identify_hasher(self.user.password).algorithm, "argon2")
@@ -0,0 +1,62 @@
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from config.renderers import ORJSONRenderer
+from users.models import User
+
+
+@override_settings(TELEGRAM_BOT_SECRET="secret")
+class UserEndpointsJSONContractTest(TestCase):
+    """Ответы эндпоинтов пользователей совпадают с рендерингом тех же данных стандартным JSONRenderer."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="testpass123", city="Москва")
+        self.client = APIClient()
+
+    def assertStockJSON(self, response, status_code):
+        self.assertEqual(response.status_code, status_code)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        expected = JSONRenderer().render(response.data, response.accepted_media_type, response.renderer_context)
+        self.assertEqual(response.content, expected)
+
+    def test_auth(self):
+        self.assertStockJSON(
+            self.client.post(
+                "/api/users/register/", {"email": "new@example.com", "password": "StrongPass123!"}, format="json"
+            ),
+            201,
+        )
+        self.assertStockJSON(self.client.post("/api/users/register/", {"email": "плохой"}, format="json"), 400)
+
+        login = self.client.post(
+            "/api/users/login/", {"email": "test@example.com", "password": "testpass123"}, format="json"
+        )
+        self.assertStockJSON(login, 200)
+        self.assertStockJSON(
+            self.client.post("/api/users/token/refresh/", {"refresh": login.data["refresh"]}, format="json"), 200
+        )
+        self.assertStockJSON(
+            self.client.post("/api/users/login/", {"email": "test@example.com", "password": "x"}, format="json"), 401
+        )
+
+    def test_profile_and_telegram(self):
+        self.client.force_authenticate(self.user)
+
+        self.assertStockJSON(self.client.get("/api/users/detail/me/"), 200)
+        self.assertStockJSON(self.client.patch("/api/users/update/me/", {"city": "Казань"}, format="json"), 200)
+
+        link = self.client.post("/api/users/telegram/link/")
+        self.assertStockJSON(link, 201)
+        self.assertStockJSON(
+            self.client.post(
+                "/api/users/telegram/confirm/",
+                {"code": link.data["code"], "chat_id": 42},
+                format="json",
+                HTTP_X_BOT_SECRET="secret",
+            ),
+            200,
+        )
+        self.assertStockJSON(
+            self.client.post("/api/users/telegram/confirm/", {"code": "x", "chat_id": 0}, format="json"), 403
+        )
@@ -95,7 +95,7 @@ class UserSerializerTest(TestCase):
 
     def test_fields_contain_expected_fields(self):
         serializer = UserSerializer(self.user)
-        expected_fields = {"email", "phone_number", "city", "avatar"}
+        expected_fields = {"email", "phone_number", "city", "avatar", "timezone"}
         actual_fields = set(serializer.data.keys())
 
         self.assertEqual(expected_fields, actual_fields)
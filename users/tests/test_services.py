@@ -1,3 +1,4 @@
+import os
 from unittest.mock import Mock, patch
 
 from django.test import TestCase, override_settings
@@ -53,7 +54,7 @@ class TelegramNotificationServiceTests(TestCase):
             mock_response.status_code = 200
             mock_client = Mock()
             mock_client.post.return_value = mock_response
-            mock_client_class.return_value.__enter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             result = service.send_message(self.telegram_id, self.message)
 
@@ -77,7 +78,7 @@ class TelegramNotificationServiceTests(TestCase):
         mock_response.text = "Internal Server Error"
         mock_client = Mock()
         mock_client.post.return_value = mock_response
-        mock_client_class.return_value.__enter__.return_value = mock_client
+        mock_client_class.return_value = mock_client
 
         result = self.service.send_message(self.telegram_id, self.message)
 
@@ -90,7 +91,7 @@ class TelegramNotificationServiceTests(TestCase):
         # Настраиваем мок для выброса исключения сети
         mock_client = Mock()
         mock_client.post.side_effect = RequestError("Network error")
-        mock_client_class.return_value.__enter__.return_value = mock_client
+        mock_client_class.return_value = mock_client
 
         result = self.service.send_message(self.telegram_id, self.message)
 
@@ -107,7 +108,7 @@ class TelegramNotificationServiceTests(TestCase):
             mock_response.status_code = 200
             mock_client = Mock()
             mock_client.post.return_value = mock_response
-            mock_client_class.return_value.__enter__.return_value = mock_client
+            mock_client_class.return_value = mock_client
 
             result = service.send_message(self.telegram_id, self.message)
 
@@ -123,6 +124,139 @@ class TelegramNotificationServiceTests(TestCase):
             )
 
 
+class TelegramNotificationServiceClientTests(TestCase):
+    """Тесты долгоживущего HTTP-клиента сервиса"""
+
+    @override_settings(
+        TELEGRAM_HTTP_TIMEOUT=7.0,
+        TELEGRAM_HTTP_MAX_CONNECTIONS=3,
+        TELEGRAM_HTTP_MAX_KEEPALIVE_CONNECTIONS=2,
+    )
+    @patch("users.services.httpx.Client")
+    def test_client_built_from_settings(self, mock_client_class):
+        """Тест: таймауты и лимиты пула берутся из настроек"""
+        service = TelegramNotificationService()
+        service.get_client()
+
+        kwargs = mock_client_class.call_args.kwargs
+        self.assertEqual(kwargs["timeout"].read, 7.0)
+        self.assertEqual(kwargs["limits"].max_connections, 3)
+        self.assertEqual(kwargs["limits"].max_keepalive_connections, 2)
+
+    @override_settings(TELEGRAM_API_BASE_URL="http://test-api.com", TELEGRAM_BOT_SECRET="test-secret")
+    @patch("users.services.httpx.Client")
+    def test_client_reused_between_messages(self, mock_client_class):
+        """Тест: несколько отправок используют один клиент"""
+        mock_response = Mock(spec=Response)
+        mock_response.status_code = 200
+        mock_client_class.return_value.post.return_value = mock_response
+
+        service = TelegramNotificationService()
+        service.send_message("1", "a")
+        service.send_message("2", "b")
+
+        mock_client_class.assert_called_once()
+        self.assertEqual(mock_client_class.return_value.post.call_count, 2)
+
+    @patch("users.services.httpx.Client")
+    def test_client_recreated_after_fork(self, mock_client_class):
+        """Тест: в другом процессе создаётся новый клиент, а унаследованный не закрывается"""
+        inherited, fresh = Mock(), Mock()
+        mock_client_class.side_effect = [inherited, fresh]
+
+        service = TelegramNotificationService()
+        self.assertIs(service.get_client(), inherited)
+
+        with patch("users.services.os.getpid", return_value=os.getpid() + 1):
+            self.assertIs(service.get_client(), fresh)
+
+        inherited.close.assert_not_called()
+
+    @patch("users.services.httpx.Client")
+    def test_close(self, mock_client_class):
+        """Тест: close закрывает клиент, следующая отправка создаёт новый"""
+        service = TelegramNotificationService()
+        client = service.get_client()
+
+        service.close()
+
+        client.close.assert_called_once()
+        service.get_client()
+        self.assertEqual(mock_client_class.call_count, 2)
+
+
+@override_settings(
+    TELEGRAM_API_BASE_URL="http://test-api.com", TELEGRAM_BOT_SECRET="test-secret", TELEGRAM_BULK_BATCH_SIZE=2
+)
+class TelegramNotificationServiceBulkTests(TestCase):
+    """Тесты пакетной отправки send_messages_bulk"""
+
+    def setUp(self):
+        self.service = TelegramNotificationService()
+        self.client = Mock()
+        self.service.get_client = Mock(return_value=self.client)
+
+    def _response(self, statuses, status_code=200):
+        response = Mock(spec=Response)
+        response.status_code = status_code
+        response.text = "error"
+        response.json.return_value = {"results": [{"status": status} for status in statuses]}
+        return response
+
+    def test_send_messages_bulk_success(self):
+        """Тест: сообщения делятся на запросы по TELEGRAM_BULK_BATCH_SIZE, статусы в порядке запроса"""
+        self.client.post.side_effect = [self._response(["success", "error"]), self._response(["success"])]
+
+        result = self.service.send_messages_bulk([("1", "a"), ("2", "b"), ("3", "c")])
+
+        self.assertEqual(result, [True, False, True])
+        self.assertEqual(self.client.post.call_count, 2)
+        self.client.post.assert_any_call(
+            "http://test-api.com/send-batch/",
+            json={"messages": [{"telegram_id": "1", "message": "a"}, {"telegram_id": "2", "message": "b"}]},
+            headers={
+                "X-BOT-SECRET": "test-secret",
+                "Content-Type": "application/json",
+            },
+        )
+
+    def test_send_messages_bulk_only_success_counts_as_sent(self):
+        """Тест: сообщения, не отправленные ботом к таймауту или лишь поставленные в очередь, не отправлены"""
+        self.client.post.side_effect = [self._response(["timeout", "queued"]), self._response(["success"])]
+
+        result = self.service.send_messages_bulk([("1", "a"), ("2", "b"), ("3", "c")])
+
+        self.assertEqual(result, [False, False, True])
+
+    def test_send_messages_bulk_failed_request(self):
+        """Тест: ошибка одного запроса помечает неотправленными только его сообщения"""
+        self.client.post.side_effect = [RequestError("Network error"), self._response(["success"])]
+
+        result = self.service.send_messages_bulk([("1", "a"), ("2", "b"), ("3", "c")])
+
+        self.assertEqual(result, [False, False, True])
+
+    def test_send_messages_bulk_server_error(self):
+        """Тест: статус ответа вне 2xx"""
+        self.client.post.return_value = self._response([], status_code=502)
+
+        result = self.service.send_messages_bulk([("1", "a")])
+
+        self.assertEqual(result, [False])
+
+    def test_send_messages_bulk_empty(self):
+        """Тест: пустая пачка не делает запросов"""
+        self.assertEqual(self.service.send_messages_bulk([]), [])
+        self.client.post.assert_not_called()
+
+    @override_settings(TELEGRAM_API_BASE_URL=None)
+    def test_send_messages_bulk_no_api_url(self):
+        """Тест: без URL API ничего не отправляется"""
+        service = TelegramNotificationService()
+
+        self.assertEqual(service.send_messages_bulk([("1", "a")]), [False])
+
+
 class GetTelegramServiceTests(TestCase):
     """Тесты функции get_telegram_service"""
 
@@ -0,0 +1,139 @@
+import os
+import time
+import uuid
+from unittest import mock, skipUnless
+
+import redis
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from users import throttling
+from users.models import User
+from users.throttling import LoginRateThrottle, check_rates, email_ident
+
+REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/2")
+
+
+def redis_available() -> bool:
+    try:
+        return redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.2).ping()
+    except redis.RedisError:
+        return False
+
+
+def drf_request(data) -> Request:
+    return Request(APIRequestFactory().post("/", data, format="json"), parsers=[JSONParser()])
+
+
+def redis_caches(location=REDIS_URL) -> dict:
+    # Свой префикс на тест: окна не пересекаются с другими тестами и прогонами
+    return {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": location,
+            "KEY_PREFIX": f"test-throttle-{uuid.uuid4().hex}",
+        }
+    }
+
+
+@skipUnless(redis_available(), "нужен Redis (CACHE_REDIS_URL)")
+class SlidingWindowTest(SimpleTestCase):
+    def setUp(self):
+        settings_override = override_settings(CACHES=redis_caches())
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_window_slides(self):
+        self.assertEqual(check_rates({"k": (2, 1)}), 0)
+        self.assertEqual(check_rates({"k": (2, 1)}), 0)
+
+        wait = check_rates({"k": (2, 1)})
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 1)
+
+        time.sleep(wait + 0.01)
+        self.assertEqual(check_rates({"k": (2, 1)}), 0)
+
+    def test_attempt_recorded_only_if_all_limits_allow(self):
+        self.assertEqual(check_rates({"ip": (5, 60), "email": (1, 60)}), 0)
+        self.assertGreater(check_rates({"ip": (5, 60), "email": (1, 60)}), 0)
+
+        client = caches["default"]._cache.get_client()
+        self.assertEqual(client.zcard(caches["default"].make_key("throttle:ip")), 1)
+        self.assertLessEqual(client.pttl(caches["default"].make_key("throttle:ip")), 60_000)
+
+
+@skipUnless(redis_available(), "нужен Redis (CACHE_REDIS_URL)")
+@override_settings(AUTH_THROTTLE_ENABLED=True)
+class AuthThrottleTest(TestCase):
+    def setUp(self):
+        settings_override = override_settings(CACHES=redis_caches())
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        User.objects.create_user(email="test@example.com", password="testpass123")
+
+    def login(self, email, password="wrong-password", **extra):
+        return self.client.post("/api/users/login/", {"email": email, "password": password}, **extra)
+
+    @mock.patch.dict(api_settings.DEFAULT_THROTTLE_RATES, {"login_ip": "100/min", "login_email": "2/min"})
+    def test_login_limited_by_email(self):
+        self.assertEqual(self.login("test@example.com", "testpass123").status_code, 200)
+        self.assertEqual(self.login("TEST@example.com").status_code, 401)
+
+        response = self.login("test@example.com", "testpass123")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(int(response["Retry-After"]), range(1, 61))
+
+        self.assertEqual(self.login("other@example.com").status_code, 401)
+
+    @mock.patch.dict(api_settings.DEFAULT_THROTTLE_RATES, {"login_ip": "3/min", "login_email": "100/min"})
+    def test_login_limited_by_ip(self):
+        for number in range(3):
+            self.assertEqual(self.login(f"user{number}@example.com").status_code, 401)
+
+        self.assertEqual(self.login("test@example.com", "testpass123").status_code, 429)
+        self.assertEqual(self.login("test@example.com", "testpass123", REMOTE_ADDR="10.0.0.2").status_code, 200)
+
+    @mock.patch.dict(api_settings.DEFAULT_THROTTLE_RATES, {"token_refresh_ip": "1/min", "register_ip": "1/min"})
+    def test_refresh_and_register_limited_by_ip(self):
+        self.client.post("/api/users/token/refresh/", {"refresh": "broken"})
+        self.assertEqual(self.client.post("/api/users/token/refresh/", {"refresh": "broken"}).status_code, 429)
+
+        data = {"email": "new@example.com", "password": "Str0ng-passw0rd"}
+        self.assertEqual(self.client.post("/api/users/register/", data).status_code, 201)
+        self.assertEqual(self.client.post("/api/users/register/", data).status_code, 429)
+
+
+class ThrottleFallbackTest(TestCase):
+    @override_settings(AUTH_THROTTLE_ENABLED=True, CACHES=redis_caches("redis://127.0.0.1:1/0"))
+    def test_redis_unavailable_allows_request(self):
+        request = drf_request({"email": "test@example.com"})
+
+        with self.assertLogs(throttling.logger, "ERROR"):
+            allowed = LoginRateThrottle().allow_request(request, None)
+
+        self.assertTrue(allowed)
+
+    def test_disabled_in_tests(self):
+        with mock.patch.object(throttling, "check_rates") as check:
+            for _ in range(3):
+                self.client.post("/api/users/login/", {"email": "test@example.com", "password": "x"})
+
+        check.assert_not_called()
+
+    def test_ip_from_last_proxy_hop(self):
+        request = APIRequestFactory().post("/", HTTP_X_FORWARDED_FOR="1.2.3.4, 10.0.0.3", REMOTE_ADDR="172.18.0.5")
+
+        # Первый адрес подставил клиент, последний — nginx
+        self.assertEqual(LoginRateThrottle().get_idents(Request(request), None)["login_ip"], "10.0.0.3")
+
+    def test_email_ident_ignores_case_and_spaces(self):
+        ident = email_ident(drf_request({"email": "test@example.com"}))
+
+        self.assertEqual(email_ident(drf_request({"email": " Test@Example.com"})), ident)
+        self.assertNotIn("test", ident)
+        self.assertIsNone(email_ident(drf_request(["test@example.com"])))
@@ -0,0 +1,159 @@
+"""
+Ограничение частоты входа, обновления токена и регистрации: скользящее окно в Redis.
+
+Для каждого лимита в sorted set ключа лежат отметки времени запросов за последнее окно.
+Lua-скрипт за один запрос к Redis проверяет все лимиты запроса (например, по IP и по email)
+и записывает попытку, только если не превышен ни один; время берётся из Redis (TIME), поэтому
+часы серверов приложения не влияют на окно. Отклонённые попытки окно не продлевают.
+
+Лимиты — REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] в формате DRF ("10/min"); при превышении
+DRF отвечает 429 с Retry-After. Если Redis недоступен, запрос пропускается: лимит защищает
+от перебора, но не должен останавливать вход. AUTH_THROTTLE_ENABLED=False выключает проверку.
+"""
+
+import hashlib
+import logging
+import secrets
+import weakref
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from redis.exceptions import RedisError
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS — ключи окон; ARGV[1] — метка попытки, далее по паре (лимит, окно в мс) на ключ.
+# Возвращает 0, если попытка записана, иначе сколько миллисекунд ждать свободного места.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[2 * i])
+    local window = tonumber(ARGV[2 * i + 1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        -- место освободится, когда из окна выйдет limit-я с конца попытка
+        local oldest = redis.call('ZRANGE', key, -limit, -limit, 'WITHSCORES')
+        wait = math.max(wait, tonumber(oldest[2]) + window - now)
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[1])
+    redis.call('PEXPIRE', key, ARGV[2 * i + 1])
+end
+return 0
+"""
+
+_script = None
+# экземпляр RedisCache (у каждого потока свой) -> клиент redis
+_clients = weakref.WeakKeyDictionary()
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Разбирает лимит вида "10/min" в (10, 60) — запросов и секунд окна, как SimpleRateThrottle."""
+    num, period = rate.split("/")
+    return int(num), DURATIONS[period[0]]
+
+
+def _redis_client():
+    cache = caches[getattr(settings, "AUTH_THROTTLE_CACHE_ALIAS", "default")]
+    if not isinstance(cache, RedisCache):
+        raise ImproperlyConfigured("users.throttling: AUTH_THROTTLE_CACHE_ALIAS должен указывать на RedisCache")
+    # get_client создаёт клиент на каждый вызов — это дольше самой проверки; пул соединений общий
+    client = _clients.get(cache)
+    if client is None:
+        client = _clients[cache] = cache._cache.get_client(write=True)
+    return cache, client
+
+
+def check_rates(checks: dict) -> float:
+    """
+    checks: {ключ окна: (лимит, окно в секундах)}. Записывает попытку во все окна, если
+    ни одно не заполнено, и возвращает 0; иначе — сколько секунд ждать.
+    """
+    global _script
+    cache, client = _redis_client()
+    if _script is None:
+        _script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    args = [secrets.token_hex(8)]
+    for limit, window in checks.values():
+        args += [limit, window * 1000]
+    wait_ms = _script(keys=[cache.make_key(f"throttle:{key}") for key in checks], args=args, client=client)
+    return wait_ms / 1000
+
+
+class SlidingWindowRateThrottle(BaseThrottle):
+    """
+    Throttle DRF со скользящим окном в Redis. Наследники задают get_idents:
+    {scope из DEFAULT_THROTTLE_RATES: идентификатор клиента}; все лимиты проверяются разом.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_idents(self, request, view) -> dict:
+        raise NotImplementedError(".get_idents() must be overridden")
+
+    def allow_request(self, request, view):
+        if not getattr(settings, "AUTH_THROTTLE_ENABLED", True):
+            return True
+
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        checks = {
+            f"{scope}:{ident}": parse_rate(rates[scope])
+            for scope, ident in self.get_idents(request, view).items()
+            if ident and rates.get(scope)
+        }
+        if not checks:
+            return True
+
+        try:
+            self.wait_seconds = check_rates(checks)
+        except RedisError:
+            logger.exception("auth throttle: redis check failed, request allowed")
+            return True
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+def email_ident(request) -> str | None:
+    """Хеш email из тела запроса: одинаковый для разных регистров, без персональных данных в Redis."""
+    try:
+        email = request.data.get(User.USERNAME_FIELD)
+    except AttributeError:
+        return None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class LoginRateThrottle(SlidingWindowRateThrottle):
+    """Вход: лимит по IP против перебора многих учётных записей и по email против перебора одной."""
+
+    def get_idents(self, request, view):
+        return {"login_ip": self.get_ident(request), "login_email": email_ident(request)}
+
+
+class TokenRefreshRateThrottle(SlidingWindowRateThrottle):
+    def get_idents(self, request, view):
+        return {"token_refresh_ip": self.get_ident(request)}
+
+
+class RegisterRateThrottle(SlidingWindowRateThrottle):
+    def get_idents(self, request, view):
+        return {"register_ip": self.get_ident(request)}
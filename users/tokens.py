@@ -0,0 +1,35 @@
+"""
+Токены simplejwt с claims пользователя, по которым users.authentication.JWTAuthentication
+строит пользователя без запроса к users.User.
+
+Claims записываются при входе и обновляются из БД при каждом обновлении access-токена
+(users.serializers.TokenRefreshSerializer), поэтому отстают от БД не дольше жизни access-токена.
+Активность пользователя аутентификация дополнительно сверяет с БД (кеш статуса процесса).
+"""
+
+from rest_framework_simplejwt import tokens
+
+IS_ACTIVE_CLAIM = "is_active"
+TELEGRAM_LINKED_CLAIM = "telegram_linked"
+
+
+def user_claims(user) -> dict:
+    return {IS_ACTIVE_CLAIM: user.is_active, TELEGRAM_LINKED_CLAIM: user.is_telegram_linked}
+
+
+class AccessToken(tokens.AccessToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.payload.update(user_claims(user))
+        return token
+
+
+class RefreshToken(tokens.RefreshToken):
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.payload.update(user_claims(user))
+        return token
@@ -1,10 +1,16 @@
+from django.conf import settings
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from config.async_views import with_async_reads
 from users.apps import UsersConfig
 from users.views import (
+    AsyncTokenObtainPairView,
+    AsyncUserCreateAPIView,
+    AsyncUserRetrieveAPIView,
+    LoginAPIView,
     TelegramConfirmAPIView,
     TelegramLinkCreateAPIView,
+    TokenRefreshAPIView,
     UserCreateAPIView,
     UserDestroyAPIView,
     UserRetrieveAPIView,
@@ -14,8 +20,8 @@ from users.views import (
 app_name = UsersConfig.name
 
 urlpatterns = [
-    path("login/", TokenObtainPairView.as_view(), name="login"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("login/", LoginAPIView.as_view(), name="login"),
+    path("token/refresh/", TokenRefreshAPIView.as_view(), name="token_refresh"),
     path("register/", UserCreateAPIView.as_view(), name="user_register"),
     path("detail/me/", UserRetrieveAPIView.as_view(), name="user_detail"),
     path("update/me/", UserUpdateAPIView.as_view(), name="user_update"),
@@ -23,3 +29,18 @@ urlpatterns = [
     path("telegram/link/", TelegramLinkCreateAPIView.as_view(), name="telegram_link"),
     path("telegram/confirm/", TelegramConfirmAPIView.as_view(), name="telegram_confirm"),
 ]
+
+# GET горячих эндпоинтов под ASGI обслуживают async-представления (config/async_views.py)
+async_read_views = {
+    "user_detail": AsyncUserRetrieveAPIView.as_view(),
+}
+
+# Вход и регистрация под ASGI: хеш пароля считается в пуле потоков, а не в потоке sync-представлений
+async_password_views = {
+    "login": AsyncTokenObtainPairView.as_view(),
+    "user_register": AsyncUserCreateAPIView.as_view(),
+}
+
+if getattr(settings, "API_ASYNC_READS", False):
+    urlpatterns = with_async_reads(urlpatterns, async_read_views)
+    urlpatterns = with_async_reads(urlpatterns, async_password_views, methods=("POST",))
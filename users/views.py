@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import transaction
 from drf_yasg import openapi
@@ -6,7 +7,9 @@ from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from config.async_views import AsyncAPIView, AsyncGenericAPIView
 from users.models import User
 from users.serializers import (
     TelegramConfirmSerializer,
@@ -14,12 +17,14 @@ from users.serializers import (
     UserCreateSerializer,
     UserSerializer,
 )
+from users.throttling import LoginRateThrottle, RegisterRateThrottle, TokenRefreshRateThrottle
 
 
 class UserCreateAPIView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserCreateSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterRateThrottle]
 
     @swagger_auto_schema(
         operation_summary="Регистрация пользователя",
@@ -30,6 +35,40 @@ class UserCreateAPIView(generics.CreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
+class LoginAPIView(TokenObtainPairView):
+    throttle_classes = [LoginRateThrottle]
+
+
+class TokenRefreshAPIView(TokenRefreshView):
+    throttle_classes = [TokenRefreshRateThrottle]
+
+
+class AsyncUserCreateAPIView(AsyncGenericAPIView):
+    """UserCreateAPIView для async-пути (API_ASYNC_READS, ASGI): пароль хешируется в пуле потоков users.hashers."""
+
+    queryset = User.objects.all()
+    serializer_class = UserCreateSerializer
+    permission_classes = [AllowAny]
+    throttle_classes = [RegisterRateThrottle]
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # Валидаторы (уникальность email, пароль) синхронно читают БД
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await serializer.asave()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class AsyncTokenObtainPairView(AsyncAPIView, LoginAPIView):
+    """LoginAPIView для async-пути: event loop не ждёт проверки пароля (users.hashers)."""
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # Поля — как в is_valid, а validate с синхронным authenticate заменяет avalidate
+        data = await serializer.avalidate(serializer.to_internal_value(request.data))
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class UserRetrieveAPIView(generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -46,6 +85,19 @@ class UserRetrieveAPIView(generics.RetrieveAPIView):
         return self.request.user
 
 
+class AsyncUserRetrieveAPIView(AsyncGenericAPIView):
+    """UserRetrieveAPIView для async-пути (API_ASYNC_READS, ASGI): пользователь уже прочитан аутентификацией."""
+
+    serializer_class = UserSerializer
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        if request.user.get_deferred_fields():
+            # Пользователь из claims токена (users.models.TokenUser): профиль читаем до сериализации
+            await request.user.arefresh_from_db()
+        return Response(self.get_serializer(request.user).data)
+
+
 class UserUpdateAPIView(generics.UpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -67,7 +119,8 @@ class UserUpdateAPIView(generics.UpdateAPIView):
         return super().patch(request, *args, **kwargs)
 
     def get_object(self):
-        return self.request.user
+        # Строка целиком: у пользователя из claims токена (users.models.TokenUser) загружены не все поля
+        return User.objects.get(pk=self.request.user.pk)
 
 
 class UserDestroyAPIView(generics.DestroyAPIView):